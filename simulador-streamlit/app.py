@@ -10,19 +10,126 @@ Basado en datos financieros reales de Yahoo Finance.
 """
 
 import streamlit as st
+from streamlit.runtime.scriptrunner import get_script_run_ctx
+import os
+import uuid
+from engine import backends, instrumentation
 from engine.finance_engine import get_company_snapshot, translate_to_game_variables
 from engine.game_engine import GameEngine
-import plotly.graph_objects as go
-import plotly.express as px
+from engine.game_store import GameStore, SQLiteBackend
+from engine.rooms import RoomError, RoomRegistry
+from engine.actions import get_registry
+from engine.estimator import BOUNDED_KPIS, project_kpi
+# plotly se importa en render_summary: solo hace falta al terminar la partida
+
+LOGO_PATH = "mbai-logo.png"
+
+# Etiquetas de los KPIs en métricas y previsualizaciones
+KPI_LABELS = {
+    "cash": "💰 Caja",
+    "revenue": "📈 Ingresos",
+    "ebitda": "💵 EBITDA",
+    "debt": "🏦 Deuda",
+    "efficiency": "⚙️ Eficiencia",
+    "quality_score": "✅ Calidad",
+    "production_capacity": "📦 Capacidad",
+    "employees": "👥 Empleados",
+    "satisfaction": "😊 Satisfacción",
+    "productivity": "🚀 Productividad",
+    "turnover_rate": "📉 Rotación",
+    "profit_margin": "📊 Margen",
+    "brand_reputation": "⭐ Reputación",
+    "market_share": "🏆 Cuota Mercado",
+    "customer_satisfaction": "🤝 Satisfacción Cliente",
+    "ai_agents": "🤖 Agentes IA",
+    "automation_level": "🦾 Automatización",
+    "compute_cost": "🖥️ Coste Cómputo",
+}
+
+# st.fragment (Streamlit >= 1.37) re-ejecuta solo el bloque decorado; en versiones
+# anteriores se degrada a una función normal
+fragment = getattr(st, "fragment", None) or getattr(st, "experimental_fragment", None) or (lambda func: func)
+
+
+def live_fragment(run_every: float):
+    """Fragment que se re-ejecuta solo cada `run_every` segundos (sin refresco si no hay fragments)"""
+    if hasattr(st, "fragment"):
+        return st.fragment(run_every=run_every)
+    return lambda func: func
+
+
+@st.cache_resource
+def load_logo(width: int):
+    """Logo redimensionado una sola vez por proceso (el PNG original pesa ~730 KB)"""
+    from PIL import Image
+
+    with Image.open(LOGO_PATH) as image:
+        image.load()
+        height = round(image.height * width / image.width)
+        return image.resize((width, height), Image.LANCZOS)
+
 
 # Configuración de página
 st.set_page_config(
     page_title="Simulador Empresa AI-Nativa | MBAI Native",
-    page_icon="mbai-logo.png",
+    page_icon=load_logo(64),
     layout="wide",
     initial_sidebar_state="expanded"
 )
 
+def report_error(message: str):
+    """
+    Errores del motor (p.ej. fallo al descargar datos) como avisos de Streamlit.
+    Fuera del hilo del script (refrescos en segundo plano) no hay página donde
+    mostrarlos: solo se registran.
+    """
+    if get_script_run_ctx(suppress_warning=True) is None:
+        backends.logger.error(message)
+    else:
+        st.error(message)
+
+
+backends.configure(error_reporter=report_error)
+
+
+@st.cache_resource
+def metrics_server():
+    """Endpoint /metrics (formato Prometheus), solo si MBAI_METRICS=1"""
+    return instrumentation.start_metrics_server(int(os.environ.get("MBAI_METRICS_PORT", "9464")))
+
+
+if instrumentation.enabled():
+    metrics_server()
+
+
+@st.cache_resource
+def game_store() -> GameStore:
+    """
+    Partidas de todas las sesiones del proceso. Con MBAI_GAME_DB se guardan
+    en SQLite y sobreviven a reinicios; si no, las inactivas se guardan
+    comprimidas en memoria.
+    """
+    db_path = os.environ.get("MBAI_GAME_DB")
+    return GameStore(
+        backend=SQLiteBackend(db_path) if db_path else None,
+        max_games=int(os.environ.get("MBAI_GAME_CACHE", "64")),
+        idle_seconds=float(os.environ.get("MBAI_GAME_IDLE_SECONDS", "900")),
+    )
+
+
+@st.cache_resource
+def room_registry() -> RoomRegistry:
+    """
+    Salas multijugador compartidas por todas las sesiones del proceso. Sus
+    partidas se guardan en game_store(): una sala cerrada por inactividad se
+    reabre con su código.
+    """
+    return RoomRegistry(store=game_store())
+
+
+# Salas sin actividad durante este tiempo se cierran (las revisa render_room_status)
+ROOM_IDLE_SECONDS = float(os.environ.get("MBAI_ROOM_IDLE_SECONDS", "3600"))
+
 # CSS personalizado para estilo MBAI Native
 st.markdown("""
 <style>
@@ -121,19 +228,24 @@ st.markdown("""
 
 def init_session_state():
     """Inicializa variables de sesión"""
-    if "game" not in st.session_state:
-        st.session_state.game = None
-    if "snapshot" not in st.session_state:
-        st.session_state.snapshot = None
+    if "game_id" not in st.session_state:
+        st.session_state.game_id = None
+    if "room_id" not in st.session_state:
+        st.session_state.room_id = None
+    if "player_id" not in st.session_state:
+        st.session_state.player_id = uuid.uuid4().hex
+    if "seen_revision" not in st.session_state:
+        st.session_state.seen_revision = -1
     if "selected_role" not in st.session_state:
         st.session_state.selected_role = "CEO"
 
 
+@instrumentation.timed("render.setup")
 def render_setup():
     """Página de configuración del juego"""
     col_logo, col_title = st.columns([1, 4])
     with col_logo:
-        st.image("mbai-logo.png", width=120)
+        st.image(load_logo(240), width=120)  # 2x para pantallas retina
     with col_title:
         st.markdown("""
         <div class="main-header" style="padding: 1rem 2rem;">
@@ -174,19 +286,28 @@ def render_setup():
             help="Tradicional: jerarquía, fricción, latencia. AI-Nativa: agentes IA, automatización, agilidad."
         )
         
+        multiplayer = st.checkbox(
+            "👥 Crear sala multijugador",
+            help="Cada jugador ocupa un rol (CEO, CFO, CMO, COO, CHRO, CAIO) sobre la misma empresa"
+        )
+        
         if st.button("🚀 Iniciar Simulación", use_container_width=True):
             with st.spinner(f"Descargando datos de {ticker}..."):
                 snapshot = get_company_snapshot(ticker.upper())
                 
                 if snapshot:
-                    st.session_state.snapshot = snapshot
-                    st.session_state.game = GameEngine(
+                    game = GameEngine(
                         ticker=ticker.upper(),
                         company_name=snapshot["company_name"],
                         snapshot_data=snapshot,
                         industry_type=industry,
                         game_mode=game_mode
                     )
+                    if multiplayer:
+                        st.session_state.room_id = room_registry().create(game).room_id
+                    else:
+                        game_store().put(game)
+                        st.session_state.game_id = game.game_id
                     st.success(f"✅ {snapshot['company_name']} cargada correctamente")
                     st.rerun()
                 else:
@@ -209,12 +330,26 @@ def render_setup():
         
         🤖 **AI-Nativa**: Agentes IA, automatización, decisiones en tiempo real.
         """)
+        
+        st.subheader("👥 Unirse a una sala")
+        room_code = st.text_input("Código de sala", placeholder="Ej: K7Q2ZX")
+        if st.button("Unirse", use_container_width=True) and room_code:
+            if room_registry().get(room_code):
+                st.session_state.room_id = room_code.strip().upper()
+                st.rerun()
+            else:
+                st.error(f"❌ No existe la sala {room_code}")
 
 
-def render_dashboard():
-    """Dashboard principal del juego"""
-    game = st.session_state.game
-    state = game.get_state()
+@instrumentation.timed("render.dashboard")
+def render_dashboard(game, room=None):
+    """Dashboard principal del juego (en una sala, el de un jugador con su rol)"""
+    if room is not None:
+        state = room.state()
+        st.session_state.seen_revision = state["revision"]
+        role = room.role_of(st.session_state.player_id)
+    else:
+        state = game.get_state()
     
     # Header con info de la empresa
     col1, col2, col3, col4 = st.columns([3, 1, 1, 1])
@@ -231,14 +366,25 @@ def render_dashboard():
         st.metric("Turno", f"{state['turn']} / {state['max_turns']}")
     
     with col3:
-        st.metric("Industria", state['industry'].title())
+        parameters = game.parameters
+        st.metric("Industria", state['industry'].title(),
+                  help=f"Riesgo de crisis por turno: {parameters.crisis_probability:.0%} · "
+                       f"crecimiento mensual {parameters.growth_band[0]:.1%}–{parameters.growth_band[1]:.1%}")
     
     with col4:
-        if st.button("🔄 Nuevo Juego"):
-            st.session_state.game = None
-            st.session_state.snapshot = None
+        if room is not None:
+            if st.button("🚪 Salir de la sala"):
+                room.leave(st.session_state.player_id)
+                st.session_state.room_id = None
+                st.rerun()
+        elif st.button("🔄 Nuevo Juego"):
+            game_store().delete(game.game_id)
+            st.session_state.game_id = None
             st.rerun()
     
+    if room is not None:
+        render_room_status(room)
+    
     st.divider()
     
     # KPIs principales
@@ -307,7 +453,10 @@ def render_dashboard():
     col_actions, col_events = st.columns([2, 1])
     
     with col_actions:
-        render_action_panel(game, state)
+        if room is not None and role is None:
+            render_role_picker(room, state)
+        else:
+            render_action_panel(game, state, room)
     
     with col_events:
         render_events_panel(state)
@@ -317,9 +466,16 @@ def render_dashboard():
     
     col1, col2, col3 = st.columns([1, 2, 1])
     with col2:
-        if state["turn"] < state["max_turns"]:
+        if state["turn"] < state["max_turns"] and room is not None:
+            if role in state["committed"]:
+                st.info(f"⏳ Esperando a: {', '.join(state['waiting_for'])}")
+            elif role is not None and st.button(f"✅ Terminar turno ({role})", use_container_width=True):
+                room.commit(st.session_state.player_id)
+                st.rerun()
+        elif state["turn"] < state["max_turns"]:
             if st.button("⏩ Avanzar al Siguiente Turno", use_container_width=True):
                 result = game.advance_turn()
+                game_store().put(game)
                 if result.get("game_over"):
                     st.balloons()
                     st.success("🎉 ¡Juego completado! Revisa el resumen.")
@@ -329,46 +485,25 @@ def render_dashboard():
             render_summary(game)
 
 
-def render_action_panel(game, state):
-    """Panel de acciones por rol"""
+@fragment
+@instrumentation.timed("render.action_panel")
+def render_action_panel(game, state, room=None):
+    """
+    Panel de acciones por rol (en una sala, solo el rol del jugador).
+    Es un fragment: cambiar rol/acción/intensidad no redibuja el dashboard.
+    """
     st.subheader("🎯 Panel de Decisiones")
     
-    roles = ["CEO", "CFO", "CMO", "COO", "CHRO", "CAIO"]
-    
-    selected_role = st.selectbox("Selecciona un rol", roles)
-    
-    # Acciones por rol
-    actions = {
-        "CEO": {
-            "strategic_pivot": "🎯 Pivote Estratégico",
-            "cost_cutting": "✂️ Reducción de Costes"
-        },
-        "CFO": {
-            "raise_capital": "💰 Levantar Capital",
-            "reduce_costs": "💵 Reducir Gastos",
-            "invest_rd": "🔬 Invertir en I+D"
-        },
-        "CMO": {
-            "marketing_campaign": "📣 Campaña Marketing",
-            "customer_loyalty": "❤️ Programa Fidelización"
-        },
-        "COO": {
-            "optimize_operations": "⚙️ Optimizar Operaciones",
-            "expand_capacity": "🏭 Expandir Capacidad"
-        },
-        "CHRO": {
-            "hire_talent": "👥 Contratar Talento",
-            "training_program": "🎓 Programa Formación",
-            "improve_culture": "🌟 Mejorar Cultura"
-        },
-        "CAIO": {
-            "deploy_agents": "🤖 Desplegar Agentes IA",
-            "train_models": "🧠 Entrenar Modelos",
-            "automate_tasks": "⚡ Automatizar Tareas"
-        }
-    }
+    # Roles y acciones definidos en engine/actions.json
+    registry = get_registry()
+    
+    if room is not None:
+        selected_role = room.role_of(st.session_state.player_id)
+        st.markdown(f"Tu rol: **{selected_role}**")
+    else:
+        selected_role = st.selectbox("Selecciona un rol", registry.roles)
     
-    role_actions = actions.get(selected_role, {})
+    role_actions = registry.actions_for(selected_role)
     
     selected_action = st.selectbox(
         "Selecciona una acción",
@@ -378,37 +513,201 @@ def render_action_panel(game, state):
     
     intensity = st.slider("Intensidad de la acción", 25, 100, 50, 5)
     
+    with st.expander("🔮 Previsualizar resultado"):
+        render_preview(game, selected_role, selected_action, intensity, room)
+    
     if st.button("▶️ Ejecutar Acción", use_container_width=True):
-        result = game.execute_action(selected_role, selected_action, intensity)
-        st.success(result)
+        if room is not None:
+            try:
+                room.submit(st.session_state.player_id, selected_action, intensity)
+            except RoomError as e:
+                st.warning(str(e))
+                return
+        else:
+            game.execute_action(selected_role, selected_action, intensity)
+            game_store().put(game)
         st.rerun()
 
 
-def render_events_panel(state):
-    """Panel de eventos"""
-    st.subheader("📋 Últimos Eventos")
+@instrumentation.timed("render.preview")
+def render_preview(game, role, action, intensity, room=None):
+    """Efecto de la acción sobre una rama de la partida (fork), sin tocar la real"""
+    game_id = game.game_id
+    if room is not None:
+        # Otros jugadores pueden mover la partida mientras tanto: se trabaja
+        # sobre una copia tomada con la sala bloqueada
+        with room.lock:
+            game = game.fork()
+    branch = game.fork()
+    message = branch.execute_action(role, action, intensity)
+    st.caption(message)
+    
+    changed = [name for name in game.kpis.keys() if branch.kpis[name] != game.kpis[name]]
+    if not changed:
+        st.info("Esta acción no cambia ningún KPI.")
+        return
+    
+    columns = st.columns(min(len(changed), 3))
+    for i, name in enumerate(changed):
+        before, after = game.kpis[name], branch.kpis[name]
+        value = f"${after:,.0f}" if name in ("cash", "revenue", "ebitda", "debt", "compute_cost") else f"{after:,.1f}"
+        columns[i % len(columns)].metric(KPI_LABELS.get(name, name), value, delta=f"{after - before:+,.1f}")
+    
+    # Proyección analítica hasta el final (media ± 2σ), con y sin la acción
+    if game.current_turn < game.max_turns:
+        kpi = st.selectbox("KPI a proyectar", list(KPI_LABELS), format_func=KPI_LABELS.get,
+                           index=list(KPI_LABELS).index(changed[0]) if changed[0] in KPI_LABELS else 0)
+        fig = projection_figure(game_id, game.version, role, action, intensity, kpi, game)
+        st.plotly_chart(fig, use_container_width=True)
+
+
+@st.cache_resource(max_entries=256)
+def projection_figure(game_id: str, version: int, role: str, action: str, intensity: int,
+                      kpi: str, _game):
+    """Bandas de confianza del KPI con y sin la acción, memoizadas por (partida, versión, acción)"""
+    import plotly.graph_objects as go
+    
+    fig = go.Figure()
+    scenarios = (
+        ("Sin acción", [], "#8B949E"),
+        ("Con la acción", [[(role, action, intensity)]], "#00FFCC"),
+    )
+    for name, plan, color in scenarios:
+        projection = project_kpi(_game, kpi, plan)
+        turns, mean, std = projection["turns"], projection["mean"], projection["std"]
+        upper = [m + 2 * s for m, s in zip(mean, std)]
+        lower = [m - 2 * s for m, s in zip(mean, std)]
+        if kpi in BOUNDED_KPIS:
+            # La banda no puede salirse del rango al que el motor recorta el KPI
+            low, high = BOUNDED_KPIS[kpi]
+            upper = [min(max(v, low), high) for v in upper]
+            lower = [min(max(v, low), high) for v in lower]
+        fig.add_trace(go.Scatter(
+            x=turns + turns[::-1], y=upper + lower[::-1], fill="toself", fillcolor=color,
+            opacity=0.2, line=dict(width=0), hoverinfo="skip", showlegend=False
+        ))
+        fig.add_trace(go.Scatter(x=turns, y=mean, name=name, line=dict(color=color, width=2)))
+    
+    fig.update_layout(
+        title=f"Proyección de {KPI_LABELS.get(kpi, kpi)} (media ± 2σ)",
+        xaxis_title="Turno",
+        template="plotly_dark",
+        paper_bgcolor="#0D1117",
+        plot_bgcolor="#161B22",
+        height=320,
+        margin=dict(t=40, b=30)
+    )
     
-    if state.get("last_action"):
-        action = state["last_action"]
-        st.markdown(f"""
+    return fig
+
+
+@instrumentation.timed("render.role_picker")
+def render_role_picker(room, state):
+    """Elección de rol al entrar en una sala"""
+    st.subheader("🎭 Elige tu rol")
+    free_roles = [r for r in room.roles if r not in state["players"]]
+    if not free_roles:
+        st.warning("Todos los roles están ocupados.")
+        return
+    
+    role = st.selectbox("Roles libres", free_roles)
+    if st.button("Ocupar rol", use_container_width=True):
+        try:
+            room.join(st.session_state.player_id, role)
+        except RoomError as e:
+            st.warning(str(e))
+            return
+        st.rerun()
+
+
+@live_fragment(run_every=2)
+@instrumentation.timed("render.room_status")
+def render_room_status(room):
+    """
+    Estado de la sala. Se refresca solo cada 2 s y redibuja la página completa
+    únicamente si otro jugador cambió algo (revisión distinta). Cada refresco
+    cierra además las salas inactivas del proceso.
+    """
+    room_registry().close_idle(ROOM_IDLE_SECONDS)
+    if room.revision != st.session_state.seen_revision:
+        st.rerun()
+    
+    badges = []
+    for role in room.roles:
+        if role in room.committed:
+            badges.append(f"✅ {role}")
+        elif role in room.players:
+            badges.append(f"🟡 {role}")
+        else:
+            badges.append(f"⚪ {role}")
+    st.caption(f"Sala **{room.room_id}** · " + " · ".join(badges))
+
+
+@st.cache_resource(max_entries=512)
+def events_html(game_id: str, version: int, _state) -> str:
+    """HTML de las tarjetas de eventos, memoizado por (partida, versión)"""
+    cards = []
+    
+    if _state.get("last_action"):
+        action = _state["last_action"]
+        cards.append(f"""
         <div class="event-card">
             <strong>{action['role']}</strong>: {action['message']}
         </div>
-        """, unsafe_allow_html=True)
+        """)
     
-    for event in reversed(state.get("events", [])[-5:]):
+    for event in reversed(_state.get("events", [])):
         event_class = "event-crisis" if event.get("type") == "crisis" else ""
-        st.markdown(f"""
+        cards.append(f"""
         <div class="event-card {event_class}">
             <small>Turno {event['turn']}</small><br>
             {event['event']}
         </div>
-        """, unsafe_allow_html=True)
+        """)
     
-    if not state.get("events") and not state.get("last_action"):
+    return "".join(cards)
+
+
+@instrumentation.timed("render.events_panel")
+def render_events_panel(state):
+    """Panel de eventos"""
+    st.subheader("📋 Últimos Eventos")
+    
+    html = events_html(state["game_id"], state["version"], state)
+    if html:
+        st.markdown(html, unsafe_allow_html=True)
+    else:
         st.info("No hay eventos aún. ¡Toma decisiones!")
 
 
+@st.cache_resource(max_entries=256)
+def cash_figure(game_id: str, version: int, _turns, _cash):
+    """Figura de evolución de caja, memoizada por (partida, versión)"""
+    import plotly.graph_objects as go
+    
+    fig = go.Figure()
+    
+    # Cash
+    fig.add_trace(go.Scatter(
+        x=_turns,
+        y=_cash,
+        name="Caja",
+        line=dict(color="#00FFCC", width=2)
+    ))
+    
+    fig.update_layout(
+        title="Evolución de Caja",
+        xaxis_title="Turno",
+        yaxis_title="$",
+        template="plotly_dark",
+        paper_bgcolor="#0D1117",
+        plot_bgcolor="#161B22"
+    )
+    
+    return fig
+
+
+@instrumentation.timed("render.summary")
 def render_summary(game):
     """Resumen final del juego"""
     st.subheader("📊 Resumen de la Partida")
@@ -419,32 +718,19 @@ def render_summary(game):
     # Gráfico de evolución
     if len(history) > 1:
         turns = list(range(1, len(history) + 1))
-        
-        fig = go.Figure()
-        
-        # Cash
-        fig.add_trace(go.Scatter(
-            x=turns,
-            y=[h["cash"] for h in history],
-            name="Caja",
-            line=dict(color="#00FFCC", width=2)
-        ))
-        
-        fig.update_layout(
-            title="Evolución de Caja",
-            xaxis_title="Turno",
-            yaxis_title="$",
-            template="plotly_dark",
-            paper_bgcolor="#0D1117",
-            plot_bgcolor="#161B22"
-        )
-        
+        fig = cash_figure(game.game_id, game.version, turns, history.column("cash"))
         st.plotly_chart(fig, use_container_width=True)
     
+    # Crisis por turno (índice del registro de eventos, sin recorrerlos)
+    crises = game.events.per_turn("crisis")
+    if crises:
+        st.bar_chart({"Crisis": {f"T{turn}": n for turn, n in crises.items()}})
+    
     # KPIs finales
     st.info(f"""
     **Modo**: {"🤖 AI-Nativa" if state['game_mode'] == 'ai_native' else '🏢 Tradicional'}  
     **Turnos completados**: {state['turn']}  
+    **Crisis**: {game.events.count(kind="crisis")}  
     **Caja final**: ${state['kpis']['cash']:,.0f}  
     **Eficiencia final**: {state['kpis']['efficiency']:.0f}%  
     **Empleados**: {state['kpis']['employees']:,.0f}
@@ -470,11 +756,27 @@ def main():
         [🌐 mbainative.com](https://mbainative.com)
         """)
     
-    # Contenido principal
-    if st.session_state.game is None:
+    # Sala multijugador: la partida la comparten todas las sesiones de la sala
+    if st.session_state.room_id:
+        room = room_registry().get(st.session_state.room_id)
+        if room is not None:
+            render_dashboard(room.game, room)
+            return
+        st.warning("La sala ya no existe. Inicia una nueva partida.")
+        st.session_state.room_id = None
+    
+    # Contenido principal (la partida se rehidrata del almacén si fue desalojada)
+    game = None
+    if st.session_state.game_id:
+        game = game_store().get(st.session_state.game_id)
+        if game is None:
+            st.warning("La partida anterior ya no está disponible. Inicia una nueva.")
+            st.session_state.game_id = None
+    
+    if game is None:
         render_setup()
     else:
-        render_dashboard()
+        render_dashboard(game)
 
 
 if __name__ == "__main__":
@@ -0,0 +1,87 @@
+"""
+Caché de snapshots bajo carga: single-flight y stale-while-revalidate
+Un fetcher local lento (fixtures + retardo) simula Yahoo Finance:
+
+1. arranque de clase: N sesiones piden el mismo ticker a la vez → 1 descarga
+2. caducidad: tras expirar la caché, todas se sirven al momento (stale)
+   mientras una única descarga refresca la entrada en segundo plano
+
+    python benchmarks/bench_cache.py --sessions 50 --delay 0.5
+"""
+
+import argparse
+import json
+import threading
+import time
+
+from harness import FIXTURES_DIR, percentile
+
+from engine import backends
+from engine.finance_engine import configure_snapshot_source, get_company_snapshot
+from engine.snapshot_store import FixtureFetcher
+
+
+class SlowFetcher:
+    """Fixtures con retardo artificial; cuenta las descargas"""
+
+    def __init__(self, directory: str, delay: float):
+        self.inner = FixtureFetcher(directory)
+        self.delay = delay
+        self.calls = 0
+        self._lock = threading.Lock()
+
+    def fetch(self, ticker: str):
+        with self._lock:
+            self.calls += 1
+        time.sleep(self.delay)
+        return self.inner.fetch(ticker)
+
+
+def burst(ticker: str, sessions: int) -> dict:
+    """`sessions` hilos piden el ticker a la vez; latencias en ms"""
+    latencies = []
+    barrier = threading.Barrier(sessions)
+
+    def session():
+        barrier.wait()
+        start = time.perf_counter()
+        assert get_company_snapshot(ticker) is not None
+        latencies.append((time.perf_counter() - start) * 1000)
+
+    threads = [threading.Thread(target=session) for _ in range(sessions)]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+    latencies.sort()
+    return {"p50_ms": round(percentile(latencies, 0.5), 2), "max_ms": round(latencies[-1], 2)}
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Single-flight y stale-while-revalidate de la caché")
+    parser.add_argument("--ticker", default="TSLA")
+    parser.add_argument("--sessions", type=int, default=50)
+    parser.add_argument("--delay", type=float, default=0.5, help="Segundos por descarga")
+    args = parser.parse_args()
+
+    fetcher = SlowFetcher(FIXTURES_DIR, args.delay)
+    cache = backends.MemoryCache()
+    backends.configure(cache=cache)
+    configure_snapshot_source(fetcher=fetcher, use_store=False)
+
+    results = {}
+    results["cold_burst"] = {**burst(args.ticker, args.sessions), "fetches": fetcher.calls}
+
+    cache.expire()
+    calls_before = fetcher.calls
+    results["expired_burst"] = burst(args.ticker, args.sessions)
+    time.sleep(args.delay * 1.5)  # dejar terminar el refresco en segundo plano
+    results["expired_burst"]["fetches"] = fetcher.calls - calls_before
+
+    results["warm_burst"] = burst(args.ticker, args.sessions)
+    results["cache"] = cache.stats()
+    print(json.dumps(results, indent=2))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,140 @@
+"""
+Benchmarks de los caminos calientes del motor (sin red, sobre fixtures)
+
+    python benchmarks/bench_engine.py
+    python benchmarks/bench_engine.py --json results.json
+    python benchmarks/bench_engine.py --compare results.json   # falla si algo empeora >10%
+"""
+
+import argparse
+import copy
+import sys
+
+from harness import allocations, compare, load_fixture, print_table, timeit, write_results
+
+from engine.actions import get_registry
+from engine.batch_engine import BatchGameEngine
+from engine.finance_engine import translate_to_game_variables
+from engine.game_engine import GameEngine
+from engine.sweep import POLICIES, build_grid, play_game
+
+
+def new_game(snapshot, mode="traditional", seed=1):
+    return GameEngine(snapshot["ticker"], snapshot["company_name"], snapshot,
+                      game_mode=mode, seed=seed)
+
+
+def play_full_game(snapshot, mode="traditional"):
+    game = new_game(snapshot, mode)
+    while not game.advance_turn().get("game_over"):
+        pass
+    return game
+
+
+def _branch(game):
+    branch = game.fork()
+    branch.execute_action("CMO", "marketing_campaign", 80)
+    branch.advance_turn()
+    return branch
+
+
+def run(ticker: str, games: int, quick: bool) -> dict:
+    snapshot = load_fixture(ticker)
+    min_time = 0.1 if quick else 0.5
+    results = {}
+
+    results["init"] = timeit(lambda: new_game(snapshot), min_time)
+    results["translate_to_game_variables"] = timeit(
+        lambda: translate_to_game_variables(snapshot), min_time)
+
+    for mode in ("traditional", "ai_native"):
+        game = new_game(snapshot, mode)
+        initial = game.kpis.copy()
+
+        def fresh_game():
+            # KPIs iniciales en cada muestra: repetir acciones sobre la misma
+            # partida haría crecer la caja sin límite
+            game.kpis = initial.copy()
+            return game
+
+        for spec in get_registry():
+            results[f"execute_action[{mode}:{spec.role}.{spec.key}]"] = timeit(
+                lambda g: g.execute_action(spec.role, spec.key, 60), min_time / 4,
+                setup=fresh_game)
+
+    results["advance_turn"] = timeit(
+        lambda g: g.advance_turn(), min_time, setup=lambda: new_game(snapshot))
+    results["full_game_12_turns"] = timeit(lambda: play_full_game(snapshot), min_time)
+
+    # Ramas what-if a mitad de partida: fork() frente a deepcopy y to_bytes/from_bytes
+    midgame = new_game(snapshot, "ai_native")
+    for _ in range(6):
+        midgame.advance_turn()
+    results["fork"] = timeit(midgame.fork, min_time)
+    results["fork+execute_action+advance_turn"] = timeit(
+        lambda: _branch(midgame), min_time)
+    results["deepcopy"] = timeit(lambda: copy.deepcopy(midgame), min_time)
+    results["to_bytes+from_bytes"] = timeit(
+        lambda: GameEngine.from_bytes(midgame.to_bytes(), snapshot=snapshot), min_time)
+
+    # Memoria por turno de una partida completa
+    turns = new_game(snapshot).max_turns - 1
+    results["full_game_12_turns"].update(
+        allocations(lambda: play_full_game(snapshot), units=turns))
+
+    # N partidas guionizadas (política "balanced"), como en un barrido
+    jobs = build_grid([ticker], policies=["balanced"], repeats=games)
+    results[f"scripted_playthrough_x{len(jobs)}"] = timeit(
+        lambda: [play_game(snapshot, job) for job in jobs], min_time, max_iters=20)
+    results[f"scripted_playthrough_x{len(jobs)}"]["games_per_sec"] = round(
+        results[f"scripted_playthrough_x{len(jobs)}"]["ops_per_sec"] * len(jobs), 1)
+
+    # Las mismas partidas con el motor vectorizado
+    def batch_playthrough():
+        batch = BatchGameEngine(len(jobs), snapshot, seed=1)
+        script = POLICIES["balanced"]
+        while True:
+            for role, action, intensity in script[(batch.current_turn - 1) % len(script)]:
+                batch.execute_action(role, action, intensity)
+            if batch.advance_turn().get("game_over"):
+                break
+        return batch
+
+    results[f"batch_playthrough_x{len(jobs)}"] = timeit(batch_playthrough, min_time, max_iters=200)
+    results[f"batch_playthrough_x{len(jobs)}"]["games_per_sec"] = round(
+        results[f"batch_playthrough_x{len(jobs)}"]["ops_per_sec"] * len(jobs), 1)
+
+    return results
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmarks del motor del juego")
+    parser.add_argument("--ticker", default="TSLA")
+    parser.add_argument("--games", type=int, default=100, help="Partidas por modo en el playthrough guionizado")
+    parser.add_argument("--quick", action="store_true", help="Menos tiempo por caso")
+    parser.add_argument("--json", help="Guardar resultados en este fichero")
+    parser.add_argument("--compare", help="Resultados previos con los que comparar")
+    parser.add_argument("--threshold", type=float, default=0.10)
+    args = parser.parse_args()
+
+    results = run(args.ticker, args.games, args.quick)
+    print_table(results)
+
+    full = results["full_game_12_turns"]
+    print(f"\nmemoria por turno: pico {full['peak_bytes_per_unit']:,.0f} B, "
+          f"retenida {full['retained_bytes_per_unit']:,.0f} B "
+          f"({full['retained_blocks_per_unit']} bloques)")
+    print(f"forks: {results['fork']['ops_per_sec']:,.0f}/s "
+          f"(deepcopy {results['deepcopy']['ops_per_sec']:,.0f}/s)")
+    for name, r in results.items():
+        if "games_per_sec" in r:
+            print(f"{name}: {r['games_per_sec']:,.0f} partidas/s")
+
+    if args.json:
+        write_results(args.json, "engine", results)
+    if args.compare and not compare(args.compare, results, args.threshold):
+        sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,103 @@
+"""
+Histórico por columnas: ingesta incremental y recorrido de muchos tickers
+Genera N tickers sintéticos (cotización diaria y trimestres) en un directorio
+temporal y mide:
+
+1. ingesta completa y re-ingesta con un día nuevo (solo se añade ese día)
+2. calibrate() sobre todos los tickers recorriendo memmaps de uno en uno,
+   frente a cargar antes todas las columnas en memoria
+
+    python benchmarks/bench_history.py --tickers 500 --years 10
+"""
+
+import argparse
+import json
+import resource
+import tempfile
+import time
+
+import numpy as np
+from harness import allocations
+
+from engine.history_store import HistoryStore, calibrate
+
+
+class SyntheticFetcher:
+    """Series aleatorias reproducibles por ticker"""
+
+    def __init__(self, years: int, extra_days: int = 0):
+        self.days = np.busday_offset("2016-01-04", np.arange(252 * years + extra_days))
+        self.quarters = np.arange(np.datetime64("2016-03", "M"), np.datetime64("2016-03", "M") + 4 * years,
+                                  3).astype("M8[D]")
+
+    def fetch(self, ticker, since):
+        rng = np.random.default_rng(abs(hash(ticker)) % 2 ** 32)
+        close = 100 * np.exp(np.cumsum(rng.normal(0, 0.02, len(self.days))))
+        revenue = 1e9 * np.exp(np.cumsum(rng.normal(0.02, 0.03, len(self.quarters))))
+        nan = np.full(len(self.quarters), np.nan)
+        return {
+            "prices": {"date": self.days, "close": close, "volume": rng.uniform(1e6, 1e7, len(self.days))},
+            "quarterly": {"period": self.quarters, "revenue": revenue, "operating_income": nan,
+                          "net_income": nan, "cash": nan, "total_debt": nan},
+        }
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark del histórico por columnas")
+    parser.add_argument("--tickers", type=int, default=500)
+    parser.add_argument("--years", type=int, default=10)
+    args = parser.parse_args()
+    tickers = [f"T{i:04d}" for i in range(args.tickers)]
+
+    with tempfile.TemporaryDirectory() as root:
+        store = HistoryStore(root)
+
+        started = time.perf_counter()
+        for ticker in tickers:
+            store.ingest(ticker, SyntheticFetcher(args.years))
+        ingest_s = time.perf_counter() - started
+
+        started = time.perf_counter()
+        added = sum(store.ingest(ticker, SyntheticFetcher(args.years, extra_days=1))["prices"]
+                    for ticker in tickers)
+        reingest_s = time.perf_counter() - started
+
+        # Recorrido con memmaps
+        def scan():
+            return sum(calibrate(store, ticker) is not None for ticker, _ in store.scan("prices", ["close"]))
+
+        # Referencia: todo el histórico cargado en memoria antes de calcular
+        def eager():
+            loaded = {t: {s: {name: np.array(col) for name, col in store.read(t, s).items()}
+                          for s in ("prices", "quarterly")} for t in tickers}
+            for columns in loaded.values():
+                np.diff(np.log(columns["prices"]["close"][-253:])).std()
+            return loaded
+
+        started = time.perf_counter()
+        calibrated = scan()
+        scan_s = time.perf_counter() - started
+        started = time.perf_counter()
+        eager()
+        eager_s = time.perf_counter() - started
+        scan_peak = allocations(scan)["peak_bytes_per_unit"]
+        eager_peak = allocations(eager)["peak_bytes_per_unit"]
+
+    report = {
+        "tickers": args.tickers,
+        "rows_per_ticker": len(SyntheticFetcher(args.years).days),
+        "ingest_s": round(ingest_s, 3),
+        "reingest_s": round(reingest_s, 3),
+        "reingest_rows_added": added,
+        "scan_calibrate_s": round(scan_s, 3),
+        "scan_peak_heap_mb": round(scan_peak / 2 ** 20, 2),
+        "eager_load_s": round(eager_s, 3),
+        "eager_peak_heap_mb": round(eager_peak / 2 ** 20, 2),
+        "calibrated": calibrated,
+        "max_rss_mb": round(resource.getrusage(resource.RUSAGE_SELF).ru_maxrss / 1024, 1),
+    }
+    print(json.dumps(report, indent=2))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,79 @@
+"""
+Memoria por sesión con y sin snapshots internados
+Simula N sesiones jugando la misma empresa:
+
+- antes: cada sesión recibe su propia copia del snapshot (como una caché que
+  deserializa en cada acceso) y la guarda en la partida y en session_state
+- después: todas comparten el FrozenSnapshot del registro
+
+    python benchmarks/bench_memory.py --sessions 200
+"""
+
+import argparse
+import gc
+import json
+import pickle
+import tracemalloc
+
+from harness import load_fixture
+
+from engine.frozen_snapshot import intern_snapshot, interned
+from engine.game_engine import GameEngine
+
+
+def _measure(build) -> int:
+    gc.collect()
+    tracemalloc.start()
+    try:
+        before, _ = tracemalloc.get_traced_memory()
+        kept = build()
+        after, _ = tracemalloc.get_traced_memory()
+    finally:
+        tracemalloc.stop()
+    del kept
+    return after - before
+
+
+def copies_per_session(snapshot, sessions: int):
+    """Estado anterior: dos copias privadas (partida + session_state) por sesión"""
+    raw = pickle.dumps(snapshot)
+    return [(pickle.loads(raw), pickle.loads(raw)) for _ in range(sessions)]
+
+
+def interned_per_session(snapshot, sessions: int):
+    """Estado actual: solo una referencia al snapshot compartido por sesión"""
+    return [(intern_snapshot(pickle.loads(pickle.dumps(snapshot))),) for _ in range(sessions)]
+
+
+def games(snapshot, sessions: int):
+    return [GameEngine(snapshot["ticker"], snapshot["company_name"], snapshot, seed=i)
+            for i in range(sessions)]
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Memoria por sesión de los snapshots")
+    parser.add_argument("--ticker", default="TSLA")
+    parser.add_argument("--sessions", type=int, default=200)
+    parser.add_argument("--summary-chars", type=int, default=300,
+                        help="Longitud de business_summary (Yahoo la recorta a 300)")
+    args = parser.parse_args()
+
+    snapshot = load_fixture(args.ticker)
+    snapshot["deep_data"]["business_summary"] = ("x" * args.summary_chars)
+
+    before = _measure(lambda: copies_per_session(snapshot, args.sessions))
+    after = _measure(lambda: interned_per_session(snapshot, args.sessions))
+    engines = _measure(lambda: games(snapshot, args.sessions))
+
+    report = {
+        "sessions": args.sessions,
+        "snapshot_bytes_per_session_before": round(before / args.sessions),
+        "snapshot_bytes_per_session_after": round(after / args.sessions),
+        "engine_bytes_per_session": round(engines / args.sessions),
+        "interned_snapshots": len(interned()),
+    }
+    print(json.dumps(report, indent=2))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,89 @@
+"""
+Tamaño y velocidad de la serialización de partidas (to_bytes / from_bytes)
+frente a pickle, sobre una partida completa de 12 turnos
+
+    python benchmarks/bench_serialization.py
+    python benchmarks/bench_serialization.py --json results.json
+    python benchmarks/bench_serialization.py --compare results.json
+"""
+
+import argparse
+import pickle
+import sys
+import zlib
+
+from harness import compare, load_fixture, print_table, timeit, write_results
+
+from engine.game_engine import GameEngine
+from engine.sweep import POLICIES
+
+
+def played_game(snapshot, mode: str) -> GameEngine:
+    game = GameEngine(snapshot["ticker"], snapshot["company_name"], snapshot,
+                      game_mode=mode, seed=1)
+    script = POLICIES["balanced"]
+    while True:
+        for role, action, intensity in script[(game.current_turn - 1) % len(script)]:
+            game.execute_action(role, action, intensity)
+        if game.advance_turn().get("game_over"):
+            return game
+
+
+def run(ticker: str, mode: str, quick: bool):
+    snapshot = load_fixture(ticker)
+    min_time = 0.1 if quick else 0.5
+    game = played_game(snapshot, mode)
+
+    encoded = game.to_bytes()
+    encoded_full = game.to_bytes(include_snapshot=True)
+    pickled = pickle.dumps(game, protocol=pickle.HIGHEST_PROTOCOL)
+    pickled_zlib = zlib.compress(pickled)
+
+    sizes = {
+        "to_bytes": len(encoded),
+        "to_bytes(include_snapshot)": len(encoded_full),
+        "pickle": len(pickled),
+        "pickle+zlib": len(pickled_zlib),
+    }
+
+    results = {
+        "to_bytes": timeit(game.to_bytes, min_time),
+        "to_bytes(include_snapshot)": timeit(lambda: game.to_bytes(include_snapshot=True), min_time),
+        "from_bytes": timeit(lambda: GameEngine.from_bytes(encoded, snapshot=snapshot), min_time),
+        "from_bytes(include_snapshot)": timeit(lambda: GameEngine.from_bytes(encoded_full), min_time),
+        "pickle.dumps": timeit(lambda: pickle.dumps(game, protocol=pickle.HIGHEST_PROTOCOL), min_time),
+        "pickle.loads": timeit(lambda: pickle.loads(pickled), min_time),
+        "pickle+zlib dumps": timeit(
+            lambda: zlib.compress(pickle.dumps(game, protocol=pickle.HIGHEST_PROTOCOL)), min_time),
+        "pickle+zlib loads": timeit(lambda: pickle.loads(zlib.decompress(pickled_zlib)), min_time),
+    }
+    # Sin ops_per_sec ni p50: print_table y compare lo ignoran
+    results["size_bytes"] = sizes
+    return results
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark de serialización de partidas")
+    parser.add_argument("--ticker", default="TSLA")
+    parser.add_argument("--mode", default="ai_native", choices=["traditional", "ai_native"])
+    parser.add_argument("--quick", action="store_true", help="Menos tiempo por caso")
+    parser.add_argument("--json", help="Guardar resultados en este fichero")
+    parser.add_argument("--compare", help="Resultados previos con los que comparar")
+    parser.add_argument("--threshold", type=float, default=0.10)
+    args = parser.parse_args()
+
+    results = run(args.ticker, args.mode, args.quick)
+    print_table(results)
+
+    print("\ntamaño de una partida de 12 turnos:")
+    for name, size in results["size_bytes"].items():
+        print(f"  {name:<30}{size:>10,} B")
+
+    if args.json:
+        write_results(args.json, "serialization", results)
+    if args.compare and not compare(args.compare, results, args.threshold):
+        sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
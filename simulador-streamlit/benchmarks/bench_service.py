@@ -0,0 +1,179 @@
+"""
+Generador de carga contra el servicio HTTP del simulador (engine/service.py)
+Cada conexión crea una partida y juega (acciones, avanzar turno, estado)
+hasta el final, y vuelve a empezar. Reporta peticiones/s y latencias p50/p99.
+
+    python benchmarks/bench_service.py                      # arranca un servicio local con fixtures
+    python benchmarks/bench_service.py --url http://127.0.0.1:8765 --connections 64
+    python benchmarks/bench_service.py --json results.json
+"""
+
+import argparse
+import asyncio
+import json
+import os
+import socket
+import subprocess
+import sys
+import time
+from collections import defaultdict
+from typing import Dict, List
+from urllib.parse import urlparse
+
+from harness import FIXTURES_DIR, ROOT, compare, percentile, print_table, write_results
+
+from engine.sweep import POLICIES
+
+
+class Client:
+    """Cliente HTTP/1.1 keep-alive mínimo"""
+
+    def __init__(self, host: str, port: int):
+        self.host, self.port = host, port
+
+    async def connect(self):
+        self.reader, self.writer = await asyncio.open_connection(self.host, self.port)
+
+    async def request(self, method: str, path: str, payload=None):
+        body = json.dumps(payload).encode() if payload is not None else b""
+        self.writer.write((
+            f"{method} {path} HTTP/1.1\r\nHost: {self.host}\r\n"
+            f"Content-Type: application/json\r\nContent-Length: {len(body)}\r\n\r\n"
+        ).encode("latin-1") + body)
+        await self.writer.drain()
+        head = await self.reader.readuntil(b"\r\n\r\n")
+        status = int(head.split(b" ", 2)[1])
+        length = 0
+        for line in head.split(b"\r\n"):
+            if line.lower().startswith(b"content-length:"):
+                length = int(line.split(b":", 1)[1])
+        data = json.loads(await self.reader.readexactly(length))
+        if status != 200:
+            raise RuntimeError(f"{method} {path}: {status} {data}")
+        return data
+
+    async def close(self):
+        self.writer.close()
+
+
+async def _worker(host, port, ticker, deadline, latencies: Dict[str, List[int]], seed: int):
+    client = Client(host, port)
+    await client.connect()
+    script = POLICIES["balanced"]
+    clock = time.perf_counter_ns
+
+    async def timed(name, method, path, payload=None):
+        start = clock()
+        result = await client.request(method, path, payload)
+        latencies[name].append(clock() - start)
+        return result
+
+    try:
+        while time.perf_counter() < deadline:
+            state = await timed("create_game", "POST", "/games",
+                                {"ticker": ticker, "game_mode": "ai_native", "seed": seed})
+            seed += 1
+            game = f"/games/{state['game_id']}"
+            while time.perf_counter() < deadline:
+                turn = state["turn"]
+                for role, action, intensity in script[(turn - 1) % len(script)]:
+                    await timed("execute_action", "POST", f"{game}/actions",
+                                {"role": role, "action": action, "intensity": intensity})
+                result = await timed("advance_turn", "POST", f"{game}/advance")
+                state = await timed("get_state", "GET", game)
+                if result["result"].get("game_over"):
+                    break
+    finally:
+        await client.close()
+
+
+async def load(host: str, port: int, ticker: str, connections: int, duration: float) -> Dict:
+    latencies: Dict[str, List[int]] = defaultdict(list)
+    start = time.perf_counter()
+    deadline = start + duration
+    await asyncio.gather(*(_worker(host, port, ticker, deadline, latencies, seed=i * 1000)
+                           for i in range(connections)))
+    elapsed = time.perf_counter() - start
+
+    results = {}
+    everything = []
+    for name, samples in sorted(latencies.items()):
+        everything.extend(samples)
+        results[name] = _summary(samples, elapsed)
+    results["total"] = _summary(everything, elapsed)
+    return results
+
+
+def _summary(samples: List[int], elapsed: float) -> Dict:
+    samples.sort()
+    return {
+        "requests": len(samples),
+        "ops_per_sec": round(len(samples) / elapsed, 1),
+        "p50_us": round(percentile(samples, 0.50) / 1000, 1),
+        "p99_us": round(percentile(samples, 0.99) / 1000, 1),
+    }
+
+
+def _free_port() -> int:
+    with socket.socket() as s:
+        s.bind(("127.0.0.1", 0))
+        return s.getsockname()[1]
+
+
+def _start_local_service(port: int) -> subprocess.Popen:
+    process = subprocess.Popen(
+        [sys.executable, "-m", "engine", "serve", "--port", str(port), "--fixtures", FIXTURES_DIR],
+        cwd=ROOT, env={**os.environ, "MBAI_SNAPSHOT_DIR": os.path.join(ROOT, "data", "bench_snapshots")},
+        stdout=subprocess.DEVNULL, stderr=subprocess.DEVNULL,
+    )
+    deadline = time.monotonic() + 10
+    while time.monotonic() < deadline:
+        try:
+            socket.create_connection(("127.0.0.1", port), timeout=0.2).close()
+            return process
+        except OSError:
+            time.sleep(0.05)
+    process.kill()
+    raise SystemExit("El servicio local no arrancó")
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Carga contra el servicio HTTP del simulador")
+    parser.add_argument("--url", help="Servicio ya arrancado (por defecto se arranca uno local)")
+    parser.add_argument("--ticker", default="TSLA")
+    parser.add_argument("--connections", type=int, default=16)
+    parser.add_argument("--duration", type=float, default=5.0, help="Segundos de carga")
+    parser.add_argument("--json", help="Guardar resultados en este fichero")
+    parser.add_argument("--compare", help="Resultados previos con los que comparar")
+    parser.add_argument("--threshold", type=float, default=0.10)
+    args = parser.parse_args()
+
+    process = None
+    if args.url:
+        url = urlparse(args.url)
+        host, port = url.hostname, url.port or 80
+    else:
+        host, port = "127.0.0.1", _free_port()
+        process = _start_local_service(port)
+
+    try:
+        results = asyncio.run(load(host, port, args.ticker, args.connections, args.duration))
+    finally:
+        if process is not None:
+            process.terminate()
+            process.wait()
+
+    print_table(results)
+    total = results["total"]
+    print(f"\n{total['requests']:,} peticiones con {args.connections} conexiones: "
+          f"{total['ops_per_sec']:,.0f} req/s, p50 {total['p50_us'] / 1000:.2f} ms, "
+          f"p99 {total['p99_us'] / 1000:.2f} ms")
+
+    if args.json:
+        write_results(args.json, "service", results)
+    if args.compare and not compare(args.compare, results, args.threshold):
+        sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
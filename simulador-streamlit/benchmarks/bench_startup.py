@@ -0,0 +1,106 @@
+"""
+Benchmark de arranque: tiempo de import por módulo
+Usa `python -X importtime` en un proceso limpio para que no influya la caché de imports.
+
+    python benchmarks/bench_startup.py                    # tabla por módulo
+    python benchmarks/bench_startup.py --json out.json    # resultados para comparar entre commits
+    python benchmarks/bench_startup.py --budget-ms 1500   # falla si `import app` supera el presupuesto
+"""
+
+import argparse
+import json
+import os
+import re
+import statistics
+import subprocess
+import sys
+from typing import Dict
+
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+# Módulos vigilados: dependencias pesadas, el motor y la app completa
+MODULES = ["streamlit", "numpy", "pandas", "plotly.graph_objects", "yfinance", "engine", "app"]
+
+_LINE = re.compile(r"import time:\s+(\d+)\s+\|\s+(\d+)\s+\|(\s*)(\S+)")
+
+
+def import_times(module: str) -> Dict[str, Dict[str, int]]:
+    """
+    Tiempo acumulado (µs) de `module` y de cada uno de sus imports directos.
+    -X importtime imprime los hijos antes que el padre, con dos espacios más de sangría.
+    """
+    proc = subprocess.run(
+        [sys.executable, "-X", "importtime", "-c", f"import {module}"],
+        cwd=ROOT, capture_output=True, text=True,
+    )
+    if proc.returncode != 0:
+        raise RuntimeError(f"import {module} falló:\n{proc.stderr[-2000:]}")
+
+    children: Dict[str, int] = {}
+    for line in proc.stderr.splitlines():
+        match = _LINE.match(line)
+        if not match:
+            continue
+        depth = (len(match.group(3)) - 1) // 2
+        name, cumulative = match.group(4), int(match.group(2))
+        if depth == 1:
+            children[name] = cumulative
+        elif depth == 0:
+            if name == module:
+                return {"total": cumulative, "children": children}
+            children = {}
+    raise RuntimeError(f"import {module}: sin datos de importtime")
+
+
+def measure(module: str, repeat: int) -> Dict:
+    runs = [import_times(module) for _ in range(repeat)]
+    total = [run["total"] / 1000 for run in runs]
+    children = {
+        name: round(statistics.median(run["children"].get(name, 0) for run in runs) / 1000, 1)
+        for name in runs[-1]["children"]
+    }
+    top = dict(sorted(children.items(), key=lambda kv: kv[1], reverse=True)[:8])
+    return {"median_ms": round(statistics.median(total), 1), "min_ms": round(min(total), 1),
+            "top_imports_ms": top}
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Tiempo de import por módulo")
+    parser.add_argument("--repeat", type=int, default=3)
+    parser.add_argument("--modules", nargs="+", default=MODULES)
+    parser.add_argument("--json", help="Guardar resultados en este fichero")
+    parser.add_argument("--budget-ms", type=float, help="Presupuesto para `import app`")
+    args = parser.parse_args()
+
+    results = {}
+    for module in args.modules:
+        try:
+            results[module] = measure(module, args.repeat)
+        except RuntimeError as e:
+            results[module] = {"error": str(e).splitlines()[0]}
+
+    print(f"{'módulo':<24}{'mediana ms':>12}{'mín ms':>10}")
+    for module, result in results.items():
+        if "error" in result:
+            print(f"{module:<24}{'-':>12}{'-':>10}  {result['error']}")
+        else:
+            print(f"{module:<24}{result['median_ms']:>12}{result['min_ms']:>10}")
+    if "app" in results and "top_imports_ms" in results["app"]:
+        print("\nimports más caros de app:")
+        for name, ms in results["app"]["top_imports_ms"].items():
+            print(f"  {name:<30}{ms:>8} ms")
+
+    if args.json:
+        with open(args.json, "w", encoding="utf-8") as f:
+            json.dump({"benchmark": "startup", "python": sys.version.split()[0],
+                       "results": results}, f, indent=2)
+
+    app_ms = results.get("app", {}).get("median_ms")
+    if args.budget_ms and app_ms is not None and app_ms > args.budget_ms:
+        print(f"\n❌ import app: {app_ms} ms > presupuesto {args.budget_ms} ms")
+        sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
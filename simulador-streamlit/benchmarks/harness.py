@@ -0,0 +1,138 @@
+"""
+Utilidades comunes de los benchmarks
+Cronometraje por operación, percentiles, asignaciones de memoria y
+resultados JSON comparables entre commits
+"""
+
+import gc
+import json
+import os
+import platform
+import statistics
+import subprocess
+import sys
+import time
+import tracemalloc
+from typing import Callable, Dict, List, Optional
+
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+FIXTURES_DIR = os.path.join(ROOT, "fixtures", "snapshots")
+
+if ROOT not in sys.path:
+    sys.path.insert(0, ROOT)
+
+
+def load_fixture(ticker: str) -> Dict:
+    """Snapshot offline de fixtures/snapshots"""
+    from engine.snapshot_store import FixtureFetcher
+
+    snapshot = FixtureFetcher(FIXTURES_DIR).fetch(ticker)
+    if snapshot is None:
+        raise SystemExit(f"No hay fixture para {ticker} en {FIXTURES_DIR}")
+    return snapshot
+
+
+def percentile(sorted_values: List[float], q: float) -> float:
+    index = min(len(sorted_values) - 1, max(0, round(q * (len(sorted_values) - 1))))
+    return sorted_values[index]
+
+
+def timeit(func: Callable[[], object], min_time: float = 0.5, max_iters: int = 200_000,
+           setup: Optional[Callable[[], object]] = None) -> Dict:
+    """
+    Mide cada llamada por separado. Si se da `setup`, su resultado se pasa a func
+    y su coste no cuenta. Retorna ops/s y latencias p50/p99 en µs.
+    """
+    gc.collect()
+    samples = []
+    clock = time.perf_counter_ns
+    deadline = time.perf_counter() + min_time
+    while len(samples) < max_iters and (len(samples) < 20 or time.perf_counter() < deadline):
+        arg = setup() if setup else None
+        start = clock()
+        func(arg) if setup else func()
+        samples.append(clock() - start)
+
+    samples.sort()
+    total_s = sum(samples) / 1e9
+    return {
+        "iterations": len(samples),
+        "ops_per_sec": round(len(samples) / total_s, 1) if total_s else None,
+        "mean_us": round(statistics.fmean(samples) / 1000, 3),
+        "p50_us": round(percentile(samples, 0.50) / 1000, 3),
+        "p99_us": round(percentile(samples, 0.99) / 1000, 3),
+    }
+
+
+def allocations(func: Callable[[], object], units: int = 1) -> Dict:
+    """
+    Memoria asignada por `func` con tracemalloc: pico (bytes) y bloques que
+    siguen vivos al terminar, ambos divididos entre `units` (p.ej. turnos).
+    """
+    gc.collect()
+    tracemalloc.start()
+    try:
+        before_blocks = sys.getallocatedblocks()
+        before, _ = tracemalloc.get_traced_memory()
+        tracemalloc.reset_peak()
+        result = func()
+        current, peak = tracemalloc.get_traced_memory()
+        retained_blocks = sys.getallocatedblocks() - before_blocks
+    finally:
+        tracemalloc.stop()
+    del result
+    return {
+        "peak_bytes_per_unit": round((peak - before) / units, 1),
+        "retained_bytes_per_unit": round((current - before) / units, 1),
+        "retained_blocks_per_unit": round(retained_blocks / units, 2),
+    }
+
+
+def git_commit() -> Optional[str]:
+    try:
+        return subprocess.run(["git", "rev-parse", "--short", "HEAD"], cwd=ROOT,
+                              capture_output=True, text=True, check=True).stdout.strip()
+    except (OSError, subprocess.CalledProcessError):
+        return None
+
+
+def write_results(path: str, benchmark: str, results: Dict):
+    with open(path, "w", encoding="utf-8") as f:
+        json.dump({
+            "benchmark": benchmark,
+            "commit": git_commit(),
+            "python": platform.python_version(),
+            "machine": platform.machine(),
+            "results": results,
+        }, f, indent=2, ensure_ascii=False)
+
+
+def compare(path: str, results: Dict, threshold: float = 0.10) -> bool:
+    """
+    Compara la latencia p50 (más estable que la media) con un fichero previo.
+    Imprime la variación por caso y retorna False si alguno empeora más que `threshold`.
+    """
+    with open(path, encoding="utf-8") as f:
+        baseline = json.load(f)
+    ok = True
+    print(f"\ncomparación con {path} (commit {baseline.get('commit')}):")
+    for name, result in results.items():
+        old = baseline["results"].get(name, {}).get("p50_us")
+        new = result.get("p50_us")
+        if not old or not new:
+            continue
+        change = new / old - 1
+        flag = ""
+        if change > threshold:
+            flag = "  ❌ regresión"
+            ok = False
+        print(f"  {name:<52}{old:>12,.2f} → {new:>12,.2f} µs p50  ({change:+.1%}){flag}")
+    return ok
+
+
+def print_table(results: Dict):
+    print(f"{'caso':<52}{'ops/s':>14}{'p50 µs':>12}{'p99 µs':>12}")
+    for name, r in results.items():
+        if "ops_per_sec" in r:
+            print(f"{name:<52}{r['ops_per_sec']:>14,.1f}{r['p50_us']:>12,.2f}{r['p99_us']:>12,.2f}")
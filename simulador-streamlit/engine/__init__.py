@@ -1,2 +1,3 @@
 from .finance_engine import get_company_snapshot, translate_to_game_variables
 from .game_engine import GameEngine
+from .batch_engine import BatchGameEngine
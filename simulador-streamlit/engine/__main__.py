@@ -0,0 +1,90 @@
+"""
+CLI headless del simulador
+
+    python -m engine play TSLA --mode ai_native --script guion.json --out resultado.json
+    python -m engine sweep TSLA AAPL --repeats 100
+    python -m engine snapshots prefetch TSLA AAPL MSFT
+    python -m engine serve --port 8765
+    python -m engine optimize TSLA --mode ai_native --objective cash
+    python -m engine history ingest TSLA AAPL --csv fixtures/history
+    python -m engine compare TSLA --kpi cash --antithetic
+"""
+
+import argparse
+import json
+import sys
+from typing import Optional, Sequence
+
+
+def _play(args):
+    from .finance_engine import configure_snapshot_source
+    from .simulation import apply_script, create_game, load_script, outcome
+    from .snapshot_store import FixtureFetcher
+
+    if args.fixtures:
+        configure_snapshot_source(fetcher=FixtureFetcher(args.fixtures))
+
+    results = []
+    script = load_script(args.script) if args.script else []
+    for mode in args.mode:
+        game = create_game(args.ticker, game_mode=mode, industry_type=args.industry, seed=args.seed)
+        actions = apply_script(game, script)
+        results.append({**outcome(game), "actions": actions})
+
+    text = json.dumps(results if len(results) > 1 else results[0], ensure_ascii=False, indent=2)
+    if args.out:
+        with open(args.out, "w", encoding="utf-8") as f:
+            f.write(text + "\n")
+    else:
+        print(text)
+
+
+def main(argv: Optional[Sequence[str]] = None):
+    argv = list(sys.argv[1:] if argv is None else argv)
+
+    # Subcomandos con su propio parser
+    if argv and argv[0] == "sweep":
+        from .sweep import main as sweep_main
+        return sweep_main(argv[1:])
+    if argv and argv[0] == "snapshots":
+        from .snapshot_store import main as snapshots_main
+        return snapshots_main(argv[1:])
+    if argv and argv[0] == "optimize":
+        from .optimizer import main as optimize_main
+        return optimize_main(argv[1:])
+    if argv and argv[0] == "compare":
+        from .comparison import main as compare_main
+        return compare_main(argv[1:])
+    if argv and argv[0] == "history":
+        from .history_store import main as history_main
+        return history_main(argv[1:])
+    if argv and argv[0] == "serve":
+        from .service import main as serve_main
+        return serve_main(argv[1:])
+
+    parser = argparse.ArgumentParser(prog="python -m engine", description="Simulador MBAI sin interfaz")
+    sub = parser.add_subparsers(dest="command", required=True)
+    sub.add_parser("sweep", help="Barrido de estrategias (ver python -m engine sweep -h)")
+    sub.add_parser("snapshots", help="Almacén de snapshots (ver python -m engine snapshots -h)")
+    sub.add_parser("serve", help="Servicio HTTP/WebSocket (ver python -m engine serve -h)")
+    sub.add_parser("optimize", help="Búsqueda de la mejor estrategia (ver python -m engine optimize -h)")
+    sub.add_parser("history", help="Histórico financiero (ver python -m engine history -h)")
+    sub.add_parser("compare", help="Tradicional vs IA nativa en parejas (ver python -m engine compare -h)")
+
+    play = sub.add_parser("play", help="Jugar una partida con un guion de acciones")
+    play.add_argument("ticker")
+    play.add_argument("--mode", nargs="+", default=["traditional"],
+                      choices=["traditional", "ai_native"])
+    play.add_argument("--industry", default="tech")
+    play.add_argument("--seed", type=int, default=None)
+    play.add_argument("--script", help="Guion JSON/YAML: {\"turns\": [[{\"role\", \"action\", \"intensity\"}]]}")
+    play.add_argument("--fixtures", help="Directorio con <TICKER>.json (sin red)")
+    play.add_argument("--out", help="Fichero de salida (por defecto stdout)")
+
+    args = parser.parse_args(argv)
+    if args.command == "play":
+        _play(args)
+
+
+if __name__ == "__main__":
+    main()
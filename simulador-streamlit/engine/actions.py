@@ -0,0 +1,172 @@
+"""
+Registro declarativo de acciones por rol
+Las acciones se definen en actions.json y se compilan una vez a tuplas
+para aplicarlas en O(1) tanto en GameEngine como en BatchGameEngine
+"""
+
+import json
+import os
+from functools import lru_cache
+from typing import Dict, List, Optional, Tuple
+
+import numpy as np
+
+from .kpi_state import KPI_INDEX
+
+
+DEFAULT_ACTIONS_PATH = os.path.join(os.path.dirname(os.path.abspath(__file__)), "actions.json")
+
+# Origen de la base de una cantidad
+CONST, KPI, VAR = 0, 1, 2
+
+# Cantidad compilada: (coef, origen, nombre, escala por factor, escala por fricción)
+Quantity = Tuple[float, int, Optional[str], bool, bool]
+
+
+class ActionSpec:
+    """Una acción compilada: cantidades con nombre + efectos sobre KPIs"""
+
+    __slots__ = ("role", "key", "label", "message", "lets", "effects")
+
+    def __init__(self, role: str, key: str, label: str, message: str,
+                 lets: Tuple[Tuple[str, Quantity], ...],
+                 effects: Tuple[Tuple[str, int, Quantity], ...]):
+        self.role = role
+        self.key = key
+        self.label = label
+        self.message = message
+        self.lets = lets
+        self.effects = effects  # (kpi, signo, cantidad)
+
+    def apply(self, kpis, factor: float, friction: float) -> str:
+        """Aplica la acción a un KPIState (o dict) y retorna el mensaje"""
+        env = {}
+        for name, quantity in self.lets:
+            env[name] = _evaluate(quantity, kpis, env, factor, friction)
+        for kpi, sign, quantity in self.effects:
+            value = _evaluate(quantity, kpis, env, factor, friction)
+            kpis[kpi] = kpis[kpi] + value if sign > 0 else kpis[kpi] - value
+        return self.message.format(**env)
+
+    def apply_columns(self, kpis: np.ndarray, factor: float, friction: float):
+        """Aplica la acción a un array (partidas × KPIs) de BatchGameEngine"""
+        columns = _Columns(kpis)
+        env = {}
+        for name, quantity in self.lets:
+            env[name] = _evaluate(quantity, columns, env, factor, friction)
+        for kpi, sign, quantity in self.effects:
+            value = _evaluate(quantity, columns, env, factor, friction)
+            kpis[:, KPI_INDEX[kpi]] += value if sign > 0 else -value
+
+
+class _Columns:
+    """Acceso por nombre a las columnas de un array de KPIs"""
+
+    __slots__ = ("array",)
+
+    def __init__(self, array: np.ndarray):
+        self.array = array
+
+    def __getitem__(self, name: str) -> np.ndarray:
+        return self.array[:, KPI_INDEX[name]]
+
+
+def _evaluate(quantity: Quantity, kpis, env: Dict, factor: float, friction: float):
+    """int(base * coef * factor * friction), con el mismo orden de operaciones que el motor original"""
+    coef, source, name, by_factor, by_friction = quantity
+    if source == CONST:
+        value = coef
+    elif source == KPI:
+        value = kpis[name] * coef
+    else:
+        value = env[name] * coef
+    if by_factor:
+        value = value * factor
+    if by_friction:
+        value = value * friction
+    if isinstance(value, np.ndarray):
+        return np.trunc(value)
+    return int(value)
+
+
+class ActionRegistry:
+    """Acciones indexadas por (rol, acción)"""
+
+    def __init__(self, roles: List[str], specs: Dict[Tuple[str, str], ActionSpec]):
+        self.roles = roles
+        self._specs = specs
+        self._by_role: Dict[str, Dict[str, ActionSpec]] = {role: {} for role in roles}
+        for (role, key), spec in specs.items():
+            self._by_role[role][key] = spec
+
+    def get(self, role: str, action: str) -> Optional[ActionSpec]:
+        return self._specs.get((role, action))
+
+    def actions_for(self, role: str) -> Dict[str, str]:
+        """{acción: etiqueta} de un rol, en el orden del fichero"""
+        return {key: spec.label for key, spec in self._by_role.get(role, {}).items()}
+
+    def __iter__(self):
+        return iter(self._specs.values())
+
+    def __len__(self) -> int:
+        return len(self._specs)
+
+
+def _compile_quantity(raw, defined: List[str], where: str) -> Quantity:
+    if isinstance(raw, str):
+        raw = {"of": raw}
+    scale = raw.get("scale", [])
+    unknown = set(scale) - {"factor", "friction"}
+    if unknown:
+        raise ValueError(f"{where}: escala desconocida {sorted(unknown)}")
+
+    of = raw.get("of")
+    if of is None:
+        source = CONST
+    elif of in defined:
+        source = VAR
+    elif of in KPI_INDEX:
+        source = KPI
+    else:
+        raise ValueError(f"{where}: '{of}' no es un KPI ni una cantidad definida antes")
+    return (raw.get("coef", 1), source, of, "factor" in scale, "friction" in scale)
+
+
+def compile_actions(data: Dict) -> ActionRegistry:
+    """Valida y compila la definición de acciones"""
+    roles = list(data["roles"])
+    specs = {}
+    for role, actions in data["actions"].items():
+        if role not in roles:
+            raise ValueError(f"Rol desconocido: {role}")
+        for key, raw in actions.items():
+            where = f"{role}.{key}"
+            defined: List[str] = []
+            lets = []
+            for name, quantity in raw.get("let", {}).items():
+                lets.append((name, _compile_quantity(quantity, defined, f"{where}.{name}")))
+                defined.append(name)
+
+            effects = []
+            for effect in raw["effects"]:
+                if effect["kpi"] not in KPI_INDEX:
+                    raise ValueError(f"{where}: KPI desconocido {effect['kpi']}")
+                sign = 1 if "add" in effect else -1
+                quantity = effect["add"] if sign > 0 else effect["sub"]
+                effects.append((effect["kpi"], sign, _compile_quantity(quantity, defined, where)))
+
+            specs[(role, key)] = ActionSpec(role, key, raw["label"], raw["message"],
+                                            tuple(lets), tuple(effects))
+    return ActionRegistry(roles, specs)
+
+
+def load_actions(path: str = DEFAULT_ACTIONS_PATH) -> ActionRegistry:
+    with open(path, encoding="utf-8") as f:
+        return compile_actions(json.load(f))
+
+
+@lru_cache(maxsize=None)
+def get_registry(path: str = DEFAULT_ACTIONS_PATH) -> ActionRegistry:
+    """Registro compartido (se carga una sola vez por proceso)"""
+    return load_actions(path)
@@ -0,0 +1,189 @@
+"""
+Backends inyectables de caché y errores
+El motor no depende de Streamlit: app.py registra st.error al arrancar
+"""
+
+import functools
+import logging
+import threading
+import time
+from collections import OrderedDict
+from typing import Any, Callable, Dict, Hashable, Optional, Tuple
+
+from . import instrumentation
+
+
+logger = logging.getLogger("engine")
+
+
+_MISSING = object()
+
+
+class _Flight:
+    """Carga en curso de una clave: los demás hilos esperan su resultado"""
+
+    __slots__ = ("done", "value", "error")
+
+    def __init__(self):
+        self.done = threading.Event()
+        self.value = None
+        self.error: Optional[BaseException] = None
+
+
+class MemoryCache:
+    """
+    Caché en memoria del proceso con TTL por entrada (thread-safe).
+    - Single-flight: peticiones simultáneas de la misma clave comparten una sola carga.
+    - Stale-while-revalidate: una entrada caducada (hasta `stale_ttl` segundos
+      después) se sirve al momento mientras se refresca en segundo plano. Si el
+      refresco falla se mantiene la entrada y el error se comunica (report_error)
+      en la siguiente llamada a esa misma clave, desde el hilo del llamante.
+    - Como máximo `max_entries` entradas: se descartan las usadas hace más tiempo.
+    """
+
+    def __init__(self, stale_ttl: float = 24 * 3600, max_entries: int = 1024):
+        self.stale_ttl = stale_ttl
+        self.max_entries = max_entries
+        # En orden de uso: las menos recientes primero
+        self._entries: "OrderedDict[Hashable, Tuple[float, Any]]" = OrderedDict()
+        self._inflight: Dict[Hashable, _Flight] = {}
+        self._stats = {"hit": 0, "miss": 0, "coalesced": 0, "stale": 0, "refresh_error": 0, "evict": 0}
+        self._refresh_errors: Dict[Hashable, str] = {}  # clave -> error del último refresco
+        self._lock = threading.Lock()
+
+    def _count(self, name: str):
+        # Llamar con self._lock adquirido
+        self._stats[name] += 1
+        instrumentation.count(f"cache.{name}")
+
+    def get_or_load(self, key: Hashable, ttl: float, loader: Callable[[], Any]) -> Any:
+        now = time.monotonic()
+        served = _MISSING
+        leader = False
+        with self._lock:
+            refresh_error = self._refresh_errors.pop(key, None)
+            entry = self._entries.get(key)
+            flight = self._inflight.get(key)
+            if entry is not None and entry[0] > now:
+                self._count("hit")
+                self._entries.move_to_end(key)
+                served = entry[1]
+            elif entry is not None and now - entry[0] < self.stale_ttl:
+                self._count("stale")
+                self._entries.move_to_end(key)
+                if flight is None:
+                    self._inflight[key] = _Flight()
+                    threading.Thread(target=self._load, args=(key, ttl, loader),
+                                     name="cache-refresh", daemon=True).start()
+                served = entry[1]
+            else:
+                leader = flight is None
+                if leader:
+                    self._count("miss")
+                    flight = self._inflight[key] = _Flight()
+                else:
+                    self._count("coalesced")
+
+        if refresh_error is not None:
+            report_error(refresh_error)
+        if served is not _MISSING:
+            return served
+        if leader:
+            return self._load(key, ttl, loader, background=False)
+        flight.done.wait()
+        if flight.error is not None:
+            raise flight.error
+        return flight.value
+
+    def _load(self, key: Hashable, ttl: float, loader: Callable[[], Any], background: bool = True):
+        flight = self._inflight[key]
+        try:
+            value = loader()
+        except Exception as e:
+            with self._lock:
+                del self._inflight[key]
+                if background:
+                    # Refresco fallido: la entrada caducada se sigue sirviendo y
+                    # el error se comunica al próximo que pida esta clave
+                    self._count("refresh_error")
+                    if key in self._entries:
+                        self._refresh_errors[key] = (
+                            f"No se pudieron actualizar los datos (se muestran los anteriores): {e}")
+            if background:
+                # Sin contexto del llamante (p.ej. st.error fuera del script): aquí solo se registra
+                logger.warning("Fallo al refrescar %r en segundo plano: %s", key, e)
+                flight.done.set()
+                return None
+            flight.error = e
+            flight.done.set()
+            raise
+
+        with self._lock:
+            self._entries[key] = (time.monotonic() + ttl, value)
+            self._entries.move_to_end(key)
+            while len(self._entries) > self.max_entries:
+                evicted, _ = self._entries.popitem(last=False)
+                self._refresh_errors.pop(evicted, None)
+                self._count("evict")
+            del self._inflight[key]
+        flight.value = value
+        flight.done.set()
+        return value
+
+    def stats(self) -> Dict[str, int]:
+        """Contadores acumulados: hit, miss, coalesced, stale, refresh_error, evict"""
+        with self._lock:
+            return dict(self._stats)
+
+    def expire(self):
+        """Da por caducadas todas las entradas (se siguen sirviendo como stale)"""
+        now = time.monotonic()
+        with self._lock:
+            for key, (expires, value) in self._entries.items():
+                self._entries[key] = (min(expires, now), value)
+
+    def clear(self):
+        with self._lock:
+            self._entries.clear()
+            self._refresh_errors.clear()
+
+
+def _log_error(message: str):
+    logger.error(message)
+
+
+# Backends activos
+_cache = MemoryCache()
+_error_reporter: Callable[[str], None] = _log_error
+
+
+def configure(cache: Optional[MemoryCache] = None,
+              error_reporter: Optional[Callable[[str], None]] = None):
+    """Sustituye la caché y/o el destino de los mensajes de error (p.ej. st.error)"""
+    global _cache, _error_reporter
+    if cache is not None:
+        _cache = cache
+    if error_reporter is not None:
+        _error_reporter = error_reporter
+
+
+def get_cache() -> MemoryCache:
+    return _cache
+
+
+def report_error(message: str):
+    _error_reporter(message)
+
+
+def cached(ttl: float):
+    """
+    Memoiza una función con la caché activa en el momento de la llamada.
+    Equivalente a st.cache_data(ttl=...) sin depender de Streamlit.
+    """
+    def decorator(func):
+        @functools.wraps(func)
+        def wrapper(*args):
+            return _cache.get_or_load((func.__module__, func.__qualname__, args), ttl,
+                                      lambda: func(*args))
+        return wrapper
+    return decorator
@@ -0,0 +1,197 @@
+"""
+Motor del juego vectorizado - Simulación Monte Carlo
+Ejecuta N partidas a la vez sobre arrays de NumPy
+"""
+
+from typing import Dict, Optional
+
+import numpy as np
+
+from .actions import get_registry
+from .frozen_snapshot import intern_snapshot
+from .kpi_state import KPI_FIELDS, KPI_INDEX
+from .parameters import get_parameters
+from .rng import STREAMS, derive_seed, new_seed
+
+
+# Crisis posibles: (nombre, icono, impactos constantes, fracción de ingresos perdida)
+CRISES = (
+    ("Crisis de suministro", "📦", {"efficiency": -15, "production_capacity": -10}, 0.0),
+    ("Fuga de talento", "🚪", {"employees": -5, "productivity": -10, "satisfaction": -8}, 0.0),
+    ("Problema de calidad", "⚠️", {"quality_score": -20, "brand_reputation": -10}, 0.0),
+    ("Competidor agresivo", "🎯", {"market_share": -5}, 0.03),
+)
+
+
+class BatchGameEngine:
+    """
+    Motor de N partidas simultáneas sobre una misma empresa.
+    Cada fila de `kpis` es una partida y cada columna un KPI (ver KPI_FIELDS).
+    Estadísticamente equivalente a ejecutar N veces GameEngine.
+    """
+
+    def __init__(self, n_games: int, snapshot_data: Dict, industry_type: str = "tech",
+                 game_mode: str = "traditional", seed: Optional[int] = None):
+
+        self.n_games = n_games
+        self.industry_type = industry_type
+        self.game_mode = game_mode  # "traditional" or "ai_native"
+        self.snapshot = intern_snapshot(snapshot_data)
+        self.parameters = get_parameters(self.snapshot, industry_type)
+
+        # Sub-streams independientes, como en GameEngine
+        self.seed = new_seed() if seed is None else seed
+        self._rng = {name: np.random.default_rng(derive_seed(self.seed, name)) for name in STREAMS}
+
+        # Estado del juego
+        self.current_turn = 1
+        self.max_turns = 12
+
+        # Inicializar KPIs (n_games x n_kpis)
+        self.kpis = self._initialize_kpis()
+
+        # Historial preasignado (turno x partida x KPI)
+        self.history = np.zeros((self.max_turns, n_games, len(KPI_FIELDS)))
+        self.history[0] = self.kpis
+
+        # Crisis por turno y partida (-1 = sin crisis)
+        self.crises = np.full((self.max_turns, n_games), -1, dtype=np.int8)
+
+    def column(self, name: str) -> np.ndarray:
+        """Vista (sin copia) de un KPI para todas las partidas"""
+        return self.kpis[:, KPI_INDEX[name]]
+
+    def _initialize_kpis(self) -> np.ndarray:
+        """Inicializa KPIs basados en el snapshot real (mismas reglas que GameEngine)"""
+        deep = self.snapshot.get("deep_data", {})
+        n = self.n_games
+        rng = self._rng["init"]
+
+        cash = deep.get("cash", 1000000) or 1000000
+        revenue = deep.get("total_revenue", 100000000) or 100000000
+        employees = deep.get("full_time_employees", 100) or 100
+        ai_native = self.game_mode == "ai_native"
+
+        kpis = np.empty((n, len(KPI_FIELDS)))
+        col = KPI_INDEX
+
+        # Financieros
+        kpis[:, col["cash"]] = cash
+        kpis[:, col["revenue"]] = revenue
+        kpis[:, col["ebitda"]] = deep.get("ebitda", revenue * 0.15) or revenue * 0.15
+        kpis[:, col["profit_margin"]] = (deep.get("profit_margins", 0.1) or 0.1) * 100
+        kpis[:, col["debt"]] = deep.get("total_debt", cash * 0.5) or cash * 0.5
+
+        # Operaciones, RRHH y Marketing: base + randint(-spread, spread)
+        for name, base, spread in (
+            ("efficiency", 70, 10),
+            ("quality_score", 80, 5),
+            ("production_capacity", 75, 10),
+            ("satisfaction", 70, 10),
+            ("productivity", 75, 5),
+            ("turnover_rate", 15, 5),
+            ("brand_reputation", 70, 10),
+            ("market_share", 20, 5),
+            ("customer_satisfaction", 75, 5),
+        ):
+            kpis[:, col[name]] = base + rng.integers(-spread, spread + 1, size=n)
+
+        kpis[:, col["employees"]] = employees
+
+        # IA (solo modo ai_native)
+        kpis[:, col["ai_agents"]] = 5 if ai_native else 0
+        kpis[:, col["automation_level"]] = 30 if ai_native else 0
+        kpis[:, col["compute_cost"]] = 50000 if ai_native else 0
+
+        return kpis
+
+    def execute_action(self, role: str, action_type: str, intensity: int = 50,
+                       mask: Optional[np.ndarray] = None) -> None:
+        """
+        Ejecuta la misma acción en todas las partidas (o solo en las de `mask`).
+        """
+        spec = get_registry().get(role, action_type)
+        if spec is None:
+            return
+
+        factor = (0.5 + (intensity / 100)) * self.parameters.multiplier(role)
+        friction = 0.7 if self.game_mode == "traditional" else 1.0
+
+        if mask is None:
+            spec.apply_columns(self.kpis, factor, friction)
+        else:
+            rows = self.kpis[mask]
+            spec.apply_columns(rows, factor, friction)
+            self.kpis[mask] = rows
+
+    def advance_turn(self) -> Dict:
+        """Avanza todas las partidas al siguiente turno"""
+        if self.current_turn >= self.max_turns:
+            return {"message": "Juego terminado", "game_over": True}
+
+        self._natural_evolution()
+        self._generate_crisis()
+
+        self.current_turn += 1
+        self.history[self.current_turn - 1] = self.kpis
+
+        return {
+            "message": f"Turno {self.current_turn} iniciado",
+            "game_over": False,
+            "turn": self.current_turn
+        }
+
+    def _natural_evolution(self):
+        """Evolución natural de KPIs por turno"""
+        n = self.n_games
+        bonus = 1.2 if self.game_mode == "ai_native" else 1.0
+        revenue = self.column("revenue")
+        cash = self.column("cash")
+        satisfaction = self.column("satisfaction")
+
+        low, high = self.parameters.growth_band
+        growth = self._rng["evolution"].uniform(low, high, size=n) * bonus
+        revenue *= (1 + growth)
+
+        profit = revenue * (self.column("profit_margin") / 100) * 0.08
+        cash += np.trunc(profit)
+
+        decay_low, decay_high = self.parameters.satisfaction_decay
+        satisfaction -= self._rng["evolution"].integers(decay_low, decay_high + 1, size=n)
+        np.clip(satisfaction, 20, 100, out=satisfaction)
+
+    def _generate_crisis(self):
+        """Crisis aleatoria por partida (probabilidad según los parámetros de la empresa)"""
+        n = self.n_games
+        hit = self._rng["crisis"].random(n) < self.parameters.crisis_probability
+        choice = self._rng["crisis"].integers(0, len(CRISES), size=n)
+        choice[~hit] = -1
+
+        for k, (_, _, impact, revenue_loss) in enumerate(CRISES):
+            rows = choice == k
+            if not rows.any():
+                continue
+            for kpi, delta in impact.items():
+                self.kpis[rows, KPI_INDEX[kpi]] += delta
+            if revenue_loss:
+                revenue = self.kpis[rows, KPI_INDEX["revenue"]]
+                self.kpis[rows, KPI_INDEX["revenue"]] += np.trunc(-revenue * revenue_loss)
+
+        self.crises[self.current_turn - 1] = choice
+
+    def summary(self) -> Dict[str, Dict[str, float]]:
+        """Media, desviación y percentiles de cada KPI sobre todas las partidas"""
+        p5, p50, p95 = np.percentile(self.kpis, [5, 50, 95], axis=0)
+        mean = self.kpis.mean(axis=0)
+        std = self.kpis.std(axis=0)
+        return {
+            name: {
+                "mean": float(mean[i]),
+                "std": float(std[i]),
+                "p5": float(p5[i]),
+                "p50": float(p50[i]),
+                "p95": float(p95[i]),
+            }
+            for i, name in enumerate(KPI_FIELDS)
+        }
+
@@ -0,0 +1,220 @@
+"""
+Comparación tradicional vs IA nativa con números aleatorios comunes
+Cada unidad de comparación juega la misma empresa y política en los dos modos
+con la misma semilla: ambos modos consumen los sorteos en el mismo orden
+(inicialización, evolución y crisis), así que la diferencia por pareja solo
+recoge el efecto del modo. Con antithetic=True cada unidad añade la pareja
+antitética (sorteos reflejados) y promedia las dos diferencias.
+
+Se juegan unidades por lotes hasta que el intervalo de confianza de la
+diferencia media es lo bastante estrecho (o se alcanza max_units).
+
+    python -m engine compare TSLA --kpi cash --policy balanced --antithetic
+    python -m engine compare TSLA --report --units 200
+"""
+
+import argparse
+import json
+import math
+import statistics
+import time
+from typing import Dict, List, Optional, Sequence
+
+from .frozen_snapshot import intern_snapshot
+from .kpi_state import KPI_INDEX
+from .rng import derive_seed
+from .sweep import POLICIES, play_game
+
+MODES = ("traditional", "ai_native")
+
+# Esquemas de muestreo: (misma semilla en ambos modos, pareja antitética)
+SCHEMES = {
+    "independent": (False, False),
+    "crn": (True, False),
+    "crn+antithetic": (True, True),
+}
+
+
+def _job(snapshot: Dict, mode: str, industry_type: str, policy: str, seed: int,
+         antithetic: bool = False) -> Dict:
+    ticker = snapshot.get("ticker", "")
+    return {"key": f"{ticker}|{mode}|{industry_type}|{policy}|compare", "ticker": ticker,
+            "game_mode": mode, "industry_type": industry_type, "policy": policy,
+            "seed": seed, "antithetic": antithetic}
+
+
+def play_unit(snapshot: Dict, unit: int, kpis: Sequence[str], policy: str = "balanced",
+              industry_type: str = "tech", scheme: str = "crn",
+              base_seed: int = 0) -> List[float]:
+    """
+    Diferencia IA nativa − tradicional de cada KPI en una unidad de comparación
+    (2 partidas, o 4 con la pareja antitética)
+    """
+    common, antithetic = SCHEMES[scheme]
+    seed = derive_seed(base_seed, f"compare:{unit}")
+    draws = (False, True) if antithetic else (False,)
+    totals = [0.0] * len(kpis)
+    for mirrored in draws:
+        results = {
+            mode: play_game(snapshot, _job(snapshot, mode, industry_type, policy,
+                                           seed if common else derive_seed(seed, mode), mirrored))["kpis"]
+            for mode in MODES
+        }
+        for i, kpi in enumerate(kpis):
+            totals[i] += results["ai_native"][kpi] - results["traditional"][kpi]
+    return [total / len(draws) for total in totals]
+
+
+def games_per_unit(scheme: str) -> int:
+    return 4 if SCHEMES[scheme][1] else 2
+
+
+def _summary(samples: List[float], z: float) -> Dict:
+    n = len(samples)
+    mean = statistics.fmean(samples)
+    std = statistics.stdev(samples) if n > 1 else math.inf
+    half_width = z * std / math.sqrt(n)
+    return {
+        "mean_diff": mean,
+        "std": std,
+        "ci_low": mean - half_width,
+        "ci_high": mean + half_width,
+        "half_width": half_width,
+    }
+
+
+def compare_modes(snapshot: Dict, kpis: Sequence[str] = ("cash",), policy: str = "balanced",
+                  industry_type: str = "tech", scheme: str = "crn",
+                  confidence: float = 0.95, relative_precision: float = 0.05,
+                  target_half_width: Optional[float] = None, min_units: int = 20,
+                  max_units: int = 2000, batch: int = 10, base_seed: int = 0) -> Dict:
+    """
+    Juega unidades hasta que el intervalo de cada KPI cumple la precisión:
+    semianchura ≤ target_half_width o, si no se indica, ≤ relative_precision·|media|.
+    La regla solo se evalúa cada `batch` unidades a partir de `min_units`.
+    """
+    unknown = set(kpis) - set(KPI_INDEX)
+    if unknown:
+        raise ValueError(f"KPIs desconocidos: {', '.join(sorted(unknown))}")
+    if policy not in POLICIES:
+        raise ValueError(f"Política desconocida: {policy}")
+    snapshot = intern_snapshot(snapshot)
+    z = statistics.NormalDist().inv_cdf(0.5 + confidence / 2)
+
+    samples: List[List[float]] = [[] for _ in kpis]
+    started = time.perf_counter()
+    converged = False
+    while len(samples[0]) < max_units:
+        for unit in range(len(samples[0]), min(len(samples[0]) + batch, max_units)):
+            for column, diff in zip(samples, play_unit(snapshot, unit, kpis, policy, industry_type,
+                                                       scheme, base_seed)):
+                column.append(diff)
+        if len(samples[0]) < min_units:
+            continue
+        summaries = [_summary(column, z) for column in samples]
+        converged = all(
+            s["half_width"] <= (target_half_width if target_half_width is not None
+                                else relative_precision * abs(s["mean_diff"]))
+            for s in summaries
+        )
+        if converged:
+            break
+
+    units = len(samples[0])
+    return {
+        "ticker": snapshot.get("ticker", ""),
+        "policy": policy,
+        "industry": industry_type,
+        "scheme": scheme,
+        "confidence": confidence,
+        "units": units,
+        "games": units * games_per_unit(scheme),
+        "converged": converged,
+        "elapsed_s": round(time.perf_counter() - started, 3),
+        "kpis": {kpi: _summary(column, z) for kpi, column in zip(kpis, samples)},
+    }
+
+
+def variance_report(snapshot: Dict, kpis: Sequence[str] = ("cash",), policy: str = "balanced",
+                    industry_type: str = "tech", units: int = 200, confidence: float = 0.95,
+                    relative_precision: float = 0.05, base_seed: int = 0) -> Dict:
+    """
+    Varianza de la diferencia por esquema con el mismo número de unidades y
+    partidas necesarias para la precisión pedida: n = (z·σ / (p·|media|))² unidades.
+    """
+    snapshot = intern_snapshot(snapshot)
+    z = statistics.NormalDist().inv_cdf(0.5 + confidence / 2)
+    report = {}
+    for scheme in SCHEMES:
+        samples = [play_unit(snapshot, unit, kpis, policy, industry_type, scheme, base_seed)
+                   for unit in range(units)]
+        per_kpi = {}
+        for i, kpi in enumerate(kpis):
+            column = [sample[i] for sample in samples]
+            summary = _summary(column, z)
+            target = relative_precision * abs(summary["mean_diff"])
+            needed = max(1, math.ceil((z * summary["std"] / target) ** 2)) if target else None
+            per_kpi[kpi] = {
+                **summary,
+                "variance": summary["std"] ** 2,
+                "games_needed": needed * games_per_unit(scheme) if needed is not None else None,
+            }
+        report[scheme] = per_kpi
+
+    # Reducción respecto a partidas independientes (por varianza y por coste en
+    # partidas); None si la diferencia no tiene varianza en ese esquema
+    for scheme in SCHEMES:
+        for kpi, values in report[scheme].items():
+            baseline = report["independent"][kpi]
+            values["variance_reduction"] = (baseline["variance"] / values["variance"]
+                                            if values["variance"] else None)
+            if baseline["games_needed"] and values["games_needed"]:
+                values["games_saving"] = baseline["games_needed"] / values["games_needed"]
+    return {
+        "ticker": snapshot.get("ticker", ""),
+        "policy": policy,
+        "industry": industry_type,
+        "units": units,
+        "relative_precision": relative_precision,
+        "schemes": report,
+    }
+
+
+def main(argv: Optional[Sequence[str]] = None):
+    parser = argparse.ArgumentParser(prog="python -m engine compare",
+                                     description="Diferencia IA nativa − tradicional con números aleatorios comunes")
+    parser.add_argument("ticker")
+    parser.add_argument("--kpi", nargs="+", default=["cash"])
+    parser.add_argument("--policy", default="balanced", choices=list(POLICIES))
+    parser.add_argument("--industry", default="tech")
+    parser.add_argument("--scheme", default="crn", choices=list(SCHEMES))
+    parser.add_argument("--antithetic", action="store_true", help="Equivale a --scheme crn+antithetic")
+    parser.add_argument("--confidence", type=float, default=0.95)
+    parser.add_argument("--precision", type=float, default=0.05,
+                        help="Semianchura máxima relativa a la diferencia media")
+    parser.add_argument("--half-width", type=float, default=None, help="Semianchura máxima absoluta")
+    parser.add_argument("--max-units", type=int, default=2000)
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument("--report", action="store_true", help="Comparar la varianza de los esquemas")
+    parser.add_argument("--units", type=int, default=200, help="Unidades por esquema en --report")
+    parser.add_argument("--snapshot-dir", help="Directorio con <TICKER>.json (sin red)")
+    args = parser.parse_args(argv)
+
+    from .sweep import _load_snapshots
+    snapshot = _load_snapshots([args.ticker], args.snapshot_dir).get(args.ticker.upper())
+    if not snapshot:
+        raise SystemExit(f"No se encontraron datos para {args.ticker}")
+
+    if args.report:
+        result = variance_report(snapshot, args.kpi, args.policy, args.industry, args.units,
+                                 args.confidence, args.precision, args.seed)
+    else:
+        result = compare_modes(snapshot, args.kpi, args.policy, args.industry,
+                               "crn+antithetic" if args.antithetic else args.scheme,
+                               args.confidence, args.precision, args.half_width,
+                               max_units=args.max_units, base_seed=args.seed)
+    print(json.dumps(result, ensure_ascii=False, indent=2))
+
+
+if __name__ == "__main__":
+    main()
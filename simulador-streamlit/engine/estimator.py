@@ -0,0 +1,286 @@
+"""
+Estimador analítico de KPIs esperados (sin simular)
+Las acciones y la evolución natural son lineales en el estado aumentado
+z = [KPIs, 1], así que media y varianza se propagan con matrices:
+
+    acción     z' = A z                       (determinista)
+    turno      z' = C E(g, d) z                E: crecimiento g ~ U, satisfacción -d
+                                               C: crisis (mezcla: nada o una de CRISES)
+
+Con S = E[z zᵀ] se cumple S' = E[M S Mᵀ], exacto para g, d y la mezcla de crisis.
+El recorte de satisfacción a [20, 100] no es lineal: tras la evolución se
+sustituyen sus momentos por los de una normal censurada en ese rango (y sus
+covarianzas se escalan por P(dentro del rango), exacto si el estado es normal).
+Aproximaciones: esa normalidad, se ignora el truncado a entero de las cantidades
+que dependen de un KPI (error < 1 unidad) y, en la caja, el margen se toma como
+su media (ninguna acción ni crisis lo modifica).
+"""
+
+import math
+from functools import lru_cache
+from typing import Dict, List, Optional, Sequence, Tuple
+
+import numpy as np
+
+from .actions import CONST, KPI, get_registry
+from .batch_engine import CRISES
+from .kpi_state import KPI_FIELDS, KPI_INDEX
+from .parameters import DEFAULT_PARAMETERS, GameParameters
+
+
+K = len(KPI_FIELDS)
+ONE = K  # índice de la constante 1 en el estado aumentado
+
+# Acción planificada: (rol, acción, intensidad)
+PlannedAction = Tuple[str, str, int]
+
+# KPIs que la evolución natural recorta a un rango (como GameEngine._natural_evolution)
+BOUNDED_KPIS: Dict[str, Tuple[float, float]] = {"satisfaction": (20, 100)}
+
+
+class MomentEstimate:
+    """Segundo momento S = E[z zᵀ] del estado aumentado; media y varianza derivan de él"""
+
+    __slots__ = ("second",)
+
+    def __init__(self, second: np.ndarray):
+        self.second = second
+
+    @classmethod
+    def from_games(cls, games) -> "MomentEstimate":
+        """Estado conocido (una partida) o empírico (media sobre varias partidas)"""
+        rows = np.array([list(game.kpis.row()) + [1.0] for game in games], dtype=float)
+        return cls(rows.T @ rows / len(rows))
+
+    @property
+    def mean(self) -> np.ndarray:
+        return self.second[:K, ONE].copy()
+
+    @property
+    def variance(self) -> np.ndarray:
+        mean = self.second[:K, ONE]
+        return np.maximum(np.diag(self.second)[:K] - mean * mean, 0.0)
+
+    @property
+    def std(self) -> np.ndarray:
+        return np.sqrt(self.variance)
+
+    def copy(self) -> "MomentEstimate":
+        return MomentEstimate(self.second.copy())
+
+
+@lru_cache(maxsize=1024)
+def action_matrix(role: str, action: str, factor: float, friction: float) -> Optional[np.ndarray]:
+    """
+    Matriz A (K+1 × K+1) equivalente a ActionSpec.apply: cantidades y efectos se
+    componen en el mismo orden que en el motor. Las cantidades constantes se
+    truncan igual que en el motor (int); las que dependen de KPIs no.
+    """
+    spec = get_registry().get(role, action)
+    if spec is None:
+        return None
+
+    transform = np.eye(K + 1)  # estado actual = transform @ z inicial
+
+    def form(quantity, env):
+        coef, source, name, by_factor, by_friction = quantity
+        if source == CONST:
+            row = np.zeros(K + 1)
+            row[ONE] = coef
+        elif source == KPI:
+            row = transform[KPI_INDEX[name]] * coef
+        else:
+            row = env[name] * coef
+        if by_factor:
+            row = row * factor
+        if by_friction:
+            row = row * friction
+        if not row[:K].any():
+            constant = np.zeros(K + 1)
+            constant[ONE] = int(row[ONE])
+            return constant
+        return row
+
+    env = {}
+    for name, quantity in spec.lets:
+        env[name] = form(quantity, env)
+    for kpi, sign, quantity in spec.effects:
+        transform[KPI_INDEX[kpi]] = transform[KPI_INDEX[kpi]] + sign * form(quantity, env)
+    transform.flags.writeable = False
+    return transform
+
+
+def _normal_cdf(x: float) -> float:
+    return 0.5 * (1.0 + math.erf(x / math.sqrt(2.0)))
+
+
+def _normal_pdf(x: float) -> float:
+    return math.exp(-0.5 * x * x) / math.sqrt(2.0 * math.pi)
+
+
+def clip_moments(second: np.ndarray, kpi: str, low: float, high: float) -> np.ndarray:
+    """
+    Momentos tras recortar `kpi` a [low, high], suponiéndolo normal: media y
+    segundo momento de la normal censurada; la covarianza con el resto se
+    multiplica por P(low < x < high) (lema de Stein, exacto si la conjunta es normal).
+    """
+    i = KPI_INDEX[kpi]
+    mean = second[i, ONE]
+    variance = second[i, i] - mean * mean
+    result = second.copy()
+    if variance <= 1e-12:
+        # Valor conocido: se recorta sin más
+        clipped = min(max(mean, low), high)
+        result[i, :] = clipped * second[:, ONE]
+        result[i, i] = clipped * clipped
+        result[:, i] = result[i, :]
+        return result
+
+    sigma = math.sqrt(variance)
+    a, b = (low - mean) / sigma, (high - mean) / sigma
+    cdf_a, cdf_b = _normal_cdf(a), _normal_cdf(b)
+    pdf_a, pdf_b = _normal_pdf(a), _normal_pdf(b)
+    inside = cdf_b - cdf_a
+
+    new_mean = low * cdf_a + high * (1 - cdf_b) + mean * inside + sigma * (pdf_a - pdf_b)
+    new_square = (low * low * cdf_a + high * high * (1 - cdf_b)
+                  + (mean * mean + variance) * inside
+                  + 2 * mean * sigma * (pdf_a - pdf_b)
+                  + variance * (a * pdf_a - b * pdf_b))
+
+    means = second[:, ONE]
+    covariance = second[i, :] - mean * means
+    result[i, :] = inside * covariance + new_mean * means
+    result[i, ONE] = new_mean
+    result[i, i] = max(new_square, new_mean * new_mean)
+    result[:, i] = result[i, :]
+    return result
+
+
+def _crisis_matrices() -> List[np.ndarray]:
+    matrices = []
+    for _, _, impact, revenue_loss in CRISES:
+        matrix = np.eye(K + 1)
+        for kpi, delta in impact.items():
+            matrix[KPI_INDEX[kpi], ONE] += delta
+        matrix[KPI_INDEX["revenue"], KPI_INDEX["revenue"]] -= revenue_loss
+        matrices.append(matrix)
+    return matrices
+
+
+class Estimator:
+    """
+    Propagación de momentos para un modo de juego. Los parámetros replican
+    los de GameEngine (ver engine.parameters); por defecto, los valores fijos
+    anteriores.
+    """
+
+    def __init__(self, game_mode: str = "traditional", crisis_probability: float = 0.15,
+                 growth_band: Tuple[float, float] = (0.005, 0.025),
+                 satisfaction_decay: Tuple[int, int] = (0, 3),
+                 role_multipliers: Optional[Dict[str, float]] = None):
+        self.game_mode = game_mode
+        self.friction = 0.7 if game_mode == "traditional" else 1.0
+        self.crisis_probability = crisis_probability
+        self.role_multipliers = dict(role_multipliers or {})
+
+        # Crecimiento g = bonus · U(low, high): momentos de orden 1 y 2
+        bonus = 1.2 if game_mode == "ai_native" else 1.0
+        low, high = growth_band
+        self.growth_mean = bonus * (low + high) / 2
+        self.growth_second = bonus ** 2 * (low * low + low * high + high * high) / 3
+
+        # Caída de satisfacción d ~ U{a..b}
+        values = np.arange(satisfaction_decay[0], satisfaction_decay[1] + 1)
+        self.decay_mean = float(values.mean())
+        self.decay_second = float((values ** 2).mean())
+
+        self._crises = _crisis_matrices()
+
+    @classmethod
+    def from_parameters(cls, game_mode: str = "traditional",
+                        parameters: GameParameters = DEFAULT_PARAMETERS) -> "Estimator":
+        return cls(game_mode, parameters.crisis_probability, parameters.growth_band,
+                   parameters.satisfaction_decay, parameters.role_multipliers)
+
+    @classmethod
+    def for_game(cls, game) -> "Estimator":
+        """Estimador con el modo y los parámetros de la partida"""
+        return cls.from_parameters(game.game_mode, game.parameters)
+
+    def apply_action(self, estimate: MomentEstimate, role: str, action: str,
+                     intensity: int = 50) -> MomentEstimate:
+        factor = (0.5 + intensity / 100) * self.role_multipliers.get(role, 1.0)
+        matrix = action_matrix(role, action, factor, self.friction)
+        if matrix is None:
+            return estimate
+        return MomentEstimate(matrix @ estimate.second @ matrix.T)
+
+    def advance_turn(self, estimate: MomentEstimate) -> MomentEstimate:
+        S = estimate.second
+        revenue, cash, satisfaction = KPI_INDEX["revenue"], KPI_INDEX["cash"], KPI_INDEX["satisfaction"]
+        margin = S[KPI_INDEX["profit_margin"], ONE] / 100 * 0.08
+
+        # E(g, d) = E0 + g·E1 + d·E2
+        E0 = np.eye(K + 1)
+        E0[cash, revenue] = margin
+        E1 = np.zeros((K + 1, K + 1))
+        E1[revenue, revenue] = 1.0
+        E1[cash, revenue] = margin
+        E2 = np.zeros((K + 1, K + 1))
+        E2[satisfaction, ONE] = -1.0
+
+        mg, mg2, md, md2 = self.growth_mean, self.growth_second, self.decay_mean, self.decay_second
+        S0, S1, S2 = E0 @ S, E1 @ S, E2 @ S
+        cross01 = S1 @ E0.T
+        cross02 = S2 @ E0.T
+        cross12 = S1 @ E2.T
+        evolved = (S0 @ E0.T
+                   + mg * (cross01 + cross01.T)
+                   + md * (cross02 + cross02.T)
+                   + mg2 * (S1 @ E1.T)
+                   + md2 * (S2 @ E2.T)
+                   + mg * md * (cross12 + cross12.T))
+        for kpi, (low, high) in BOUNDED_KPIS.items():
+            evolved = clip_moments(evolved, kpi, low, high)
+
+        # Mezcla de crisis: sin crisis (1 - p) o cada una con p / n
+        p = self.crisis_probability
+        result = (1 - p) * evolved
+        for matrix in self._crises:
+            result += p / len(self._crises) * (matrix @ evolved @ matrix.T)
+        return MomentEstimate(result)
+
+    def project(self, game, plan: Sequence[Sequence[PlannedAction]] = (),
+                turns: Optional[int] = None) -> Dict:
+        """
+        Media y desviación de cada KPI turno a turno desde el estado actual de
+        `game` (conocido) siguiendo `plan` (acciones por turno; sin plan, ninguna).
+        Por defecto hasta el final de la partida.
+        """
+        turns = game.max_turns - game.current_turn if turns is None else turns
+        estimate = MomentEstimate.from_games([game])
+        means, stds = [estimate.mean], [estimate.std]
+        for step in range(turns):
+            for role, action, intensity in (plan[step] if step < len(plan) else ()):
+                estimate = self.apply_action(estimate, role, action, intensity)
+            estimate = self.advance_turn(estimate)
+            means.append(estimate.mean)
+            stds.append(estimate.std)
+        return {
+            "turns": list(range(game.current_turn, game.current_turn + turns + 1)),
+            "mean": np.array(means),
+            "std": np.array(stds),
+        }
+
+
+def project_kpi(game, kpi: str, plan: Sequence[Sequence[PlannedAction]] = (),
+                turns: Optional[int] = None) -> Dict[str, list]:
+    """Atajo para un KPI: {"turns", "mean", "std"} como listas"""
+    result = Estimator.for_game(game).project(game, plan, turns)
+    column = KPI_INDEX[kpi]
+    return {
+        "turns": result["turns"],
+        "mean": result["mean"][:, column].tolist(),
+        "std": result["std"][:, column].tolist(),
+    }
@@ -0,0 +1,96 @@
+"""
+Registro de eventos de una partida
+Buffer circular para la vista en vivo + volcado opcional a JSONL para análisis,
+con índice por (turno, tipo) para consultar sin recorrer todos los eventos
+"""
+
+import json
+from collections import deque
+from typing import Dict, List, Optional, Tuple
+
+
+class EventLog:
+    """
+    Los últimos `maxlen` eventos quedan en memoria. Si se indica `spill_path`,
+    todos los eventos se añaden además a ese fichero JSON lines.
+    """
+
+    def __init__(self, maxlen: int = 50, spill_path: Optional[str] = None):
+        self._recent = deque(maxlen=maxlen)
+        self.spill_path = spill_path
+        self.total = 0
+        # (turno, tipo) -> nº de eventos y offsets de sus líneas en el fichero
+        self._counts: Dict[Tuple[int, str], int] = {}
+        self._offsets: Dict[Tuple[int, str], List[int]] = {}
+
+    def append(self, event: Dict):
+        key = (event["turn"], event.get("type", "info"))
+        self._recent.append(event)
+        self.total += 1
+        self._counts[key] = self._counts.get(key, 0) + 1
+
+        if self.spill_path:
+            line = (json.dumps(event, ensure_ascii=False) + "\n").encode("utf-8")
+            with open(self.spill_path, "ab") as f:
+                f.seek(0, 2)
+                self._offsets.setdefault(key, []).append(f.tell())
+                f.write(line)
+
+    def fork(self) -> "EventLog":
+        """Copia en memoria (sin volcado a disco): las ramas no escriben en el fichero"""
+        clone = EventLog(maxlen=self._recent.maxlen)
+        clone._recent = self._recent.copy()
+        clone.total = self.total
+        clone._counts = dict(self._counts)
+        return clone
+
+    def tail(self, n: int = 5) -> List[Dict]:
+        """Los n eventos más recientes (del más antiguo al más nuevo)"""
+        if n <= 0:
+            return []
+        recent = list(self._recent)
+        return recent[-n:]
+
+    def count(self, turn: Optional[int] = None, kind: Optional[str] = None) -> int:
+        """Nº de eventos de un turno y/o tipo (incluye los que ya no están en memoria)"""
+        return sum(n for (t, event_kind), n in self._counts.items()
+                   if (turn is None or t == turn) and (kind is None or event_kind == kind))
+
+    def per_turn(self, kind: Optional[str] = None) -> Dict[int, int]:
+        """{turno: nº de eventos} para un tipo, p.ej. per_turn("crisis")"""
+        result: Dict[int, int] = {}
+        for (turn, event_kind), n in self._counts.items():
+            if kind is None or event_kind == kind:
+                result[turn] = result.get(turn, 0) + n
+        return dict(sorted(result.items()))
+
+    def query(self, turn: Optional[int] = None, kind: Optional[str] = None) -> List[Dict]:
+        """
+        Eventos de un turno y/o tipo. Con volcado a disco se leen por offset
+        (solo las líneas que coinciden); sin él, de los que siguen en memoria.
+        """
+        if not self.spill_path:
+            return [e for e in self._recent
+                    if (turn is None or e["turn"] == turn) and (kind is None or e.get("type") == kind)]
+
+        offsets = sorted(
+            offset
+            for (t, event_kind), found in self._offsets.items()
+            if (turn is None or t == turn) and (kind is None or event_kind == kind)
+            for offset in found
+        )
+        events = []
+        with open(self.spill_path, "rb") as f:
+            for offset in offsets:
+                f.seek(offset)
+                events.append(json.loads(f.readline()))
+        return events
+
+    def __iter__(self):
+        return iter(self._recent)
+
+    def __len__(self) -> int:
+        return len(self._recent)
+
+    def __getitem__(self, index):
+        return list(self._recent)[index]
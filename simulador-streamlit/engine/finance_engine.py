@@ -1,103 +1,151 @@
 """
-Motor de datos financieros - Adaptado para Streamlit
+Motor de datos financieros
 Descarga datos reales de empresas usando Yahoo Finance
+(sin dependencia de Streamlit: caché y errores vía engine.backends)
 """
 
-import yfinance as yf
-import pandas as pd
+import os
 from typing import Dict, Optional
 from datetime import datetime
-import streamlit as st
+
+from .backends import cached, report_error
+from .frozen_snapshot import intern_snapshot
+from .instrumentation import span
+from .snapshot_store import FixtureFetcher, SnapshotFetcher, SnapshotStore, load_snapshot
+
+
+def build_snapshot(ticker: str, info: Dict) -> Optional[Dict]:
+    """
+    Traduce el diccionario `info` de Yahoo Finance al formato de snapshot.
+    """
+    if not info or 'currentPrice' not in info:
+        return None
+    
+    # Top 10 KPIs principales
+    top_10_kpis = {
+        "precio_actual": info.get("currentPrice", 0),
+        "per": info.get("trailingPE", 0),
+        "market_cap": info.get("marketCap", 0),
+        "beta": info.get("beta", 1.0),
+        "eps": info.get("trailingEps", 0),
+        "dividend_yield": info.get("dividendYield", 0) or 0,
+        "volumen": info.get("volume", 0),
+        "high_52w": info.get("fiftyTwoWeekHigh", 0),
+        "low_52w": info.get("fiftyTwoWeekLow", 0),
+        "roe": info.get("returnOnEquity", 0) or 0
+    }
+    
+    # KPIs adicionales
+    deep_kpis = {
+        # Valoración
+        "pb_ratio": info.get("priceToBook", 0),
+        "ps_ratio": info.get("priceToSalesTrailing12Months", 0),
+        "peg_ratio": info.get("pegRatio", 0),
+        "enterprise_value": info.get("enterpriseValue", 0),
+        
+        # Rentabilidad
+        "gross_margins": info.get("grossMargins", 0) or 0,
+        "operating_margins": info.get("operatingMargins", 0) or 0,
+        "profit_margins": info.get("profitMargins", 0) or 0,
+        "roa": info.get("returnOnAssets", 0) or 0,
+        
+        # Liquidez
+        "current_ratio": info.get("currentRatio", 0) or 0,
+        "quick_ratio": info.get("quickRatio", 0) or 0,
+        "cash": info.get("totalCash", 0),
+        
+        # Deuda
+        "total_debt": info.get("totalDebt", 0),
+        "debt_to_equity": info.get("debtToEquity", 0) or 0,
+        
+        # Flujo de caja
+        "free_cash_flow": info.get("freeCashflow", 0),
+        "operating_cash_flow": info.get("operatingCashflow", 0),
+        
+        # Ingresos
+        "total_revenue": info.get("totalRevenue", 0),
+        "ebitda": info.get("ebitda", 0),
+        
+        # Empleados
+        "full_time_employees": info.get("fullTimeEmployees", 0),
+        
+        # Info
+        "sector": info.get("sector", "Unknown"),
+        "industry": info.get("industry", "Unknown"),
+        "country": info.get("country", "Unknown"),
+        "business_summary": (info.get("longBusinessSummary", "") or "")[:300],
+    }
+    
+    # Calcular revenue por empleado
+    employees = deep_kpis["full_time_employees"]
+    revenue = deep_kpis["total_revenue"]
+    deep_kpis["revenue_per_employee"] = revenue / employees if employees > 0 else 0
+    
+    return {
+        "ticker": ticker.upper(),
+        "timestamp": datetime.now().isoformat(),
+        "company_name": info.get("longName", ticker),
+        "top_10": top_10_kpis,
+        "deep_data": deep_kpis,
+    }
+
+
+class YahooFetcher:
+    """Descarga snapshots de Yahoo Finance (fuente por defecto)"""
+
+    def fetch(self, ticker: str) -> Optional[Dict]:
+        import yfinance as yf  # import diferido: solo cuando hay que descargar
+
+        stock = yf.Ticker(ticker)
+        return build_snapshot(ticker, stock.info)
+
+
+# Fuente y almacén de snapshots (configurables para tests o aulas sin red)
+_fetcher: SnapshotFetcher = (
+    FixtureFetcher(os.environ["MBAI_SNAPSHOT_FIXTURES"])
+    if os.environ.get("MBAI_SNAPSHOT_FIXTURES") else YahooFetcher()
+)
+_store: Optional[SnapshotStore] = SnapshotStore()
+
+
+def configure_snapshot_source(fetcher: Optional[SnapshotFetcher] = None,
+                              store: Optional[SnapshotStore] = None,
+                              use_store: bool = True):
+    """Sustituye la fuente de datos y/o el almacén en disco"""
+    global _fetcher, _store
+    if fetcher is not None:
+        _fetcher = fetcher
+    if store is not None:
+        _store = store
+    elif not use_store:
+        _store = None
+
+
+@cached(ttl=3600)  # Cache por 1 hora
+def _fetch_company_snapshot(ticker: str) -> Optional[Dict]:
+    # Los errores se propagan: así la caché no guarda None en lugar de la
+    # entrada anterior y un refresco fallido sigue sirviendo la versión caducada
+    with span("snapshot.fetch"):
+        snapshot = load_snapshot(ticker, _fetcher, _store)
+    # Una sola copia inmutable por snapshot en todo el proceso
+    return intern_snapshot(snapshot) if snapshot else None
 
 
-@st.cache_data(ttl=3600)  # Cache por 1 hora
 def get_company_snapshot(ticker: str) -> Optional[Dict]:
     """
     Descarga ~50 KPIs financieros de una empresa real.
+    Consulta primero el almacén en disco; solo descarga si no hay snapshot de hoy.
     
     Args:
         ticker: Símbolo de la empresa (ej: "TSLA", "AAPL", "MSFT")
         
     Returns:
-        Diccionario con datos financieros o None si no se encuentra
+        Snapshot de solo lectura (compartido por todas las sesiones) o None si no se encuentra
     """
     try:
-        stock = yf.Ticker(ticker)
-        info = stock.info
-        
-        if not info or 'currentPrice' not in info:
-            return None
-        
-        # Top 10 KPIs principales
-        top_10_kpis = {
-            "precio_actual": info.get("currentPrice", 0),
-            "per": info.get("trailingPE", 0),
-            "market_cap": info.get("marketCap", 0),
-            "beta": info.get("beta", 1.0),
-            "eps": info.get("trailingEps", 0),
-            "dividend_yield": info.get("dividendYield", 0) or 0,
-            "volumen": info.get("volume", 0),
-            "high_52w": info.get("fiftyTwoWeekHigh", 0),
-            "low_52w": info.get("fiftyTwoWeekLow", 0),
-            "roe": info.get("returnOnEquity", 0) or 0
-        }
-        
-        # KPIs adicionales
-        deep_kpis = {
-            # Valoración
-            "pb_ratio": info.get("priceToBook", 0),
-            "ps_ratio": info.get("priceToSalesTrailing12Months", 0),
-            "peg_ratio": info.get("pegRatio", 0),
-            "enterprise_value": info.get("enterpriseValue", 0),
-            
-            # Rentabilidad
-            "gross_margins": info.get("grossMargins", 0) or 0,
-            "operating_margins": info.get("operatingMargins", 0) or 0,
-            "profit_margins": info.get("profitMargins", 0) or 0,
-            "roa": info.get("returnOnAssets", 0) or 0,
-            
-            # Liquidez
-            "current_ratio": info.get("currentRatio", 0) or 0,
-            "quick_ratio": info.get("quickRatio", 0) or 0,
-            "cash": info.get("totalCash", 0),
-            
-            # Deuda
-            "total_debt": info.get("totalDebt", 0),
-            "debt_to_equity": info.get("debtToEquity", 0) or 0,
-            
-            # Flujo de caja
-            "free_cash_flow": info.get("freeCashflow", 0),
-            "operating_cash_flow": info.get("operatingCashflow", 0),
-            
-            # Ingresos
-            "total_revenue": info.get("totalRevenue", 0),
-            "ebitda": info.get("ebitda", 0),
-            
-            # Empleados
-            "full_time_employees": info.get("fullTimeEmployees", 0),
-            
-            # Info
-            "sector": info.get("sector", "Unknown"),
-            "industry": info.get("industry", "Unknown"),
-            "country": info.get("country", "Unknown"),
-            "business_summary": (info.get("longBusinessSummary", "") or "")[:300],
-        }
-        
-        # Calcular revenue por empleado
-        employees = deep_kpis["full_time_employees"]
-        revenue = deep_kpis["total_revenue"]
-        deep_kpis["revenue_per_employee"] = revenue / employees if employees > 0 else 0
-        
-        return {
-            "ticker": ticker.upper(),
-            "timestamp": datetime.now().isoformat(),
-            "company_name": info.get("longName", ticker),
-            "top_10": top_10_kpis,
-            "deep_data": deep_kpis,
-        }
-        
+        return _fetch_company_snapshot(ticker)
     except Exception as e:
-        st.error(f"Error descargando datos para {ticker}: {str(e)}")
+        report_error(f"Error descargando datos para {ticker}: {str(e)}")
         return None
 
 
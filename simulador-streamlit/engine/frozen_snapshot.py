@@ -0,0 +1,110 @@
+"""
+Snapshots inmutables compartidos por todo el proceso
+Cada snapshot (ticker, timestamp y contenido) existe una sola vez en memoria:
+las partidas y sesiones guardan una referencia al mismo objeto de solo lectura.
+El registro usa referencias débiles, así que un snapshot se libera cuando
+nadie lo usa. Los snapshots sin ticker o timestamp no se comparten.
+"""
+
+import hashlib
+import json
+import threading
+import weakref
+from collections.abc import Mapping
+from types import MappingProxyType
+from typing import Any, Callable, Dict, Hashable, Iterator, Tuple
+
+
+SnapshotKey = Tuple[str, str]
+
+# Clave del registro: (ticker, timestamp, huella del contenido)
+_registry: "weakref.WeakValueDictionary[Tuple[str, str, str], FrozenSnapshot]" = weakref.WeakValueDictionary()
+_lock = threading.Lock()
+
+
+def _freeze(value: Any) -> Any:
+    if isinstance(value, Mapping):
+        return MappingProxyType({k: _freeze(v) for k, v in value.items()})
+    if isinstance(value, list):
+        return tuple(_freeze(v) for v in value)
+    return value
+
+
+def thaw(value: Any) -> Any:
+    """Copia mutable (dicts y listas), p.ej. para json.dumps"""
+    if isinstance(value, Mapping):
+        return {k: thaw(v) for k, v in value.items()}
+    if isinstance(value, tuple):
+        return [thaw(v) for v in value]
+    return value
+
+
+class FrozenSnapshot(Mapping):
+    """Snapshot de solo lectura (se usa como un dict: snapshot.get("deep_data", {}))"""
+
+    __slots__ = ("_data", "key", "_derived", "__weakref__")
+
+    def __init__(self, data: Mapping):
+        self._data = {k: _freeze(v) for k, v in data.items()}
+        self.key = (data.get("ticker", ""), data.get("timestamp", ""))
+        self._derived: Dict[Hashable, Any] = {}
+
+    def __getitem__(self, name: str) -> Any:
+        return self._data[name]
+
+    def __iter__(self) -> Iterator[str]:
+        return iter(self._data)
+
+    def __len__(self) -> int:
+        return len(self._data)
+
+    def derived(self, name: Hashable, build: Callable[["FrozenSnapshot"], Any]) -> Any:
+        """Valor calculado a partir del snapshot; se calcula una vez y vive con él"""
+        try:
+            return self._derived[name]
+        except KeyError:
+            value = self._derived[name] = build(self)
+            return value
+
+    def __repr__(self) -> str:
+        return f"FrozenSnapshot({self.key[0]!r}, {self.key[1]!r})"
+
+    def __copy__(self) -> "FrozenSnapshot":
+        return self
+
+    def __deepcopy__(self, memo) -> "FrozenSnapshot":
+        return self
+
+    def __reduce__(self):
+        # Al deserializar (pickle, procesos del pool) se vuelve a internar
+        return intern_snapshot, (thaw(self._data),)
+
+
+def _fingerprint(snapshot: Mapping) -> str:
+    canonical = json.dumps(thaw(snapshot), sort_keys=True, ensure_ascii=False, default=repr)
+    return hashlib.sha256(canonical.encode("utf-8")).hexdigest()
+
+
+def intern_snapshot(snapshot: Mapping) -> FrozenSnapshot:
+    """
+    Versión compartida del snapshot. Dos snapshots solo comparten objeto si
+    coinciden ticker, timestamp y contenido; sin ticker o timestamp se
+    retorna un FrozenSnapshot propio, fuera del registro.
+    """
+    if isinstance(snapshot, FrozenSnapshot):
+        return snapshot
+    ticker, timestamp = snapshot.get("ticker", ""), snapshot.get("timestamp", "")
+    if not ticker or not timestamp:
+        return FrozenSnapshot(snapshot)
+    key = (ticker, timestamp, _fingerprint(snapshot))
+    with _lock:
+        frozen = _registry.get(key)
+        if frozen is None:
+            frozen = _registry[key] = FrozenSnapshot(snapshot)
+        return frozen
+
+
+def interned() -> Dict[Tuple[str, str, str], FrozenSnapshot]:
+    """Snapshots vivos en el registro"""
+    with _lock:
+        return dict(_registry)
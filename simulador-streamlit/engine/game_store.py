@@ -0,0 +1,346 @@
+"""
+Almacén de partidas en el servidor
+Las partidas activas viven en una LRU en memoria; las inactivas se serializan
+(GameEngine.to_bytes) en un backend (memoria o SQLite) y se rehidratan al volver
+a usarlas. Cada snapshot financiero se guarda una vez y lo comparten todas las
+partidas de esa empresa. La sesión de Streamlit solo guarda el game_id.
+"""
+
+import json
+import logging
+import os
+import sqlite3
+import threading
+import time
+import zlib
+from collections import OrderedDict
+from typing import Callable, Dict, Iterator, Optional, Tuple
+
+from . import instrumentation
+from .frozen_snapshot import intern_snapshot, thaw
+from .game_engine import GameEngine
+from .serialization import SnapshotKey, read_snapshot_key, snapshot_key
+
+logger = logging.getLogger("engine.game_store")
+
+def _key_text(key: SnapshotKey) -> str:
+    return "|".join(key)
+
+
+def _encode_snapshot(snapshot: Dict) -> bytes:
+    return zlib.compress(json.dumps(thaw(snapshot), ensure_ascii=False).encode("utf-8"))
+
+
+def _decode_snapshot(data: bytes) -> Dict:
+    return intern_snapshot(json.loads(zlib.decompress(data)))
+
+
+class MemoryBackend:
+    """
+    Partidas serializadas en un dict del proceso (se pierden al reiniciar).
+    Las que no se guardan ni se leen en `ttl_seconds` caducan, y cada snapshot
+    se descarta cuando ya no lo usa ninguna partida guardada.
+    """
+
+    persistent = False
+
+    def __init__(self, ttl_seconds: Optional[float] = 24 * 3600):
+        self.ttl_seconds = ttl_seconds
+        # En orden de último acceso: las caducadas están al principio
+        self._data: "OrderedDict[str, Tuple[float, bytes]]" = OrderedDict()
+        self._keys: Dict[str, str] = {}  # game_id -> clave de su snapshot
+        self._snapshots: Dict[str, bytes] = {}
+        self._users: Dict[str, int] = {}  # clave de snapshot -> partidas que lo usan
+        self._lock = threading.Lock()
+
+    def load(self, game_id: str) -> Optional[bytes]:
+        with self._lock:
+            self._expire()
+            entry = self._data.get(game_id)
+            if entry is None:
+                return None
+            self._data[game_id] = (time.monotonic(), entry[1])
+            self._data.move_to_end(game_id)
+            return entry[1]
+
+    def save(self, game_id: str, data: bytes):
+        key = _key_text(read_snapshot_key(data))
+        with self._lock:
+            # Primero el uso nuevo: reescribir la única partida de un snapshot no lo descarta
+            self._users[key] = self._users.get(key, 0) + 1
+            self._drop(game_id)
+            self._data[game_id] = (time.monotonic(), data)
+            self._keys[game_id] = key
+            self._expire()
+
+    def delete(self, game_id: str):
+        with self._lock:
+            self._drop(game_id)
+
+    def ids(self) -> Iterator[str]:
+        with self._lock:
+            self._expire()
+            return iter(list(self._data))
+
+    def load_snapshot(self, key: str) -> Optional[bytes]:
+        with self._lock:
+            return self._snapshots.get(key)
+
+    def save_snapshot(self, key: str, data: bytes):
+        with self._lock:
+            self._snapshots[key] = data
+
+    def has_snapshot(self, key: str) -> bool:
+        with self._lock:
+            return key in self._snapshots
+
+    def _drop(self, game_id: str):
+        # Llamar con self._lock adquirido
+        if self._data.pop(game_id, None) is None:
+            return
+        key = self._keys.pop(game_id)
+        self._users[key] -= 1
+        if not self._users[key]:
+            del self._users[key]
+            self._snapshots.pop(key, None)
+
+    def _expire(self):
+        # Llamar con self._lock adquirido
+        if self.ttl_seconds is None:
+            return
+        oldest = time.monotonic() - self.ttl_seconds
+        while self._data:
+            game_id, (touched, _) = next(iter(self._data.items()))
+            if touched >= oldest:
+                break
+            self._drop(game_id)
+
+    def __contains__(self, game_id: str) -> bool:
+        with self._lock:
+            self._expire()
+            return game_id in self._data
+
+    def __len__(self) -> int:
+        return len(self._data)
+
+
+class SQLiteBackend:
+    """Partidas serializadas en una tabla SQLite (sobreviven a reinicios)"""
+
+    persistent = True
+
+    def __init__(self, path: str):
+        directory = os.path.dirname(os.path.abspath(path))
+        os.makedirs(directory, exist_ok=True)
+        self.path = path
+        self._lock = threading.Lock()
+        self._conn = sqlite3.connect(path, check_same_thread=False, isolation_level=None)
+        self._conn.execute("PRAGMA journal_mode=WAL")
+        self._conn.execute("PRAGMA synchronous=NORMAL")
+        self._conn.execute(
+            "CREATE TABLE IF NOT EXISTS games ("
+            " game_id TEXT PRIMARY KEY, data BLOB NOT NULL, updated_at REAL NOT NULL)"
+        )
+        self._conn.execute(
+            "CREATE TABLE IF NOT EXISTS snapshots (key TEXT PRIMARY KEY, data BLOB NOT NULL)"
+        )
+
+    def load(self, game_id: str) -> Optional[bytes]:
+        with self._lock:
+            row = self._conn.execute("SELECT data FROM games WHERE game_id = ?", (game_id,)).fetchone()
+        return row[0] if row else None
+
+    def save(self, game_id: str, data: bytes):
+        with self._lock:
+            self._conn.execute(
+                "INSERT OR REPLACE INTO games (game_id, data, updated_at) VALUES (?, ?, ?)",
+                (game_id, sqlite3.Binary(data), time.time()),
+            )
+
+    def delete(self, game_id: str):
+        with self._lock:
+            self._conn.execute("DELETE FROM games WHERE game_id = ?", (game_id,))
+
+    def ids(self) -> Iterator[str]:
+        with self._lock:
+            rows = self._conn.execute("SELECT game_id FROM games").fetchall()
+        return iter([r[0] for r in rows])
+
+    def load_snapshot(self, key: str) -> Optional[bytes]:
+        with self._lock:
+            row = self._conn.execute("SELECT data FROM snapshots WHERE key = ?", (key,)).fetchone()
+        return row[0] if row else None
+
+    def save_snapshot(self, key: str, data: bytes):
+        with self._lock:
+            self._conn.execute("INSERT OR IGNORE INTO snapshots (key, data) VALUES (?, ?)",
+                               (key, sqlite3.Binary(data)))
+
+    def has_snapshot(self, key: str) -> bool:
+        with self._lock:
+            return self._conn.execute("SELECT 1 FROM snapshots WHERE key = ?", (key,)).fetchone() is not None
+
+    def __contains__(self, game_id: str) -> bool:
+        with self._lock:
+            return self._conn.execute("SELECT 1 FROM games WHERE game_id = ?", (game_id,)).fetchone() is not None
+
+    def __len__(self) -> int:
+        with self._lock:
+            return self._conn.execute("SELECT COUNT(*) FROM games").fetchone()[0]
+
+    def close(self):
+        with self._lock:
+            self._conn.close()
+
+
+class _Entry:
+    __slots__ = ("game", "last_used", "saved_version")
+
+    def __init__(self, game: GameEngine, saved_version: Optional[int]):
+        self.game = game
+        self.last_used = time.monotonic()
+        self.saved_version = saved_version
+
+
+class GameStore:
+    """
+    LRU de partidas vivas con desalojo por tamaño (`max_games`) y por
+    inactividad (`idle_seconds`). Al desalojar, la partida se escribe en el
+    backend si cambió desde la última escritura. Con `write_through` cada put()
+    escribe también en el backend (para no perder partidas al reiniciar).
+    `on_evict(game_id)` se llama cuando una partida sale de memoria (desalojo o delete).
+    Si una partida no se puede escribir al desalojarla (p.ej. "database is
+    locked"), sigue en memoria: se registra el error y la LRU puede superar
+    `max_games` hasta que una escritura posterior funcione.
+    """
+
+    def __init__(self, backend=None, max_games: int = 64, idle_seconds: float = 900.0,
+                 write_through: Optional[bool] = None,
+                 on_evict: Optional[Callable[[str], None]] = None):
+        self.backend = backend if backend is not None else MemoryBackend()
+        self.max_games = max_games
+        self.idle_seconds = idle_seconds
+        self.write_through = self.backend.persistent if write_through is None else write_through
+        self.on_evict = on_evict
+        self._live: "OrderedDict[str, _Entry]" = OrderedDict()
+        # Snapshots de las partidas vivas (compartidos entre partidas); los demás
+        # se releen del backend al rehidratar
+        self._snapshots: Dict[SnapshotKey, Dict] = {}
+        self._write_errors = 0
+        self._lock = threading.Lock()
+
+    def put(self, game: GameEngine):
+        """Registra (o actualiza tras una jugada) una partida"""
+        with self._lock:
+            entry = self._live.get(game.game_id)
+            if entry is None:
+                entry = self._live[game.game_id] = _Entry(game, None)
+            else:
+                entry.game = game
+                entry.last_used = time.monotonic()
+                self._live.move_to_end(game.game_id)
+            if self.write_through:
+                self._write(entry)
+            self._evict()
+
+    def get(self, game_id: str) -> Optional[GameEngine]:
+        """Partida viva o rehidratada desde el backend; None si no existe"""
+        with self._lock:
+            entry = self._live.get(game_id)
+            if entry is not None:
+                entry.last_used = time.monotonic()
+                self._live.move_to_end(game_id)
+                self._evict()
+                return entry.game
+
+            data = self.backend.load(game_id)
+            if data is None:
+                return None
+            instrumentation.count("game_store.rehydrate")
+            with instrumentation.span("game_store.decode"):
+                game = GameEngine.from_bytes(data, resolve_snapshot=self._load_snapshot)
+            self._live[game_id] = _Entry(game, game.version)
+            self._evict()
+            return game
+
+    def delete(self, game_id: str):
+        with self._lock:
+            if self._live.pop(game_id, None) is not None:
+                self._prune_snapshots()
+            self.backend.delete(game_id)
+        if self.on_evict is not None:
+            self.on_evict(game_id)
+
+    def flush(self):
+        """Escribe en el backend todas las partidas vivas con cambios"""
+        with self._lock:
+            for entry in self._live.values():
+                self._write(entry)
+
+    def evict_idle(self):
+        with self._lock:
+            self._evict()
+
+    def stats(self) -> Dict:
+        with self._lock:
+            return {"live": len(self._live), "stored": len(self.backend),
+                    "write_errors": self._write_errors}
+
+    def __contains__(self, game_id: str) -> bool:
+        with self._lock:
+            return game_id in self._live or game_id in self.backend
+
+    def _write(self, entry: _Entry):
+        # Sin cambios y aún en el backend (el de memoria puede haberla caducado)
+        if entry.saved_version == entry.game.version and entry.game.game_id in self.backend:
+            return
+        key = snapshot_key(entry.game)
+        if not self.backend.has_snapshot(_key_text(key)):
+            self.backend.save_snapshot(_key_text(key), _encode_snapshot(entry.game.snapshot))
+        self._snapshots.setdefault(key, entry.game.snapshot)
+        with instrumentation.span("game_store.encode"):
+            data = entry.game.to_bytes()
+        self.backend.save(entry.game.game_id, data)
+        entry.saved_version = entry.game.version
+
+    def _load_snapshot(self, key: SnapshotKey) -> Optional[Dict]:
+        snapshot = self._snapshots.get(key)
+        if snapshot is None:
+            data = self.backend.load_snapshot(_key_text(key))
+            if data is None:
+                return None
+            snapshot = self._snapshots[key] = _decode_snapshot(data)
+        return snapshot
+
+    def _prune_snapshots(self):
+        """Olvida los snapshots que ya no usa ninguna partida viva"""
+        in_use = {snapshot_key(entry.game) for entry in self._live.values()}
+        for key in [key for key in self._snapshots if key not in in_use]:
+            del self._snapshots[key]
+
+    def _evict(self):
+        # OrderedDict en orden de uso: las menos recientes primero
+        now = time.monotonic()
+        evicted = []
+        while self._live:
+            game_id, entry = next(iter(self._live.items()))
+            if len(self._live) <= self.max_games and now - entry.last_used < self.idle_seconds:
+                break
+            try:
+                self._write(entry)
+            except Exception:
+                # No se puede guardar (backend bloqueado o caído...): la partida
+                # sigue en memoria y se reintenta en un desalojo posterior
+                logger.exception("No se pudo guardar la partida %s al desalojarla; sigue en memoria", game_id)
+                instrumentation.count("game_store.write_error")
+                self._write_errors += 1
+                self._live.move_to_end(game_id)
+                break
+            del self._live[game_id]
+            instrumentation.count("game_store.evict")
+            evicted.append(game_id)
+        if evicted:
+            self._prune_snapshots()
+        if self.on_evict is not None:
+            for game_id in evicted:
+                self.on_evict(game_id)
@@ -0,0 +1,334 @@
+"""
+Histórico financiero por columnas (ficheros binarios + np.memmap)
+Una carpeta por ticker y serie con un fichero crudo por columna y un manifiesto:
+
+    <root>/<TICKER>/quarterly/{manifest.json, period.bin, revenue.bin, ...}
+    <root>/<TICKER>/prices/{manifest.json, date.bin, close.bin, volume.bin}
+
+- Lectura sin copia: cada columna es un np.memmap de solo lectura; recorrer
+  500 tickers solo mapea en memoria lo que se toca.
+- Ingesta incremental: solo se añaden los periodos posteriores al último
+  guardado. El manifiesto (escritura atómica) fija cuántas filas son válidas,
+  así que una ingesta interrumpida no deja filas a medias. Un solo escritor.
+- Fuentes: Yahoo Finance o CSV locales (<dir>/<TICKER>/quarterly.csv, prices.csv).
+  fixtures/history contiene series sintéticas coherentes con fixtures/snapshots.
+
+    python -m engine history ingest TSLA AAPL --csv fixtures/history
+    python -m engine history calibrate TSLA
+"""
+
+import argparse
+import csv
+import json
+import os
+import tempfile
+from datetime import datetime
+from typing import Dict, Iterator, List, Mapping, Optional, Protocol, Sequence, Tuple
+
+import numpy as np
+
+
+DEFAULT_HISTORY_DIR = os.environ.get(
+    "MBAI_HISTORY_DIR",
+    os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), "data", "history"),
+)
+
+# Columnas de cada serie; la primera es la fecha (clave de orden y de ingesta)
+SERIES: Dict[str, Dict[str, str]] = {
+    "quarterly": {
+        "period": "<M8[D]",
+        "revenue": "<f8",
+        "operating_income": "<f8",
+        "net_income": "<f8",
+        "cash": "<f8",
+        "total_debt": "<f8",
+    },
+    "prices": {
+        "date": "<M8[D]",
+        "close": "<f8",
+        "volume": "<f8",
+    },
+}
+
+Columns = Dict[str, np.ndarray]
+
+
+def _key_column(series: str) -> str:
+    return next(iter(SERIES[series]))
+
+
+class HistoryFetcher(Protocol):
+    """Fuente de histórico: {serie: {columna: valores}} (pueden repetirse periodos ya guardados)"""
+
+    def fetch(self, ticker: str, since: Mapping[str, Optional[np.datetime64]]) -> Dict[str, Dict[str, Sequence]]:
+        ...
+
+
+class CSVHistoryFetcher:
+    """Lee <directory>/<TICKER>/<serie>.csv (cabecera con los nombres de columna)"""
+
+    def __init__(self, directory: str):
+        self.directory = directory
+
+    def fetch(self, ticker: str, since: Mapping[str, Optional[np.datetime64]]) -> Dict[str, Dict[str, Sequence]]:
+        result = {}
+        for series, schema in SERIES.items():
+            path = os.path.join(self.directory, ticker.upper(), f"{series}.csv")
+            if not os.path.exists(path):
+                continue
+            with open(path, newline="", encoding="utf-8") as f:
+                rows = list(csv.DictReader(f))
+            result[series] = {
+                name: [row.get(name) or ("NaT" if dtype.startswith("<M8") else "nan") for row in rows]
+                for name, dtype in schema.items()
+            }
+        return result
+
+
+class YahooHistoryFetcher:
+    """Estados trimestrales y cotizaciones diarias de Yahoo Finance"""
+
+    # Columna -> (estado, fila de Yahoo)
+    STATEMENT_ROWS = {
+        "revenue": ("income", "Total Revenue"),
+        "operating_income": ("income", "Operating Income"),
+        "net_income": ("income", "Net Income"),
+        "cash": ("balance", "Cash And Cash Equivalents"),
+        "total_debt": ("balance", "Total Debt"),
+    }
+
+    def __init__(self, price_period: str = "5y"):
+        self.price_period = price_period
+
+    def fetch(self, ticker: str, since: Mapping[str, Optional[np.datetime64]]) -> Dict[str, Dict[str, Sequence]]:
+        import yfinance as yf  # import diferido: solo cuando hay que descargar
+
+        stock = yf.Ticker(ticker)
+        statements = {"income": stock.quarterly_income_stmt, "balance": stock.quarterly_balance_sheet}
+        periods = sorted(statements["income"].columns)
+        quarterly = {"period": [p.strftime("%Y-%m-%d") for p in periods]}
+        for name, (statement, row) in self.STATEMENT_ROWS.items():
+            frame = statements[statement]
+            quarterly[name] = [
+                frame.at[row, p] if row in frame.index and p in frame.columns else float("nan")
+                for p in periods
+            ]
+
+        # Cotizaciones: solo desde el último día guardado
+        last = since.get("prices")
+        if last is not None:
+            prices = stock.history(start=str(last + np.timedelta64(1, "D")), interval="1d")
+        else:
+            prices = stock.history(period=self.price_period, interval="1d")
+        return {
+            "quarterly": quarterly,
+            "prices": {
+                "date": [d.strftime("%Y-%m-%d") for d in prices.index],
+                "close": list(prices["Close"]),
+                "volume": list(prices["Volume"]),
+            },
+        }
+
+
+class HistoryStore:
+    """Series históricas en disco por ticker (ver el docstring del módulo)"""
+
+    def __init__(self, root: str = DEFAULT_HISTORY_DIR):
+        self.root = root
+
+    def _series_dir(self, ticker: str, series: str) -> str:
+        return os.path.join(self.root, ticker.upper(), series)
+
+    def manifest(self, ticker: str, series: str) -> Dict:
+        path = os.path.join(self._series_dir(ticker, series), "manifest.json")
+        if not os.path.exists(path):
+            return {"columns": SERIES[series], "rows": 0, "last": None}
+        with open(path, encoding="utf-8") as f:
+            return json.load(f)
+
+    def _write_manifest(self, directory: str, manifest: Dict):
+        fd, tmp = tempfile.mkstemp(dir=directory, suffix=".tmp")
+        with os.fdopen(fd, "w", encoding="utf-8") as f:
+            json.dump(manifest, f, indent=2)
+        os.replace(tmp, os.path.join(directory, "manifest.json"))
+
+    def version(self, ticker: str) -> Tuple:
+        """
+        Identidad del histórico de un ticker: cambia con cada append (el manifest
+        se reemplaza). Sirve de clave para cachés derivadas del histórico.
+        """
+        version = []
+        for series in SERIES:
+            try:
+                stat = os.stat(os.path.join(self._series_dir(ticker, series), "manifest.json"))
+            except FileNotFoundError:
+                version.append(None)
+                continue
+            version.append((stat.st_ino, stat.st_mtime_ns, stat.st_size))
+        return tuple(version)
+
+    def tickers(self) -> List[str]:
+        if not os.path.isdir(self.root):
+            return []
+        return sorted(name for name in os.listdir(self.root)
+                      if os.path.isdir(os.path.join(self.root, name)))
+
+    def last(self, ticker: str, series: str) -> Optional[np.datetime64]:
+        last = self.manifest(ticker, series)["last"]
+        return None if last is None else np.datetime64(last, "D")
+
+    def column(self, ticker: str, series: str, name: str) -> np.ndarray:
+        """Columna completa como np.memmap de solo lectura (vacía si no hay datos)"""
+        manifest = self.manifest(ticker, series)
+        dtype = np.dtype(manifest["columns"][name])
+        if not manifest["rows"]:
+            return np.empty(0, dtype=dtype)
+        path = os.path.join(self._series_dir(ticker, series), f"{name}.bin")
+        return np.memmap(path, dtype=dtype, mode="r", shape=(manifest["rows"],))
+
+    def read(self, ticker: str, series: str, columns: Optional[Sequence[str]] = None) -> Columns:
+        """Varias columnas de una serie (todas por defecto), sin copia"""
+        return {name: self.column(ticker, series, name) for name in (columns or SERIES[series])}
+
+    def scan(self, series: str, columns: Optional[Sequence[str]] = None,
+             tickers: Optional[Sequence[str]] = None) -> Iterator[Tuple[str, Columns]]:
+        """Recorre los tickers de uno en uno; nada queda en memoria al pasar al siguiente"""
+        for ticker in tickers or self.tickers():
+            if self.manifest(ticker, series)["rows"]:
+                yield ticker, self.read(ticker, series, columns)
+
+    def append(self, ticker: str, series: str, values: Mapping[str, Sequence]) -> int:
+        """
+        Añade las filas posteriores a la última guardada (ordenadas y sin
+        duplicados). Retorna cuántas filas se añadieron.
+        """
+        schema = SERIES[series]
+        key = _key_column(series)
+        arrays = {name: np.asarray(values[name], dtype=dtype) for name, dtype in schema.items()}
+        keys = arrays[key]
+
+        manifest = self.manifest(ticker, series)
+        valid = ~np.isnat(keys)
+        if manifest["last"] is not None:
+            valid &= keys > np.datetime64(manifest["last"], "D")
+        # Orden por fecha; ante periodos repetidos vale el primero
+        _, first = np.unique(keys[valid], return_index=True)
+        rows = np.flatnonzero(valid)[first]
+        if not len(rows):
+            return 0
+
+        directory = self._series_dir(ticker, series)
+        os.makedirs(directory, exist_ok=True)
+        for name, dtype in schema.items():
+            path = os.path.join(directory, f"{name}.bin")
+            with open(path, "ab") as f:
+                # Descarta restos de una ingesta interrumpida antes de añadir
+                f.truncate(manifest["rows"] * np.dtype(dtype).itemsize)
+                f.write(arrays[name][rows].tobytes())
+
+        manifest = {
+            "columns": schema,
+            "rows": manifest["rows"] + len(rows),
+            "last": str(keys[rows[-1]]),
+            "updated": datetime.now().isoformat(),
+        }
+        self._write_manifest(directory, manifest)
+        return len(rows)
+
+    def ingest(self, ticker: str, fetcher: HistoryFetcher) -> Dict[str, int]:
+        """Descarga y añade lo nuevo de cada serie: {serie: filas añadidas}"""
+        ticker = ticker.upper()
+        since = {series: self.last(ticker, series) for series in SERIES}
+        fetched = fetcher.fetch(ticker, since)
+        return {series: self.append(ticker, series, values) for series, values in fetched.items()}
+
+
+def calibrate(store: HistoryStore, ticker: str, quarters: int = 12, days: int = 252) -> Optional[Dict]:
+    """
+    Crecimiento mensual de ingresos (media y desviación, a partir del
+    crecimiento interanual de cada trimestre: sin estacionalidad) y volatilidad
+    anualizada de la cotización. None si no hay histórico suficiente.
+    """
+    result = {}
+    revenue = store.column(ticker, "quarterly", "revenue")[-(quarters + 4):]
+    if len(revenue) >= 5:
+        yoy = revenue[4:] / revenue[:-4]
+        yoy = yoy[np.isfinite(yoy) & (yoy > 0)]
+        if len(yoy) >= 2:
+            monthly = yoy ** (1 / 12) - 1
+            result.update(quarters=int(len(yoy)), growth_mean=float(monthly.mean()),
+                          growth_std=float(monthly.std(ddof=1)))
+
+    close = store.column(ticker, "prices", "close")[-(days + 1):]
+    close = close[np.isfinite(close) & (close > 0)]
+    if len(close) >= 21:
+        returns = np.diff(np.log(close))
+        result.update(days=int(len(returns)), price_volatility=float(returns.std(ddof=1) * np.sqrt(252)))
+    return result or None
+
+
+# Almacén usado al compilar parámetros (configurable para tests o aulas sin red)
+_store: Optional[HistoryStore] = HistoryStore()
+
+
+def configure_history_store(store: Optional[HistoryStore]):
+    """Sustituye el almacén de histórico (None: no calibrar con histórico)"""
+    global _store
+    _store = store
+
+
+def history_version(ticker: str) -> Optional[Tuple]:
+    """Versión del histórico del ticker en el almacén configurado (None si no hay almacén)"""
+    if _store is None or not ticker:
+        return None
+    return _store.root, _store.version(ticker)
+
+
+def calibration_for(ticker: str) -> Optional[Dict]:
+    """Calibración del ticker con el almacén configurado, si tiene histórico"""
+    if _store is None or not ticker:
+        return None
+    return calibrate(_store, ticker)
+
+
+def main(argv: Optional[Sequence[str]] = None):
+    parser = argparse.ArgumentParser(prog="python -m engine history",
+                                     description="Histórico financiero por columnas")
+    parser.add_argument("--store", default=DEFAULT_HISTORY_DIR)
+    sub = parser.add_subparsers(dest="command", required=True)
+
+    ingest = sub.add_parser("ingest", help="Descargar y añadir los periodos nuevos")
+    ingest.add_argument("tickers", nargs="+")
+    ingest.add_argument("--csv", help="Leer de un directorio local en vez de Yahoo Finance")
+
+    sub.add_parser("list", help="Listar tickers, filas y último periodo")
+    cal = sub.add_parser("calibrate", help="Crecimiento y volatilidad observados")
+    cal.add_argument("tickers", nargs="*", help="Por defecto, todos los del almacén")
+    args = parser.parse_args(argv)
+
+    store = HistoryStore(args.store)
+    if args.command == "ingest":
+        fetcher = CSVHistoryFetcher(args.csv) if args.csv else YahooHistoryFetcher()
+        for ticker in args.tickers:
+            try:
+                added = store.ingest(ticker, fetcher)
+            except Exception as e:
+                print(f"{ticker.upper()}: {e}")
+                continue
+            summary = ", ".join(f"{series} +{n}" for series, n in added.items())
+            print(f"{ticker.upper()}: {summary or 'sin datos'}")
+    elif args.command == "list":
+        for ticker in store.tickers():
+            parts = []
+            for series in SERIES:
+                manifest = store.manifest(ticker, series)
+                if manifest["rows"]:
+                    parts.append(f"{series} {manifest['rows']} filas hasta {manifest['last']}")
+            print(f"{ticker}: {'; '.join(parts) or 'vacío'}")
+    else:
+        result = {ticker.upper(): calibrate(store, ticker) for ticker in (args.tickers or store.tickers())}
+        print(json.dumps(result, indent=2))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,204 @@
+"""
+Instrumentación opcional: spans de tiempo y contadores
+Desactivada por defecto. Se activa con MBAI_METRICS=1 (antes de importar el motor);
+exporta en formato Prometheus o JSON.
+"""
+
+import bisect
+import functools
+import json
+import logging
+import os
+import threading
+import time
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from typing import Dict, List, Optional
+
+
+logger = logging.getLogger("engine.metrics")
+
+# Límites superiores (segundos) de los buckets del histograma
+BUCKETS = (0.00001, 0.00005, 0.0001, 0.0005, 0.001, 0.005, 0.01, 0.05, 0.1, 0.5, 1.0, 5.0)
+
+_enabled = os.environ.get("MBAI_METRICS", "") not in ("", "0", "false")
+_lock = threading.Lock()
+
+
+class _SpanStats:
+    __slots__ = ("count", "total", "max", "buckets")
+
+    def __init__(self):
+        self.count = 0
+        self.total = 0.0
+        self.max = 0.0
+        self.buckets = [0] * (len(BUCKETS) + 1)  # el último es +Inf
+
+    def observe(self, seconds: float):
+        self.count += 1
+        self.total += seconds
+        if seconds > self.max:
+            self.max = seconds
+        self.buckets[bisect.bisect_left(BUCKETS, seconds)] += 1
+
+
+_spans: Dict[str, _SpanStats] = {}
+_counters: Dict[str, int] = {}
+
+
+def enabled() -> bool:
+    return _enabled
+
+
+def enable(on: bool = True):
+    global _enabled
+    _enabled = on
+
+
+def reset():
+    with _lock:
+        _spans.clear()
+        _counters.clear()
+
+
+def observe(name: str, seconds: float):
+    with _lock:
+        stats = _spans.get(name)
+        if stats is None:
+            stats = _spans[name] = _SpanStats()
+        stats.observe(seconds)
+
+
+def count(name: str, n: int = 1):
+    """Incrementa un contador (p.ej. cache.hit / cache.miss)"""
+    if not _enabled:
+        return
+    with _lock:
+        _counters[name] = _counters.get(name, 0) + n
+
+
+class _Span:
+    __slots__ = ("name", "start")
+
+    def __init__(self, name: str):
+        self.name = name
+
+    def __enter__(self):
+        self.start = time.perf_counter()
+        return self
+
+    def __exit__(self, *exc):
+        observe(self.name, time.perf_counter() - self.start)
+        return False
+
+
+class _NoopSpan:
+    __slots__ = ()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        return False
+
+
+_NOOP = _NoopSpan()
+
+
+def span(name: str):
+    """Context manager que mide un bloque: `with span("snapshot.fetch"): ...`"""
+    return _Span(name) if _enabled else _NOOP
+
+
+def timed(name: str):
+    """
+    Decorador que mide cada llamada a la función.
+    Si la instrumentación está desactivada al importar, retorna la función
+    original (coste cero); enable() posterior solo afecta a span() y count().
+    """
+    def decorator(func):
+        if not _enabled:
+            return func
+
+        @functools.wraps(func)
+        def wrapper(*args, **kwargs):
+            if not _enabled:
+                return func(*args, **kwargs)
+            start = time.perf_counter()
+            try:
+                return func(*args, **kwargs)
+            finally:
+                observe(name, time.perf_counter() - start)
+        return wrapper
+    return decorator
+
+
+def snapshot() -> Dict:
+    """Métricas actuales como dict (para logs estructurados o JSON)"""
+    with _lock:
+        spans = {
+            name: {
+                "count": s.count,
+                "total_s": round(s.total, 6),
+                "mean_ms": round(s.total / s.count * 1000, 4) if s.count else 0.0,
+                "max_ms": round(s.max * 1000, 4),
+            }
+            for name, s in _spans.items()
+        }
+        return {"spans": spans, "counters": dict(_counters)}
+
+
+def log_metrics(level: int = logging.INFO):
+    """Emite las métricas como una línea JSON en el logger engine.metrics"""
+    logger.log(level, json.dumps({"metrics": snapshot()}, ensure_ascii=False))
+
+
+def _metric_name(name: str) -> str:
+    return "".join(c if c.isalnum() else "_" for c in name)
+
+
+def prometheus_text() -> str:
+    """Métricas en formato de texto de Prometheus"""
+    lines: List[str] = []
+    with _lock:
+        if _spans:
+            lines.append("# TYPE mbai_span_seconds histogram")
+        for name, s in sorted(_spans.items()):
+            cumulative = 0
+            for bound, n in zip(BUCKETS + (float("inf"),), s.buckets):
+                cumulative += n
+                le = "+Inf" if bound == float("inf") else repr(bound)
+                lines.append(f'mbai_span_seconds_bucket{{span="{name}",le="{le}"}} {cumulative}')
+            lines.append(f'mbai_span_seconds_sum{{span="{name}"}} {s.total:.9f}')
+            lines.append(f'mbai_span_seconds_count{{span="{name}"}} {s.count}')
+        for name, value in sorted(_counters.items()):
+            metric = f"mbai_{_metric_name(name)}_total"
+            lines.append(f"# TYPE {metric} counter")
+            lines.append(f"{metric} {value}")
+    return "\n".join(lines) + "\n"
+
+
+class _MetricsHandler(BaseHTTPRequestHandler):
+    def do_GET(self):
+        if self.path.rstrip("/") not in ("/metrics", ""):
+            self.send_error(404)
+            return
+        body = prometheus_text().encode()
+        self.send_response(200)
+        self.send_header("Content-Type", "text/plain; version=0.0.4")
+        self.send_header("Content-Length", str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+
+    def log_message(self, *args):
+        pass
+
+
+def start_metrics_server(port: int = 9464, host: str = "127.0.0.1") -> Optional[ThreadingHTTPServer]:
+    """Sirve /metrics en un hilo daemon. Retorna None si el puerto está ocupado."""
+    try:
+        server = ThreadingHTTPServer((host, port), _MetricsHandler)
+    except OSError as e:
+        logger.warning("No se pudo abrir el endpoint de métricas en %s:%s (%s)", host, port, e)
+        return None
+    threading.Thread(target=server.serve_forever, name="metrics", daemon=True).start()
+    return server
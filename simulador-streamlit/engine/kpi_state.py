@@ -0,0 +1,144 @@
+"""
+Estado compacto de KPIs e historial columnar
+KPIState usa __slots__ (sin dict por instancia) y KPIHistory un array preasignado
+"""
+
+from typing import Dict, Iterator, Tuple
+
+import numpy as np
+
+
+# Orden canónico de los KPIs (columnas del historial y del motor vectorizado)
+KPI_FIELDS = (
+    "cash", "revenue", "ebitda", "profit_margin", "debt",
+    "efficiency", "quality_score", "production_capacity",
+    "employees", "satisfaction", "productivity", "turnover_rate",
+    "brand_reputation", "market_share", "customer_satisfaction",
+    "ai_agents", "automation_level", "compute_cost",
+)
+
+KPI_INDEX = {name: i for i, name in enumerate(KPI_FIELDS)}
+
+
+class KPIState:
+    """
+    KPIs de una partida. Se accede como a un dict (kpis["cash"] += ...)
+    para no cambiar el código existente, pero sin el coste de un dict.
+    """
+
+    __slots__ = KPI_FIELDS
+
+    def __init__(self, **values):
+        for name in KPI_FIELDS:
+            setattr(self, name, values[name])
+
+    def __getitem__(self, name: str):
+        if name not in KPI_INDEX:
+            raise KeyError(name)
+        return getattr(self, name)
+
+    def __setitem__(self, name: str, value):
+        if name not in KPI_INDEX:
+            raise KeyError(name)
+        setattr(self, name, value)
+
+    def __contains__(self, name) -> bool:
+        return name in KPI_INDEX
+
+    def __iter__(self) -> Iterator[str]:
+        return iter(KPI_FIELDS)
+
+    def __len__(self) -> int:
+        return len(KPI_FIELDS)
+
+    def __eq__(self, other) -> bool:
+        if isinstance(other, KPIState):
+            return self.row() == other.row()
+        return NotImplemented
+
+    def __repr__(self) -> str:
+        return f"KPIState({self.as_dict()!r})"
+
+    def keys(self) -> Tuple[str, ...]:
+        return KPI_FIELDS
+
+    def values(self) -> list:
+        return [getattr(self, name) for name in KPI_FIELDS]
+
+    def items(self) -> list:
+        return [(name, getattr(self, name)) for name in KPI_FIELDS]
+
+    def get(self, name: str, default=None):
+        return getattr(self, name) if name in KPI_INDEX else default
+
+    def row(self) -> Tuple:
+        """Valores en el orden de KPI_FIELDS"""
+        return tuple(getattr(self, name) for name in KPI_FIELDS)
+
+    def as_dict(self) -> Dict:
+        return {name: getattr(self, name) for name in KPI_FIELDS}
+
+    def copy(self) -> "KPIState":
+        clone = KPIState.__new__(KPIState)
+        for name in KPI_FIELDS:
+            setattr(clone, name, getattr(self, name))
+        return clone
+
+
+class KPIHistory:
+    """
+    Historial de KPIs por turno en un array (turnos × KPIs) preasignado.
+    column("cash") devuelve una vista sin copiar ni reconstruir listas.
+    fork() comparte el array hasta que una de las dos copias añade un turno.
+    """
+
+    def __init__(self, capacity: int):
+        self._data = np.empty((max(capacity, 1), len(KPI_FIELDS)))
+        self._size = 0
+        self._shared = False
+
+    def fork(self) -> "KPIHistory":
+        """Copia perezosa (copy-on-write) del historial"""
+        clone = KPIHistory.__new__(KPIHistory)
+        clone._data = self._data
+        clone._size = self._size
+        clone._shared = self._shared = True
+        return clone
+
+    def append(self, kpis: KPIState):
+        if self._shared:
+            self._data = self._data.copy()
+            self._shared = False
+        if self._size == len(self._data):
+            # Partidas con turnos extra: duplicar capacidad
+            grown = np.empty((len(self._data) * 2, len(KPI_FIELDS)))
+            grown[:self._size] = self._data[:self._size]
+            self._data = grown
+        self._data[self._size] = kpis.row()
+        self._size += 1
+
+    def __len__(self) -> int:
+        return self._size
+
+    def column(self, name: str) -> np.ndarray:
+        """Serie de un KPI (vista de solo lectura)"""
+        view = self._data[:self._size, KPI_INDEX[name]]
+        view.flags.writeable = False
+        return view
+
+    def as_array(self) -> np.ndarray:
+        """Todo el historial (turnos × KPIs), vista de solo lectura"""
+        view = self._data[:self._size]
+        view.flags.writeable = False
+        return view
+
+    def __getitem__(self, turn_index: int) -> Dict[str, float]:
+        if turn_index < 0:
+            turn_index += self._size
+        if not 0 <= turn_index < self._size:
+            raise IndexError(turn_index)
+        return dict(zip(KPI_FIELDS, self._data[turn_index].tolist()))
+
+    def __iter__(self) -> Iterator[Dict[str, float]]:
+        for i in range(self._size):
+            yield self[i]
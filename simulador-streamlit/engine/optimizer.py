@@ -0,0 +1,263 @@
+"""
+Búsqueda de la mejor secuencia de acciones para una empresa
+Beam search turno a turno sobre (rol, acción, intensidad): cada candidato se
+evalúa con un fork() del estado del padre (sin rejugar desde el turno 1) y con varias
+semillas a la vez. Las evaluaciones se reparten en un pool de procesos.
+
+    python -m engine optimize TSLA --mode ai_native --objective cash --beam 8
+"""
+
+import argparse
+import json
+import os
+import time
+from concurrent.futures import ProcessPoolExecutor
+from typing import Dict, List, Mapping, Optional, Sequence, Tuple
+
+from .actions import get_registry
+from .estimator import Estimator, MomentEstimate
+from .frozen_snapshot import intern_snapshot
+from .game_engine import GameEngine
+from .kpi_state import KPI_FIELDS, KPI_INDEX
+from .rng import derive_seed
+
+
+# Jugada de un turno: (rol, acción, intensidad) o None (no hacer nada)
+Move = Optional[Tuple[str, str, int]]
+
+OBJECTIVES: Dict[str, Dict[str, float]] = {
+    "cash": {"cash": 1.0},
+    "revenue": {"revenue": 1.0},
+    "efficiency": {"efficiency": 1.0},
+    "balanced": {
+        "cash": 1.0, "revenue": 1.0, "efficiency": 1.0, "satisfaction": 1.0,
+        "brand_reputation": 1.0, "market_share": 1.0, "debt": -1.0,
+    },
+}
+
+
+class Objective:
+    """
+    Suma ponderada de KPIs, cada uno relativo a su valor inicial
+    (así se pueden mezclar caja en dólares y eficiencia en %).
+    """
+
+    def __init__(self, weights: Mapping[str, float]):
+        unknown = set(weights) - set(KPI_INDEX)
+        if unknown:
+            raise ValueError(f"KPIs desconocidos en el objetivo: {', '.join(sorted(unknown))}")
+        self.weights = dict(weights)
+
+    @classmethod
+    def parse(cls, spec: str) -> "Objective":
+        """Nombre predefinido ("cash", "balanced"...) o pesos "cash=1,efficiency=0.5" """
+        if spec in OBJECTIVES:
+            return cls(OBJECTIVES[spec])
+        weights = {}
+        for part in spec.split(","):
+            name, _, weight = part.partition("=")
+            weights[name.strip()] = float(weight) if weight else 1.0
+        return cls(weights)
+
+    def score(self, kpis, baseline: Mapping[str, float]) -> float:
+        return sum(weight * kpis[name] / (abs(baseline[name]) or 1.0)
+                   for name, weight in self.weights.items())
+
+
+def candidate_moves(intensities: Sequence[int] = (50, 100), include_idle: bool = True) -> List[Move]:
+    """Todas las acciones del registro con cada intensidad (y opcionalmente no hacer nada)"""
+    moves: List[Move] = [None] if include_idle else []
+    for spec in get_registry():
+        for intensity in intensities:
+            moves.append((spec.role, spec.key, intensity))
+    return moves
+
+
+def _play_move(game: GameEngine, move: Move) -> GameEngine:
+    """Copia de la partida tras aplicar la jugada y avanzar el turno"""
+    child = game.fork()
+    if move is not None:
+        child.execute_action(*move)
+    child.advance_turn()
+    return child
+
+
+def _score_moves(games: List[GameEngine], moves: List[Move], objective: Objective,
+                 baseline: Mapping[str, float]) -> List[float]:
+    """Puntuación media (sobre las semillas) de cada jugada a partir de `games`"""
+    scores = []
+    for move in moves:
+        total = sum(objective.score(_play_move(game, move).kpis, baseline) for game in games)
+        scores.append(total / len(games))
+    return scores
+
+
+# Estado de cada proceso del pool (se envía una vez al arrancar)
+_WORKER: Dict = {}
+
+
+def _init_worker(snapshot: Dict, objective: Objective, baseline: Dict[str, float]):
+    _WORKER.update(snapshot=intern_snapshot(snapshot), objective=objective, baseline=baseline)
+
+
+def _score_moves_worker(states: List[bytes], moves: List[Move]) -> List[float]:
+    games = [GameEngine.from_bytes(state, snapshot=_WORKER["snapshot"]) for state in states]
+    return _score_moves(games, moves, _WORKER["objective"], _WORKER["baseline"])
+
+
+def _surrogate_moves(estimator: Estimator, games: List[GameEngine], moves: List[Move],
+                     objective: Objective, baseline: Mapping[str, float], keep: int) -> List[Move]:
+    """
+    Preselección con el estimador analítico: como el objetivo es lineal, su
+    valor esperado es el objetivo sobre la media proyectada (sin simular).
+    """
+    start = MomentEstimate.from_games(games)
+    ranked = []
+    for move in moves:
+        estimate = start
+        if move is not None:
+            estimate = estimator.apply_action(estimate, *move)
+        mean = estimator.advance_turn(estimate).mean
+        ranked.append((objective.score(dict(zip(KPI_FIELDS, mean)), baseline), move))
+    ranked.sort(key=lambda item: item[0], reverse=True)
+    return [move for _, move in ranked[:keep]]
+
+
+def _chunks(items: List, n: int) -> List[List]:
+    size = max(1, -(-len(items) // n))
+    return [items[i:i + size] for i in range(0, len(items), size)]
+
+
+def optimize(snapshot: Dict, game_mode: str = "traditional", industry_type: str = "tech",
+             objective: Optional[Objective] = None, beam_width: int = 8, seeds: int = 4,
+             intensities: Sequence[int] = (50, 100), base_seed: int = 0,
+             workers: Optional[int] = None, top: int = 5,
+             surrogate_keep: Optional[int] = None) -> Dict:
+    """
+    Beam search sobre los 12 turnos. Cada nodo del beam son `seeds` partidas
+    (mismas jugadas, distintas semillas); los hijos heredan el estado de los
+    generadores, así que todas las jugadas se comparan con los mismos sorteos.
+    Con `surrogate_keep` solo se simulan las mejores jugadas según el estimador.
+    """
+    objective = objective or Objective(OBJECTIVES["cash"])
+    ticker = snapshot.get("ticker", "")
+    roots = [
+        GameEngine(ticker, snapshot.get("company_name", ticker), snapshot,
+                   industry_type=industry_type, game_mode=game_mode,
+                   seed=derive_seed(base_seed, f"optimize:{i}"))
+        for i in range(seeds)
+    ]
+    baseline = roots[0].kpis.as_dict()
+    moves = candidate_moves(intensities)
+    workers = os.cpu_count() if workers is None else workers
+    estimator = Estimator.for_game(roots[0]) if surrogate_keep else None
+
+    # Beam: (puntuación, plan, partidas por semilla)
+    beam = [(objective.score(roots[0].kpis, baseline), [], roots)]
+    evaluations = 0
+    started = time.perf_counter()
+
+    pool = None
+    if workers > 1:
+        pool = ProcessPoolExecutor(max_workers=workers, initializer=_init_worker,
+                                   initargs=(snapshot, objective, baseline))
+    try:
+        while beam[0][2][0].current_turn < beam[0][2][0].max_turns:
+            node_moves = [
+                _surrogate_moves(estimator, games, moves, objective, baseline, surrogate_keep)
+                if estimator else moves
+                for _, _, games in beam
+            ]
+            if pool is not None:
+                # Cada nodo se serializa una vez y sus jugadas se reparten en trozos
+                tasks = []
+                for index, (_, _, games) in enumerate(beam):
+                    states = [game.to_bytes() for game in games]
+                    per_node = max(1, workers // len(beam))
+                    for chunk in _chunks(node_moves[index], per_node):
+                        tasks.append((index, chunk, pool.submit(_score_moves_worker, states, chunk)))
+                scored = []
+                for index, chunk, future in tasks:
+                    scored.extend((s, index, m) for s, m in zip(future.result(), chunk))
+            else:
+                scored = [
+                    (s, index, m)
+                    for index, (_, _, games) in enumerate(beam)
+                    for s, m in zip(_score_moves(games, node_moves[index], objective, baseline),
+                                    node_moves[index])
+                ]
+            evaluations += len(scored) * seeds
+
+            # Los mejores hijos pasan al siguiente turno (se rehacen en este proceso)
+            scored.sort(key=lambda item: item[0], reverse=True)
+            beam = [
+                (score, beam[index][1] + [move], [_play_move(game, move) for game in beam[index][2]])
+                for score, index, move in scored[:beam_width]
+            ]
+    finally:
+        if pool is not None:
+            pool.shutdown()
+
+    elapsed = time.perf_counter() - started
+    plans = []
+    for score, plan, games in beam[:top]:
+        final = {name: sum(game.kpis[name] for game in games) / len(games)
+                 for name in KPI_INDEX}
+        plans.append({
+            "score": round(score, 6),
+            "plan": [list(move) if move else None for move in plan],
+            "kpis": final,
+        })
+    return {
+        "ticker": ticker,
+        "game_mode": game_mode,
+        "industry": industry_type,
+        "objective": objective.weights,
+        "beam_width": beam_width,
+        "seeds": seeds,
+        "surrogate_keep": surrogate_keep,
+        "evaluations": evaluations,
+        "elapsed_s": round(elapsed, 3),
+        "plans": plans,
+    }
+
+
+def main(argv: Optional[Sequence[str]] = None):
+    parser = argparse.ArgumentParser(prog="python -m engine optimize",
+                                     description="Busca la mejor secuencia de acciones")
+    parser.add_argument("ticker")
+    parser.add_argument("--mode", default="traditional", choices=["traditional", "ai_native"])
+    parser.add_argument("--industry", default="tech")
+    parser.add_argument("--objective", default="cash",
+                        help=f"{', '.join(OBJECTIVES)} o pesos: cash=1,efficiency=0.5")
+    parser.add_argument("--beam", type=int, default=8, help="Secuencias que se conservan por turno")
+    parser.add_argument("--seeds", type=int, default=4, help="Partidas por secuencia")
+    parser.add_argument("--intensities", type=int, nargs="+", default=[50, 100])
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument("--workers", type=int, default=None)
+    parser.add_argument("--top", type=int, default=5)
+    parser.add_argument("--surrogate", type=int, default=None, metavar="N",
+                        help="Simular solo las N mejores jugadas según el estimador analítico")
+    parser.add_argument("--snapshot-dir", help="Directorio con <TICKER>.json (sin red)")
+    parser.add_argument("--out", help="Fichero JSON de salida (por defecto stdout)")
+    args = parser.parse_args(argv)
+
+    from .sweep import _load_snapshots
+    snapshot = _load_snapshots([args.ticker], args.snapshot_dir).get(args.ticker.upper())
+    if not snapshot:
+        raise SystemExit(f"No se encontraron datos para {args.ticker}")
+
+    result = optimize(snapshot, args.mode, args.industry, Objective.parse(args.objective),
+                      beam_width=args.beam, seeds=args.seeds, intensities=args.intensities,
+                      base_seed=args.seed, workers=args.workers, top=args.top,
+                      surrogate_keep=args.surrogate)
+    text = json.dumps(result, ensure_ascii=False, indent=2)
+    if args.out:
+        with open(args.out, "w", encoding="utf-8") as f:
+            f.write(text + "\n")
+    else:
+        print(text)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,136 @@
+"""
+Parámetros de simulación por empresa e industria
+Se compilan una vez a partir de translate_to_game_variables(snapshot) y se
+guardan junto al snapshot internado: durante la partida solo se leen.
+
+    probabilidad de crisis     riesgo financiero (beta, deuda, liquidez, márgenes) × industria
+    banda de crecimiento       etapa (crecimiento / madura) e industria; anchura según volatilidad
+    caída de satisfacción      salud financiera
+    multiplicadores por rol    qué palancas funcionan mejor en esta empresa
+
+Si hay histórico (engine.history_store), el crecimiento observado de los
+ingresos sustituye a la banda estimada y la volatilidad de la cotización
+escala la probabilidad de crisis.
+"""
+
+from typing import Dict, Mapping, Optional, Tuple
+
+from .finance_engine import translate_to_game_variables
+from .frozen_snapshot import intern_snapshot
+from .history_store import calibration_for, history_version
+
+
+# Ajustes por industria: (factor de crisis, desplazamiento del crecimiento, multiplicadores por rol)
+INDUSTRIES: Dict[str, Tuple[float, float, Dict[str, float]]] = {
+    "tech": (1.0, 0.003, {"CAIO": 1.15}),
+    "retail": (1.0, 0.0, {"CMO": 1.1}),
+    "finance": (0.9, -0.002, {"CFO": 1.1, "CAIO": 1.05}),
+    "healthcare": (0.9, 0.001, {"CHRO": 1.05}),
+    "manufacturing": (1.15, -0.002, {"COO": 1.1}),
+}
+
+# Semianchura de la banda de crecimiento según la volatilidad de mercado
+GROWTH_SPREAD = {"low": 0.006, "medium": 0.010, "high": 0.014}
+GROWTH_CENTER = {"growth": 0.017, "mature": 0.011}
+SATISFACTION_DECAY = {"strong": (0, 2), "moderate": (0, 3), "weak": (0, 4)}
+
+LEVEL = {"high": 1.1, "medium": 1.0, "low": 0.9}
+
+# Volatilidad anual de referencia (la de una empresa de riesgo medio)
+REFERENCE_VOLATILITY = 0.30
+
+
+class GameParameters:
+    """Parámetros de una partida (inmutables; compartidos por todas las partidas de la empresa)"""
+
+    __slots__ = ("crisis_probability", "growth_band", "satisfaction_decay", "role_multipliers")
+
+    def __init__(self, crisis_probability: float = 0.15,
+                 growth_band: Tuple[float, float] = (0.005, 0.025),
+                 satisfaction_decay: Tuple[int, int] = (0, 3),
+                 role_multipliers: Mapping[str, float] = ()):
+        self.crisis_probability = crisis_probability
+        self.growth_band = growth_band
+        self.satisfaction_decay = satisfaction_decay
+        self.role_multipliers = dict(role_multipliers)
+
+    def multiplier(self, role: str) -> float:
+        return self.role_multipliers.get(role, 1.0)
+
+    @classmethod
+    def from_dict(cls, data: Mapping) -> "GameParameters":
+        """Inversa de as_dict()"""
+        return cls(data["crisis_probability"], tuple(data["growth_band"]),
+                   tuple(data["satisfaction_decay"]), data["role_multipliers"])
+
+    def as_dict(self) -> Dict:
+        return {
+            "crisis_probability": self.crisis_probability,
+            "growth_band": list(self.growth_band),
+            "satisfaction_decay": list(self.satisfaction_decay),
+            "role_multipliers": dict(self.role_multipliers),
+        }
+
+    def __repr__(self) -> str:
+        return f"GameParameters({self.as_dict()})"
+
+
+# Valores fijos anteriores (snapshots sin datos suficientes)
+DEFAULT_PARAMETERS = GameParameters()
+
+
+def compile_parameters(snapshot: Mapping, industry_type: str = "tech",
+                       calibration: Optional[Mapping] = None) -> GameParameters:
+    """Tabla de parámetros de una empresa (sin caché; ver get_parameters)"""
+    try:
+        variables = translate_to_game_variables(snapshot)
+    except (KeyError, TypeError):
+        return DEFAULT_PARAMETERS
+    crisis_factor, growth_shift, industry_roles = INDUSTRIES.get(industry_type, INDUSTRIES["tech"])
+
+    # Puntuación de riesgo 0..1 -> 8%..28% por turno (15% ≈ riesgo medio)
+    crisis_probability = (0.08 + 0.2 * variables["crisis_probability"]) * crisis_factor
+
+    center = GROWTH_CENTER[variables["maturity_stage"]] + growth_shift
+    spread = GROWTH_SPREAD[variables["market_volatility"]]
+
+    calibration = calibration or {}
+    if "growth_mean" in calibration:
+        # Uniforme con la media y desviación observadas: semianchura = √3·σ
+        center = calibration["growth_mean"]
+        spread = min(0.03, max(0.002, 3 ** 0.5 * calibration["growth_std"]))
+    if "price_volatility" in calibration:
+        crisis_probability *= min(1.6, max(0.6, calibration["price_volatility"] / REFERENCE_VOLATILITY))
+
+    crisis_probability = round(min(0.5, crisis_probability), 4)
+    growth_band = (round(center - spread, 4) + 0.0, round(center + spread, 4))  # + 0.0: sin -0.0
+
+    workforce = variables["workforce_size"] or 0
+    size = variables["company_size"]
+    roles = {
+        "CEO": {"high": 1.05, "medium": 1.0, "low": 0.95}[variables["profitability"]],
+        "CFO": {"strong": 1.1, "moderate": 1.0, "weak": 0.9}[variables["financial_health"]],
+        "COO": LEVEL[variables["operational_efficiency"]],
+        # Mover la marca o la plantilla de una empresa enorme cuesta más
+        "CMO": 0.9 if size == "mega_cap" else 1.1 if size in ("mid_cap", "small_cap") else 1.0,
+        "CHRO": 0.9 if workforce > 100_000 else 1.1 if workforce < 10_000 else 1.0,
+        "CAIO": 1.0,
+    }
+    for role, multiplier in industry_roles.items():
+        roles[role] = round(roles[role] * multiplier, 4)
+
+    return GameParameters(crisis_probability, growth_band,
+                          SATISFACTION_DECAY[variables["financial_health"]], roles)
+
+
+def get_parameters(snapshot: Mapping, industry_type: str = "tech") -> GameParameters:
+    """
+    Parámetros de la empresa (calibrados con su histórico si lo hay),
+    calculados una vez por snapshot internado, industria y versión del
+    histórico: una ingesta posterior (o cambiar de almacén) los recalcula.
+    """
+    frozen = intern_snapshot(snapshot)
+    ticker = frozen.get("ticker", "")
+    return frozen.derived(
+        ("parameters", industry_type, history_version(ticker)),
+        lambda frozen: compile_parameters(frozen, industry_type, calibration_for(ticker)))
@@ -0,0 +1,174 @@
+"""
+Descarga masiva de snapshots con paralelismo acotado
+Reintentos con backoff, timeout por intento y resultados parciales
+"""
+
+import heapq
+import queue
+import threading
+import time
+from concurrent.futures import FIRST_COMPLETED, Future, wait
+from typing import Callable, Dict, List, Optional, Sequence, Set, Tuple
+
+from .snapshot_store import SnapshotFetcher, SnapshotStore
+
+
+class FetchTimeout(Exception):
+    """La descarga de un ticker superó su timeout"""
+
+
+class _Workers:
+    """
+    Hilos daemon (como máximo `size`) que ejecutan los intentos. Se crea un
+    hilo nuevo solo cuando todos los existentes están ocupados, así que cada
+    intento empieza al momento mientras haya menos de `size` en marcha.
+    Una llamada bloqueada en red no se puede cancelar: al vencer su timeout se
+    abandona, pero sigue ocupando su hilo, así que nunca hay más de `size`
+    descargas en marcha ni hilos fuera del límite. Al ser daemon, un intento
+    colgado no impide que el proceso termine.
+    """
+
+    def __init__(self, size: int):
+        self.size = size
+        self._tasks: "queue.Queue[Optional[Tuple[Future, Callable]]]" = queue.Queue()
+        self._threads: List[threading.Thread] = []
+        self._pending = 0  # intentos enviados que aún no han terminado
+        self._lock = threading.Lock()
+
+    def _run(self):
+        while True:
+            task = self._tasks.get()
+            if task is None:
+                return
+            future, call = task
+            try:
+                result, error = call(), None
+            except BaseException as e:
+                result, error = None, e
+            # Antes de publicar el resultado: quien lo vea ya cuenta este hilo como libre
+            with self._lock:
+                self._pending -= 1
+            if error is None:
+                future.set_result(result)
+            else:
+                future.set_exception(error)
+
+    def submit(self, call: Callable) -> Future:
+        future: Future = Future()
+        with self._lock:
+            self._pending += 1
+            if self._pending > len(self._threads) and len(self._threads) < self.size:
+                thread = threading.Thread(target=self._run, name=f"prefetch-{len(self._threads)}",
+                                          daemon=True)
+                self._threads.append(thread)
+                thread.start()
+        self._tasks.put((future, call))
+        return future
+
+    def shutdown(self):
+        with self._lock:
+            threads = len(self._threads)
+        for _ in range(threads):
+            self._tasks.put(None)
+
+
+def fetch_many(tickers: Sequence[str], fetcher: SnapshotFetcher, max_workers: int = 8,
+               retries: int = 2, backoff: float = 0.5, timeout: float = 15.0,
+               store: Optional[SnapshotStore] = None) -> Dict:
+    """
+    Descarga varios tickers en paralelo (como máximo max_workers a la vez,
+    contando los intentos que vencieron su timeout pero siguen bloqueados).
+
+    Returns:
+        {"snapshots": {ticker: snapshot}, "errors": {ticker: mensaje},
+         "store_errors": {ticker: mensaje}, "attempts": {ticker: n}, "elapsed_s": segundos}
+        Los snapshots tienen el mismo formato que get_company_snapshot
+        (top_10, deep_data) y se pueden pasar directamente a GameEngine.
+        Un fallo al guardar en `store` solo se anota en store_errors.
+    """
+    unique = list(dict.fromkeys(t.upper() for t in tickers))
+    started = time.perf_counter()
+    snapshots, errors, store_errors = {}, {}, {}
+    attempts = {ticker: 0 for ticker in unique}
+    last_error: Dict[str, str] = {}
+
+    # Turnos de descarga: (instante a partir del cual se puede lanzar, orden, ticker)
+    ready: List[Tuple[float, int, str]] = [(0.0, i, t) for i, t in enumerate(unique)]
+    heapq.heapify(ready)
+    order = len(unique)
+    active: Dict[Future, Tuple[str, float]] = {}  # intento en curso -> (ticker, deadline)
+    busy: Set[Future] = set()  # hilos ocupados (en curso o abandonados por timeout)
+
+    def finish_attempt(ticker: str, error: Optional[str]):
+        """Tras un intento fallido: reintento con backoff o error definitivo"""
+        nonlocal order
+        last_error[ticker] = error
+        if attempts[ticker] <= retries:
+            delay = backoff * (2 ** (attempts[ticker] - 1))
+            heapq.heappush(ready, (time.monotonic() + delay, order, ticker))
+            order += 1
+        else:
+            errors[ticker] = last_error[ticker]
+
+    def save(ticker: str, snapshot: Dict):
+        snapshots[ticker] = snapshot
+        if store is not None:
+            try:
+                store.put(snapshot)
+            except Exception as e:
+                store_errors[ticker] = f"{type(e).__name__}: {e}"
+
+    max_workers = max(1, max_workers)
+    workers = _Workers(max_workers)
+    try:
+        while ready or active:
+            now = time.monotonic()
+            while ready and ready[0][0] <= now and len(busy) < max_workers:
+                _, _, ticker = heapq.heappop(ready)
+                attempts[ticker] += 1
+                future = workers.submit(lambda t=ticker: fetcher.fetch(t))
+                active[future] = (ticker, now + timeout)
+                busy.add(future)
+
+            # Esperar al primer intento que termine, venza o pueda reintentarse
+            wakeups = [deadline for _, deadline in active.values()]
+            if ready and len(busy) < max_workers:
+                wakeups.append(ready[0][0])
+            stalled = not wakeups  # todos los hilos bloqueados en intentos abandonados
+            wait_s = max(0.0, min(wakeups) - time.monotonic()) if wakeups else timeout
+            done, _ = wait(busy, timeout=wait_s, return_when=FIRST_COMPLETED)
+            if stalled and not done:
+                # Ningún hilo se ha liberado en `timeout`: no se espera más
+                while ready:
+                    _, _, ticker = heapq.heappop(ready)
+                    errors[ticker] = last_error.get(ticker) or "FetchTimeout: sin hilos libres"
+
+            for future in done:
+                busy.discard(future)
+                if future not in active:
+                    continue  # intento abandonado que por fin terminó
+                ticker, _ = active.pop(future)
+                error = future.exception()
+                if error is not None:
+                    finish_attempt(ticker, f"{type(error).__name__}: {error}")
+                elif not future.result():
+                    # Ticker inexistente: reintentar no sirve de nada
+                    errors[ticker] = "sin datos"
+                else:
+                    save(ticker, future.result())
+
+            now = time.monotonic()
+            for future, (ticker, deadline) in list(active.items()):
+                if deadline <= now:
+                    del active[future]  # sigue en busy hasta que termine
+                    finish_attempt(ticker, f"FetchTimeout: timeout tras {timeout:.1f}s")
+    finally:
+        workers.shutdown()
+
+    return {
+        "snapshots": snapshots,
+        "errors": errors,
+        "store_errors": store_errors,
+        "attempts": attempts,
+        "elapsed_s": round(time.perf_counter() - started, 3),
+    }
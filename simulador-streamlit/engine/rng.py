@@ -0,0 +1,59 @@
+"""
+Generadores aleatorios reproducibles
+Cada partida tiene su propia semilla y sub-streams independientes
+"""
+
+import hashlib
+import random
+from typing import Dict, Optional, Tuple
+
+
+# Sub-streams de cada partida: inicialización, evolución natural y crisis
+STREAMS = ("init", "evolution", "crisis")
+
+
+def new_seed() -> int:
+    """Semilla de 64 bits con entropía del sistema"""
+    return random.SystemRandom().getrandbits(64)
+
+
+def derive_seed(seed: int, stream: str) -> int:
+    """Semilla estable para un sub-stream (independiente del proceso y de PYTHONHASHSEED)"""
+    digest = hashlib.sha256(f"{seed}:{stream}".encode()).digest()
+    return int.from_bytes(digest[:8], "big")
+
+
+class AntitheticRandom(random.Random):
+    """
+    Variable antitética de random.Random con la misma semilla: cada sorteo es
+    el reflejo del original (U -> 1 - U, randint(a, b) -> a + b - x, choice
+    elige el elemento simétrico). Promediar una partida con su antitética
+    reduce la varianza de cualquier resultado monótono en los sorteos.
+    """
+
+    def random(self) -> float:
+        value = 1.0 - super().random()
+        return value if value < 1.0 else 0.0
+
+    def getrandbits(self, k: int) -> int:
+        return super().getrandbits(k) ^ ((1 << k) - 1)
+
+    def _randbelow(self, n: int) -> int:
+        # Reflejo exacto en [0, n) del sorteo original (mismo muestreo por
+        # rechazo que random.Random); complementar los bits no sería simétrico
+        k = n.bit_length()
+        r = super().getrandbits(k)
+        while r >= n:
+            r = super().getrandbits(k)
+        return n - 1 - r
+
+
+def make_streams(seed: Optional[int] = None, antithetic: bool = False) -> Tuple[int, Dict[str, random.Random]]:
+    """
+    Crea un random.Random (o AntitheticRandom) por sub-stream.
+    Retorna la semilla efectiva (para poder repetir la partida) y los generadores.
+    """
+    if seed is None:
+        seed = new_seed()
+    factory = AntitheticRandom if antithetic else random.Random
+    return seed, {name: factory(derive_seed(seed, name)) for name in STREAMS}
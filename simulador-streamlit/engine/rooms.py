@@ -0,0 +1,236 @@
+"""
+Salas multijugador: varios jugadores (un rol cada uno) sobre una misma empresa
+Las acciones se envían en paralelo y se aplican en orden a través de la cola
+de la sala; el turno avanza cuando todos los roles ocupados lo confirman.
+Coordinación en el proceso (hilos): las sesiones de Streamlit comparten el registro.
+Con un GameStore la partida de cada sala se guarda tras cada cambio y la sala se
+puede reabrir con su código aunque se haya cerrado por inactividad o reinicio.
+"""
+
+import queue
+import secrets
+import string
+import threading
+import time
+from concurrent.futures import Future
+from typing import Dict, List, Optional
+
+from .actions import get_registry
+from .game_engine import GameEngine
+from .game_store import GameStore
+
+
+ROOM_CODE_ALPHABET = string.ascii_uppercase + string.digits
+
+
+class RoomError(Exception):
+    """Operación no permitida en la sala (rol ocupado, turno ya confirmado...)"""
+
+
+class Room:
+    """
+    Una partida compartida. `revision` crece con cada cambio (jugadas, uniones,
+    confirmaciones); los clientes esperan cambios con wait_for_update().
+    Quien lea `game` fuera de los métodos de la sala (p.ej. para hacer un fork)
+    debe tomar `lock`: otros jugadores pueden estar moviendo la partida.
+    """
+
+    def __init__(self, room_id: str, game: GameEngine, store: Optional[GameStore] = None):
+        self.room_id = room_id
+        self.game = game
+        self.store = store
+        self.roles = tuple(get_registry().roles)
+        self.players: Dict[str, str] = {}      # rol -> player_id
+        self.committed: set = set()            # roles que han terminado el turno
+        self.log: List[Dict] = []              # jugadas aplicadas (rol, acción, mensaje)
+        self.revision = 0
+        self.last_activity = time.monotonic()
+        self._queue: "queue.Queue" = queue.Queue()
+        self.lock = threading.RLock()
+        self._changed = threading.Condition(self.lock)
+
+    # --- Roles ---
+
+    def role_of(self, player_id: str) -> Optional[str]:
+        with self.lock:
+            for role, player in self.players.items():
+                if player == player_id:
+                    return role
+        return None
+
+    def join(self, player_id: str, role: str):
+        """Reclama un rol (un jugador ocupa un solo rol; cambiar de rol libera el anterior)"""
+        if role not in self.roles:
+            raise RoomError(f"Rol desconocido: {role}")
+        with self.lock:
+            holder = self.players.get(role)
+            if holder is not None and holder != player_id:
+                raise RoomError(f"El rol {role} ya está ocupado")
+            previous = self.role_of(player_id)
+            if previous is not None and previous != role:
+                del self.players[previous]
+                self.committed.discard(previous)
+            self.players[role] = player_id
+            self._touch()
+
+    def leave(self, player_id: str):
+        with self.lock:
+            role = self.role_of(player_id)
+            if role is None:
+                return
+            del self.players[role]
+            self.committed.discard(role)
+            # Si solo faltaba este rol, el resto ya puede avanzar
+            self._maybe_advance()
+            self._touch()
+
+    # --- Jugadas ---
+
+    def submit(self, player_id: str, action: str, intensity: int = 50) -> str:
+        """
+        Encola la acción del rol del jugador y la aplica. Los envíos simultáneos
+        se aplican de uno en uno, en el orden de llegada a la cola.
+        """
+        role = self.role_of(player_id)
+        if role is None:
+            raise RoomError("Primero elige un rol en la sala")
+        if get_registry().get(role, action) is None:
+            raise RoomError(f"Acción desconocida para {role}: {action}")
+
+        future: Future = Future()
+        self._queue.put((role, action, intensity, future))
+        self._drain()
+        return future.result()
+
+    def _drain(self):
+        with self.lock:
+            while True:
+                try:
+                    role, action, intensity, future = self._queue.get_nowait()
+                except queue.Empty:
+                    break
+                if role in self.committed:
+                    future.set_exception(RoomError(f"{role} ya confirmó el turno {self.game.current_turn}"))
+                    continue
+                try:
+                    message = self.game.execute_action(role, action, intensity)
+                except Exception as e:
+                    future.set_exception(e)
+                    continue
+                self.log.append({"turn": self.game.current_turn, "role": role,
+                                 "action": action, "intensity": intensity, "message": message})
+                future.set_result(message)
+                self._touch()
+
+    def commit(self, player_id: str) -> Optional[Dict]:
+        """
+        Confirma el turno del rol del jugador. Cuando todos los roles ocupados
+        han confirmado, avanza el turno y retorna el resultado de advance_turn().
+        """
+        role = self.role_of(player_id)
+        if role is None:
+            raise RoomError("Primero elige un rol en la sala")
+        with self.lock:
+            self._drain()
+            self.committed.add(role)
+            result = self._maybe_advance()
+            self._touch()
+            return result
+
+    def _maybe_advance(self) -> Optional[Dict]:
+        if not self.players or not set(self.players) <= self.committed:
+            return None
+        result = self.game.advance_turn()
+        self.committed.clear()
+        return result
+
+    # --- Notificación de cambios ---
+
+    def _touch(self):
+        self.revision += 1
+        self.last_activity = time.monotonic()
+        if self.store is not None:
+            self.store.put(self.game)
+        self._changed.notify_all()
+
+    def wait_for_update(self, since: int, timeout: Optional[float] = None) -> int:
+        """Bloquea hasta que revision > since (o vence el timeout); retorna la revisión"""
+        with self._changed:
+            self._changed.wait_for(lambda: self.revision > since, timeout)
+            return self.revision
+
+    def state(self) -> Dict:
+        with self.lock:
+            return {
+                **self.game.get_state(),
+                "room_id": self.room_id,
+                "revision": self.revision,
+                "players": dict(self.players),
+                "committed": sorted(self.committed),
+                "waiting_for": [r for r in self.players if r not in self.committed],
+                "log": self.log[-10:],
+            }
+
+
+def room_game_id(room_id: str) -> str:
+    """game_id con el que se guarda en el GameStore la partida de una sala"""
+    return f"room-{room_id}"
+
+
+class RoomRegistry:
+    """
+    Salas activas del proceso, por código. Con `store` las partidas de las
+    salas se guardan en él y get() reabre una sala cerrada a partir de su
+    partida guardada (los jugadores vuelven a elegir rol).
+    """
+
+    def __init__(self, code_length: int = 6, store: Optional[GameStore] = None):
+        self.code_length = code_length
+        self.store = store
+        self._rooms: Dict[str, Room] = {}
+        self._lock = threading.Lock()
+
+    def create(self, game: GameEngine) -> Room:
+        with self._lock:
+            while True:
+                code = "".join(secrets.choice(ROOM_CODE_ALPHABET) for _ in range(self.code_length))
+                if code not in self._rooms and (self.store is None or room_game_id(code) not in self.store):
+                    break
+            if self.store is not None:
+                # La partida es nueva: toma el id de la sala para poder reabrirla
+                game.game_id = room_game_id(code)
+                self.store.put(game)
+            room = self._rooms[code] = Room(code, game, self.store)
+            return room
+
+    def get(self, room_id: str) -> Optional[Room]:
+        code = room_id.strip().upper()
+        with self._lock:
+            room = self._rooms.get(code)
+            if room is not None or self.store is None:
+                return room
+            game = self.store.get(room_game_id(code))
+            if game is None:
+                return None
+            room = self._rooms[code] = Room(code, game, self.store)
+            return room
+
+    def remove(self, room_id: str):
+        with self._lock:
+            self._rooms.pop(room_id, None)
+
+    def close_idle(self, max_idle_seconds: float) -> int:
+        """
+        Elimina las salas sin actividad; retorna cuántas. Su partida sigue en el
+        store (si lo hay) hasta que este la desaloje.
+        """
+        now = time.monotonic()
+        with self._lock:
+            idle = [code for code, room in self._rooms.items()
+                    if now - room.last_activity > max_idle_seconds]
+            for code in idle:
+                del self._rooms[code]
+        return len(idle)
+
+    def __len__(self) -> int:
+        return len(self._rooms)
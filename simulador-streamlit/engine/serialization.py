@@ -0,0 +1,287 @@
+"""
+Serialización binaria de partidas (formato versionado con struct)
+Guarda KPIs, historial columnar, estado de los generadores, eventos y turno.
+El snapshot financiero se referencia por (ticker, timestamp) y solo se
+incluye si se pide: varias partidas de la misma empresa lo comparten.
+
+Formato v2 (little-endian):
+    cabecera   "MBAI" | versión u8 | flags u8
+    textos     ticker, company_name, industry_type, game_mode, game_id,
+               timestamp del snapshot (u16 longitud + UTF-8)
+    escalares  seed (u8 longitud + entero con signo), version u32,
+               current_turn u16, max_turns u16, created_at f64, silicon_workers i64
+    KPIs       máscara u32 (bit i = entero) + 18 valores de 8 bytes (q o d)
+    historial  filas u32 + filas × 18 f64
+    RNG        por stream: versión u8, 625 u32, gauss_next (u8 + f64)
+    eventos    JSON comprimido (recientes, contadores, offsets, ruta de volcado)
+    last_action JSON (u32 longitud)
+    parámetros JSON (u32 longitud): GameParameters.as_dict() con los que se jugó
+    snapshot   JSON comprimido (u32 longitud), solo con FLAG_SNAPSHOT
+
+FLAG_ANTITHETIC indica generadores antitéticos (rng.AntitheticRandom).
+v1 es igual sin los parámetros: al leerla se recalculan con get_parameters
+(pueden diferir si después se ingirió histórico).
+"""
+
+import json
+import random
+import struct
+import zlib
+from collections import deque
+from datetime import datetime
+from typing import Callable, Dict, Optional, Tuple
+
+import numpy as np
+
+from .events import EventLog
+from .frozen_snapshot import intern_snapshot, thaw
+from .kpi_state import KPI_FIELDS, KPIHistory, KPIState
+from .parameters import GameParameters, get_parameters
+from .rng import STREAMS, AntitheticRandom
+
+
+MAGIC = b"MBAI"
+FORMAT_VERSION = 2
+SUPPORTED_VERSIONS = (1, 2)
+
+FLAG_SNAPSHOT = 0x01
+FLAG_ANTITHETIC = 0x02
+
+_HEADER = struct.Struct("<4sBB")
+_SCALARS = struct.Struct("<IHHdq")
+_U8 = struct.Struct("<B")
+_U16 = struct.Struct("<H")
+_U32 = struct.Struct("<I")
+_RNG = struct.Struct("<B625IBd")
+
+SnapshotKey = Tuple[str, str]
+
+
+def snapshot_key(game) -> SnapshotKey:
+    """Identidad del snapshot de una partida: (ticker, timestamp de descarga)"""
+    return game.ticker, game.snapshot.get("timestamp", "")
+
+
+class _Writer:
+    def __init__(self):
+        self.parts = []
+
+    def pack(self, fmt: struct.Struct, *values):
+        self.parts.append(fmt.pack(*values))
+
+    def text(self, value: str):
+        raw = value.encode("utf-8")
+        self.parts.append(_U16.pack(len(raw)) + raw)
+
+    def blob(self, raw: bytes):
+        self.parts.append(_U32.pack(len(raw)) + raw)
+
+    def integer(self, value: int):
+        raw = value.to_bytes((value.bit_length() + 8) // 8, "little", signed=True)
+        self.parts.append(_U8.pack(len(raw)) + raw)
+
+    def getvalue(self) -> bytes:
+        return b"".join(self.parts)
+
+
+class _Reader:
+    def __init__(self, data: bytes):
+        self.data = memoryview(data)
+        self.pos = 0
+
+    def unpack(self, fmt: struct.Struct):
+        try:
+            values = fmt.unpack_from(self.data, self.pos)
+        except struct.error:
+            raise ValueError("Datos de partida truncados")
+        self.pos += fmt.size
+        return values
+
+    def raw(self, size: int) -> bytes:
+        if self.pos + size > len(self.data):
+            raise ValueError("Datos de partida truncados")
+        chunk = bytes(self.data[self.pos:self.pos + size])
+        self.pos += size
+        return chunk
+
+    def text(self) -> str:
+        (size,) = self.unpack(_U16)
+        return self.raw(size).decode("utf-8")
+
+    def blob(self) -> bytes:
+        (size,) = self.unpack(_U32)
+        return self.raw(size)
+
+    def integer(self) -> int:
+        (size,) = self.unpack(_U8)
+        return int.from_bytes(self.raw(size), "little", signed=True)
+
+
+def _kpi_mask(kpis: KPIState) -> Tuple[int, str]:
+    mask = 0
+    codes = []
+    for i, value in enumerate(kpis.row()):
+        if isinstance(value, int) and -2**63 <= value < 2**63:
+            mask |= 1 << i
+            codes.append("q")
+        else:
+            codes.append("d")
+    return mask, "<" + "".join(codes)
+
+
+def _events_state(log: EventLog) -> Dict:
+    return {
+        "maxlen": log._recent.maxlen,
+        "recent": list(log._recent),
+        "total": log.total,
+        "spill_path": log.spill_path,
+        "counts": [[turn, kind, n] for (turn, kind), n in log._counts.items()],
+        "offsets": [[turn, kind, found] for (turn, kind), found in log._offsets.items()],
+    }
+
+
+def _restore_events(state: Dict) -> EventLog:
+    log = EventLog(maxlen=state["maxlen"], spill_path=state["spill_path"])
+    log._recent = deque(state["recent"], maxlen=state["maxlen"])
+    log.total = state["total"]
+    log._counts = {(turn, kind): n for turn, kind, n in state["counts"]}
+    log._offsets = {(turn, kind): found for turn, kind, found in state["offsets"]}
+    return log
+
+
+def _compress_json(value) -> bytes:
+    return zlib.compress(json.dumps(value, ensure_ascii=False, separators=(",", ":")).encode("utf-8"))
+
+
+def _decompress_json(raw: bytes):
+    return json.loads(zlib.decompress(raw))
+
+
+def read_snapshot_key(data: bytes) -> SnapshotKey:
+    """(ticker, timestamp) de una partida serializada, leyendo solo la cabecera"""
+    reader = _Reader(data)
+    magic, _, _ = reader.unpack(_HEADER)
+    if magic != MAGIC:
+        raise ValueError("No es una partida serializada")
+    ticker = reader.text()
+    for _ in range(4):
+        reader.text()
+    return ticker, reader.text()
+
+
+def to_bytes(game, include_snapshot: bool = False) -> bytes:
+    """Serializa una partida; sin el snapshot salvo include_snapshot=True"""
+    out = _Writer()
+    flags = FLAG_SNAPSHOT if include_snapshot else 0
+    if isinstance(game._rng["init"], AntitheticRandom):
+        flags |= FLAG_ANTITHETIC
+    out.pack(_HEADER, MAGIC, FORMAT_VERSION, flags)
+
+    for value in (game.ticker, game.company_name, game.industry_type, game.game_mode,
+                  game.game_id, snapshot_key(game)[1]):
+        out.text(value)
+    out.integer(game.seed)
+    out.pack(_SCALARS, game.version, game.current_turn, game.max_turns,
+             game.created_at.timestamp(), game.silicon_workers)
+
+    mask, fmt = _kpi_mask(game.kpis)
+    out.pack(_U32, mask)
+    out.parts.append(struct.pack(fmt, *game.kpis.row()))
+
+    history = game.history.as_array()
+    out.pack(_U32, len(history))
+    out.parts.append(history.astype("<f8", copy=False).tobytes())
+
+    for name in STREAMS:
+        version, internal, gauss_next = game._rng[name].getstate()
+        out.pack(_RNG, version, *internal, gauss_next is not None, gauss_next or 0.0)
+
+    out.blob(_compress_json(_events_state(game.events)))
+    out.blob(json.dumps(game.last_action, ensure_ascii=False).encode("utf-8"))
+    out.blob(json.dumps(game.parameters.as_dict()).encode("utf-8"))
+    if include_snapshot:
+        out.blob(_compress_json(thaw(game.snapshot)))
+    return out.getvalue()
+
+
+def from_bytes(data: bytes, snapshot: Optional[Dict] = None,
+               resolve_snapshot: Optional[Callable[[SnapshotKey], Optional[Dict]]] = None):
+    """
+    Reconstruye una partida. Si el snapshot no va incluido se usa `snapshot`
+    (deben coincidir su ticker y su timestamp; si no, ValueError) o se pide a
+    `resolve_snapshot((ticker, timestamp))`.
+    """
+    from .game_engine import GameEngine
+
+    reader = _Reader(data)
+    magic, version, flags = reader.unpack(_HEADER)
+    if magic != MAGIC:
+        raise ValueError("No es una partida serializada")
+    if version not in SUPPORTED_VERSIONS:
+        raise ValueError(f"Versión de formato no soportada: {version}")
+
+    ticker, company_name, industry_type, game_mode, game_id, timestamp = (
+        reader.text() for _ in range(6))
+    seed = reader.integer()
+    game_version, current_turn, max_turns, created_at, silicon_workers = reader.unpack(_SCALARS)
+
+    (mask,) = reader.unpack(_U32)
+    fmt = "<" + "".join("q" if mask >> i & 1 else "d" for i in range(len(KPI_FIELDS)))
+    kpi_values = struct.unpack(fmt, reader.raw(struct.calcsize(fmt)))
+
+    (rows,) = reader.unpack(_U32)
+    history_raw = reader.raw(rows * len(KPI_FIELDS) * 8)
+
+    rng_states = {}
+    for name in STREAMS:
+        values = reader.unpack(_RNG)
+        rng_states[name] = (values[0], tuple(values[1:626]), values[627] if values[626] else None)
+
+    events = _decompress_json(reader.blob())
+    last_action = json.loads(reader.blob())
+    parameters = json.loads(reader.blob()) if version >= 2 else None
+
+    key = (ticker, timestamp)
+    if flags & FLAG_SNAPSHOT:
+        snapshot = _decompress_json(reader.blob())
+    elif snapshot is not None:
+        if (str(snapshot.get("ticker", "")).upper() != ticker.upper()
+                or snapshot.get("timestamp", "") != timestamp):
+            raise ValueError(f"El snapshot no corresponde a la partida {key}")
+    elif resolve_snapshot is not None:
+        snapshot = resolve_snapshot(key)
+    if snapshot is None:
+        raise ValueError(f"Falta el snapshot {key} para restaurar la partida")
+    snapshot = intern_snapshot(snapshot)
+
+    game = GameEngine.__new__(GameEngine)
+    game.ticker = ticker
+    game.company_name = company_name
+    game.industry_type = industry_type
+    game.game_mode = game_mode
+    game.snapshot = snapshot
+    # Los parámetros guardados: la partida sigue exactamente igual aunque
+    # la calibración haya cambiado (se comparte la tabla actual si coincide)
+    game.parameters = get_parameters(snapshot, industry_type)
+    if parameters is not None and parameters != game.parameters.as_dict():
+        game.parameters = GameParameters.from_dict(parameters)
+    game.seed = seed
+    game._rng = {}
+    factory = AntitheticRandom if flags & FLAG_ANTITHETIC else random.Random
+    for name in STREAMS:
+        rng = factory()
+        rng.setstate(rng_states[name])
+        game._rng[name] = rng
+    game.game_id = game_id
+    game.version = game_version
+    game.current_turn = current_turn
+    game.max_turns = max_turns
+    game.created_at = datetime.fromtimestamp(created_at)
+    game.kpis = KPIState(**dict(zip(KPI_FIELDS, kpi_values)))
+    game.history = KPIHistory(max(max_turns, rows))
+    game.history._data[:rows] = np.frombuffer(history_raw, dtype="<f8").reshape(rows, len(KPI_FIELDS))
+    game.history._size = rows
+    game.events = _restore_events(events)
+    game.last_action = last_action
+    game.silicon_workers = silicon_workers
+    return game
@@ -0,0 +1,378 @@
+"""
+Servicio HTTP + WebSocket del simulador (asyncio, solo librería estándar)
+Permite jugar desde la web principal o desde scripts de carga sin Streamlit.
+
+    python -m engine serve --port 8765 --fixtures fixtures/snapshots
+
+    POST /games                      {"ticker", "game_mode", "industry_type", "seed"}
+    GET  /games/<id>                 estado
+    POST /games/<id>/actions         {"role", "action", "intensity"}
+    POST /games/<id>/advance
+    GET  /games/<id>/ws              WebSocket: estado tras cada cambio
+    GET  /health
+"""
+
+import argparse
+import asyncio
+import base64
+import hashlib
+import json
+import logging
+import struct
+from http import HTTPStatus
+from typing import Dict, Optional, Sequence, Set, Tuple
+
+from . import instrumentation
+from .actions import get_registry
+from .game_engine import GameEngine
+from .game_store import GameStore
+from .parameters import INDUSTRIES
+from .simulation import create_game
+
+
+logger = logging.getLogger("engine.service")
+
+WS_GUID = "258EAFA5-E914-47DA-95CA-C5AB0DC11B85"
+MAX_BODY = 64 * 1024
+MAX_WS_FRAME = 64 * 1024  # los clientes solo envían ping y cierre
+GAME_MODES = ("traditional", "ai_native")
+
+
+class HTTPError(Exception):
+    def __init__(self, status: int, message: str):
+        super().__init__(message)
+        self.status = status
+
+
+class WebSocketClose(Exception):
+    """Cerrar el WebSocket con un código de estado (RFC 6455, 7.4)"""
+
+    def __init__(self, code: int, message: str):
+        super().__init__(message)
+        self.code = code
+
+
+def game_state(game: GameEngine) -> Dict:
+    """Estado JSON-serializable (get_state con los KPIs como dict)"""
+    state = game.get_state()
+    state["kpis"] = state["kpis"].as_dict()
+    return state
+
+
+class GameService:
+    """
+    Estado del servicio: partidas (GameStore), un asyncio.Lock por partida
+    y las colas de los clientes WebSocket suscritos a cada partida.
+    """
+
+    def __init__(self, store: Optional[GameStore] = None):
+        self.store = store if store is not None else GameStore(max_games=1024)
+        self.store.on_evict = self._forget
+        self._locks: Dict[str, asyncio.Lock] = {}
+        self._subscribers: Dict[str, Set[asyncio.Queue]] = {}
+
+    def _forget(self, game_id: str):
+        """La partida salió de memoria: su lock ya no hace falta (se recrea al volver)"""
+        lock = self._locks.get(game_id)
+        if lock is not None and not lock.locked():
+            del self._locks[game_id]
+
+    def _lock(self, game_id: str) -> asyncio.Lock:
+        lock = self._locks.get(game_id)
+        if lock is None:
+            # Sin partida no se crea lock: los ids inventados no dejan entradas
+            if game_id not in self.store:
+                raise HTTPError(404, f"No existe la partida {game_id}")
+            lock = self._locks[game_id] = asyncio.Lock()
+        return lock
+
+    def _game(self, game_id: str) -> GameEngine:
+        game = self.store.get(game_id)
+        if game is None:
+            raise HTTPError(404, f"No existe la partida {game_id}")
+        return game
+
+    def _publish(self, game: GameEngine, state: Dict):
+        for subscriber in self._subscribers.get(game.game_id, ()):
+            if subscriber.full():
+                # Cliente lento: solo importa el estado más reciente
+                subscriber.get_nowait()
+            subscriber.put_nowait(state)
+
+    async def create(self, body: Dict) -> Dict:
+        ticker = body.get("ticker")
+        if not ticker or not isinstance(ticker, str):
+            raise HTTPError(400, "Falta ticker")
+        game_mode = body.get("game_mode", "traditional")
+        if game_mode not in GAME_MODES:
+            raise HTTPError(400, f"game_mode debe ser uno de: {', '.join(GAME_MODES)}")
+        industry_type = body.get("industry_type", "tech")
+        if industry_type not in INDUSTRIES:
+            raise HTTPError(400, f"industry_type debe ser uno de: {', '.join(INDUSTRIES)}")
+        seed = body.get("seed")
+        if seed is not None and (not isinstance(seed, int) or isinstance(seed, bool)):
+            raise HTTPError(400, "seed debe ser un entero")
+        loop = asyncio.get_running_loop()
+        try:
+            # La descarga del snapshot bloquea: fuera del event loop
+            game = await loop.run_in_executor(None, lambda: create_game(
+                ticker, game_mode=game_mode, industry_type=industry_type, seed=seed))
+        except ValueError as e:
+            raise HTTPError(404, str(e))
+        self.store.put(game)
+        return game_state(game)
+
+    async def state(self, game_id: str) -> Dict:
+        async with self._lock(game_id):
+            return game_state(self._game(game_id))
+
+    async def execute_action(self, game_id: str, body: Dict) -> Dict:
+        role, action = body.get("role"), body.get("action")
+        if role not in get_registry().roles:
+            raise HTTPError(400, f"Rol desconocido: {role}")
+        if not isinstance(action, str) or get_registry().get(role, action) is None:
+            raise HTTPError(400, f"Acción desconocida: {role}.{action}")
+        intensity = body.get("intensity", 50)
+        if isinstance(intensity, bool) or not isinstance(intensity, (int, float)) or not 0 <= intensity <= 100:
+            raise HTTPError(400, "intensity debe ser un número entre 0 y 100")
+        intensity = int(intensity)
+        async with self._lock(game_id):
+            game = self._game(game_id)
+            message = game.execute_action(role, action, intensity)
+            self.store.put(game)
+            state = game_state(game)
+        self._publish(game, state)
+        return {"message": message, "state": state}
+
+    async def advance_turn(self, game_id: str) -> Dict:
+        async with self._lock(game_id):
+            game = self._game(game_id)
+            result = game.advance_turn()
+            self.store.put(game)
+            state = game_state(game)
+        self._publish(game, state)
+        return {"result": result, "state": state}
+
+    def subscribe(self, game_id: str) -> asyncio.Queue:
+        self._game(game_id)
+        subscriber: asyncio.Queue = asyncio.Queue(maxsize=64)
+        self._subscribers.setdefault(game_id, set()).add(subscriber)
+        return subscriber
+
+    def unsubscribe(self, game_id: str, subscriber: asyncio.Queue):
+        subscribers = self._subscribers.get(game_id)
+        if subscribers is not None:
+            subscribers.discard(subscriber)
+            if not subscribers:
+                del self._subscribers[game_id]
+
+
+# --- HTTP ---
+
+async def _read_request(reader: asyncio.StreamReader) -> Optional[Tuple[str, str, Dict[str, str], bytes]]:
+    try:
+        head = await reader.readuntil(b"\r\n\r\n")
+    except (asyncio.IncompleteReadError, ConnectionError):
+        return None
+    lines = head.decode("latin-1").split("\r\n")
+    try:
+        method, path, _ = lines[0].split(" ", 2)
+    except ValueError:
+        raise HTTPError(400, "Petición mal formada")
+    headers = {}
+    for line in lines[1:]:
+        if ":" in line:
+            name, value = line.split(":", 1)
+            headers[name.strip().lower()] = value.strip()
+    try:
+        length = int(headers.get("content-length", 0) or 0)
+    except ValueError:
+        raise HTTPError(400, "Content-Length no válido")
+    if length < 0:
+        raise HTTPError(400, "Content-Length no válido")
+    if length > MAX_BODY:
+        raise HTTPError(413, "Cuerpo demasiado grande")
+    body = await reader.readexactly(length) if length else b""
+    return method, path.split("?", 1)[0], headers, body
+
+
+def _response(status: int, payload, keep_alive: bool) -> bytes:
+    body = json.dumps(payload, ensure_ascii=False).encode("utf-8")
+    reason = HTTPStatus(status).phrase
+    return (
+        f"HTTP/1.1 {status} {reason}\r\n"
+        "Content-Type: application/json; charset=utf-8\r\n"
+        f"Content-Length: {len(body)}\r\n"
+        f"Connection: {'keep-alive' if keep_alive else 'close'}\r\n"
+        "\r\n"
+    ).encode("latin-1") + body
+
+
+def _parse_json(body: bytes) -> Dict:
+    if not body:
+        return {}
+    try:
+        data = json.loads(body)
+    except ValueError:
+        raise HTTPError(400, "JSON no válido")
+    if not isinstance(data, dict):
+        raise HTTPError(400, "Se esperaba un objeto JSON")
+    return data
+
+
+async def _route(service: GameService, method: str, path: str, body: bytes):
+    parts = [p for p in path.split("/") if p]
+    if parts == ["health"] and method == "GET":
+        return {"status": "ok", "games": service.store.stats()}
+    if parts == ["games"] and method == "POST":
+        return await service.create(_parse_json(body))
+    if len(parts) == 2 and parts[0] == "games" and method == "GET":
+        return await service.state(parts[1])
+    if len(parts) == 3 and parts[0] == "games" and method == "POST":
+        if parts[2] == "actions":
+            return await service.execute_action(parts[1], _parse_json(body))
+        if parts[2] == "advance":
+            return await service.advance_turn(parts[1])
+    raise HTTPError(404, f"Ruta desconocida: {method} {path}")
+
+
+# --- WebSocket (RFC 6455, solo lo necesario: texto, ping y cierre) ---
+
+def _ws_frame(payload: bytes, opcode: int = 0x1) -> bytes:
+    size = len(payload)
+    if size < 126:
+        header = struct.pack("!BB", 0x80 | opcode, size)
+    elif size < 1 << 16:
+        header = struct.pack("!BBH", 0x80 | opcode, 126, size)
+    else:
+        header = struct.pack("!BBQ", 0x80 | opcode, 127, size)
+    return header + payload
+
+
+async def _ws_read_frame(reader: asyncio.StreamReader) -> Tuple[int, bytes]:
+    first, second = await reader.readexactly(2)
+    opcode, size = first & 0x0F, second & 0x7F
+    if size == 126:
+        (size,) = struct.unpack("!H", await reader.readexactly(2))
+    elif size == 127:
+        (size,) = struct.unpack("!Q", await reader.readexactly(8))
+    if size > MAX_WS_FRAME:
+        raise WebSocketClose(1009, "Mensaje demasiado grande")
+    mask = await reader.readexactly(4) if second & 0x80 else b""
+    payload = await reader.readexactly(size)
+    if mask:
+        payload = bytes(b ^ mask[i % 4] for i, b in enumerate(payload))
+    return opcode, payload
+
+
+async def _websocket(service: GameService, game_id: str, headers: Dict[str, str],
+                     reader: asyncio.StreamReader, writer: asyncio.StreamWriter):
+    key = headers.get("sec-websocket-key")
+    if headers.get("upgrade", "").lower() != "websocket" or not key:
+        raise HTTPError(400, "Se esperaba una conexión WebSocket")
+    subscriber = service.subscribe(game_id)
+    accept = base64.b64encode(hashlib.sha1((key + WS_GUID).encode()).digest()).decode()
+    writer.write((
+        "HTTP/1.1 101 Switching Protocols\r\n"
+        "Upgrade: websocket\r\nConnection: Upgrade\r\n"
+        f"Sec-WebSocket-Accept: {accept}\r\n\r\n"
+    ).encode("latin-1"))
+    instrumentation.count("service.ws_open")
+
+    async def send_updates():
+        writer.write(_ws_frame(json.dumps(await service.state(game_id), ensure_ascii=False).encode()))
+        await writer.drain()
+        while True:
+            state = await subscriber.get()
+            writer.write(_ws_frame(json.dumps(state, ensure_ascii=False).encode()))
+            await writer.drain()
+
+    sender = asyncio.ensure_future(send_updates())
+    try:
+        while True:
+            opcode, payload = await _ws_read_frame(reader)
+            if opcode == 0x8:
+                writer.write(_ws_frame(payload[:2], 0x8))
+                break
+            if opcode == 0x9:
+                writer.write(_ws_frame(payload, 0xA))
+    except WebSocketClose as e:
+        writer.write(_ws_frame(struct.pack("!H", e.code) + str(e).encode(), 0x8))
+    except (asyncio.IncompleteReadError, ConnectionError):
+        pass
+    finally:
+        sender.cancel()
+        # Recoger su resultado (cancelación o error de conexión) para que no quede pendiente
+        await asyncio.gather(sender, return_exceptions=True)
+        service.unsubscribe(game_id, subscriber)
+
+
+async def _handle(service: GameService, reader: asyncio.StreamReader, writer: asyncio.StreamWriter):
+    try:
+        while True:
+            keep_alive = False
+            try:
+                request = await _read_request(reader)
+                if request is None:
+                    break
+                method, path, headers, body = request
+                keep_alive = headers.get("connection", "keep-alive").lower() != "close"
+                parts = [p for p in path.split("/") if p]
+                if method == "GET" and len(parts) == 3 and parts[0] == "games" and parts[2] == "ws":
+                    await _websocket(service, parts[1], headers, reader, writer)
+                    break
+                with instrumentation.span(f"service.{method.lower()}"):
+                    payload = await _route(service, method, path, body)
+                writer.write(_response(200, payload, keep_alive))
+            except HTTPError as e:
+                writer.write(_response(e.status, {"error": str(e)}, keep_alive))
+            except Exception as e:
+                logger.exception("Error atendiendo la petición")
+                writer.write(_response(500, {"error": str(e)}, False))
+                keep_alive = False
+            await writer.drain()
+            if not keep_alive:
+                break
+    except ConnectionError:
+        pass
+    finally:
+        writer.close()
+
+
+async def start_server(host: str = "127.0.0.1", port: int = 8765,
+                       service: Optional[GameService] = None) -> asyncio.AbstractServer:
+    service = service if service is not None else GameService()
+    return await asyncio.start_server(lambda r, w: _handle(service, r, w), host, port)
+
+
+async def serve(host: str = "127.0.0.1", port: int = 8765):
+    server = await start_server(host, port)
+    addresses = ", ".join(str(s.getsockname()) for s in server.sockets)
+    logger.info("Servicio del simulador en %s", addresses)
+    print(f"Servicio del simulador en http://{host}:{port}")
+    async with server:
+        await server.serve_forever()
+
+
+def main(argv: Optional[Sequence[str]] = None):
+    parser = argparse.ArgumentParser(prog="python -m engine serve",
+                                     description="Servicio HTTP/WebSocket del simulador")
+    parser.add_argument("--host", default="127.0.0.1")
+    parser.add_argument("--port", type=int, default=8765)
+    parser.add_argument("--fixtures", help="Directorio con <TICKER>.json (sin red)")
+    args = parser.parse_args(argv)
+
+    if args.fixtures:
+        from .finance_engine import configure_snapshot_source
+        from .snapshot_store import FixtureFetcher
+        configure_snapshot_source(fetcher=FixtureFetcher(args.fixtures))
+
+    logging.basicConfig(level=logging.INFO)
+    try:
+        asyncio.run(serve(args.host, args.port))
+    except KeyboardInterrupt:
+        pass
+
+
+if __name__ == "__main__":
+    main()
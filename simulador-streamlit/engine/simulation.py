@@ -0,0 +1,98 @@
+"""
+API headless del simulador
+Crear partidas, aplicar guiones de acciones y obtener resultados sin Streamlit
+"""
+
+import json
+from typing import Dict, List, Optional
+
+from .finance_engine import get_company_snapshot
+from .game_engine import GameEngine
+
+
+def create_game(ticker: str, game_mode: str = "traditional", industry_type: str = "tech",
+                seed: Optional[int] = None, snapshot: Optional[Dict] = None) -> GameEngine:
+    """Crea una partida; si no se pasa snapshot se obtiene con get_company_snapshot"""
+    ticker = ticker.upper()
+    if snapshot is None:
+        snapshot = get_company_snapshot(ticker)
+        if not snapshot:
+            raise ValueError(f"No se encontraron datos para {ticker}")
+    return GameEngine(
+        ticker=ticker,
+        company_name=snapshot.get("company_name", ticker),
+        snapshot_data=snapshot,
+        industry_type=industry_type,
+        game_mode=game_mode,
+        seed=seed,
+    )
+
+
+def normalize_script(script) -> List[List[Dict]]:
+    """
+    Acepta {"turns": [...]} o directamente la lista de turnos.
+    Cada turno es una lista de acciones {"role", "action", "intensity"};
+    también se admite [rol, acción, intensidad].
+    """
+    turns = script.get("turns", []) if isinstance(script, dict) else script
+    normalized = []
+    for turn in turns:
+        actions = []
+        for action in turn or []:
+            if isinstance(action, dict):
+                actions.append({"role": action["role"], "action": action["action"],
+                                "intensity": int(action.get("intensity", 50))})
+            else:
+                role, name, *rest = action
+                actions.append({"role": role, "action": name,
+                                "intensity": int(rest[0]) if rest else 50})
+        normalized.append(actions)
+    return normalized
+
+
+def apply_script(game: GameEngine, script, play_to_end: bool = True) -> List[Dict]:
+    """
+    Ejecuta el guion turno a turno (acciones y después avanzar turno).
+    Con play_to_end los turnos sin guion se juegan sin acciones hasta el final.
+    Retorna el registro de acciones ejecutadas.
+    """
+    turns = normalize_script(script)
+    log = []
+    index = 0
+    while game.current_turn < game.max_turns and (play_to_end or index < len(turns)):
+        for action in turns[index] if index < len(turns) else []:
+            message = game.execute_action(action["role"], action["action"], action["intensity"])
+            log.append({"turn": game.current_turn, **action, "message": message})
+        game.advance_turn()
+        index += 1
+    return log
+
+
+def outcome(game: GameEngine) -> Dict:
+    """Resultado serializable de una partida"""
+    return {
+        "ticker": game.ticker,
+        "company_name": game.company_name,
+        "game_mode": game.game_mode,
+        "industry": game.industry_type,
+        "seed": game.seed,
+        "parameters": game.parameters.as_dict(),
+        "turn": game.current_turn,
+        "max_turns": game.max_turns,
+        "kpis": game.kpis.as_dict(),
+        "crises": game.events.count(kind="crisis"),
+        "crises_per_turn": game.events.per_turn("crisis"),
+        "events": game.events.query(),
+    }
+
+
+def load_script(path: str):
+    """Lee un guion JSON o YAML (YAML requiere PyYAML)"""
+    with open(path, encoding="utf-8") as f:
+        if path.endswith((".yaml", ".yml")):
+            try:
+                import yaml
+            except ImportError:
+                raise SystemExit("Para guiones YAML instala PyYAML (pip install pyyaml)")
+            return yaml.safe_load(f)
+        return json.load(f)
@@ -0,0 +1,209 @@
+"""
+Almacén persistente de snapshots financieros
+Un fichero JSON por ticker y fecha de descarga: <root>/<TICKER>/<YYYY-MM-DD>.json
+"""
+
+import argparse
+import json
+import logging
+import os
+import re
+import tempfile
+from datetime import date, timedelta
+from typing import Dict, List, Optional, Protocol, Sequence
+
+
+logger = logging.getLogger("engine.snapshot_store")
+
+# Símbolos de Yahoo Finance (BRK-B, ^GSPC, EURUSD=X, 7203.T...): nada que
+# permita salir del directorio al construir rutas
+TICKER_PATTERN = re.compile(r"^[A-Z0-9.\-^=]{1,15}$")
+
+DEFAULT_STORE_DIR = os.environ.get(
+    "MBAI_SNAPSHOT_DIR",
+    os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), "data", "snapshots"),
+)
+
+
+def validate_ticker(ticker: str) -> str:
+    """Ticker en mayúsculas; ValueError si no tiene forma de símbolo bursátil"""
+    normalized = ticker.strip().upper() if isinstance(ticker, str) else ""
+    if not TICKER_PATTERN.match(normalized) or normalized in (".", ".."):
+        raise ValueError(f"Ticker no válido: {ticker!r}")
+    return normalized
+
+
+class SnapshotFetcher(Protocol):
+    """Fuente de snapshots (Yahoo Finance, fixtures locales, stubs de test...)"""
+
+    def fetch(self, ticker: str) -> Optional[Dict]:
+        ...
+
+
+class FixtureFetcher:
+    """
+    Lee snapshots ya descargados de un directorio (<TICKER>.json).
+    Sustituye a Yahoo Finance en tests y aulas sin conexión.
+    """
+
+    def __init__(self, directory: str):
+        self.directory = directory
+
+    def fetch(self, ticker: str) -> Optional[Dict]:
+        path = os.path.join(self.directory, f"{validate_ticker(ticker)}.json")
+        if not os.path.exists(path):
+            return None
+        with open(path, encoding="utf-8") as f:
+            return json.load(f)
+
+
+class SnapshotStore:
+    """Snapshots en disco indexados por ticker y fecha de descarga"""
+
+    def __init__(self, root: str = DEFAULT_STORE_DIR):
+        self.root = root
+
+    def _ticker_dir(self, ticker: str) -> str:
+        return os.path.join(self.root, validate_ticker(ticker))
+
+    def path_for(self, ticker: str, fetched_on: date) -> str:
+        return os.path.join(self._ticker_dir(ticker), f"{fetched_on.isoformat()}.json")
+
+    def dates(self, ticker: str) -> List[date]:
+        """Fechas disponibles para un ticker, de más antigua a más reciente"""
+        directory = self._ticker_dir(ticker)
+        if not os.path.isdir(directory):
+            return []
+        found = []
+        for name in os.listdir(directory):
+            stem, ext = os.path.splitext(name)
+            if ext != ".json":
+                continue
+            try:
+                found.append(date.fromisoformat(stem))
+            except ValueError:
+                continue
+        return sorted(found)
+
+    def tickers(self) -> List[str]:
+        if not os.path.isdir(self.root):
+            return []
+        return sorted(name for name in os.listdir(self.root)
+                      if TICKER_PATTERN.match(name) and self.dates(name))
+
+    def get(self, ticker: str, fetched_on: Optional[date] = None,
+            max_age_days: Optional[int] = None) -> Optional[Dict]:
+        """
+        Snapshot de una fecha concreta o, si no se indica, el más reciente.
+        Con max_age_days se descartan los más antiguos que ese límite.
+        """
+        if fetched_on is None:
+            available = self.dates(ticker)
+            if not available:
+                return None
+            fetched_on = available[-1]
+        if max_age_days is not None and fetched_on < date.today() - timedelta(days=max_age_days):
+            return None
+
+        path = self.path_for(ticker, fetched_on)
+        if not os.path.exists(path):
+            return None
+        with open(path, encoding="utf-8") as f:
+            return json.load(f)
+
+    def put(self, snapshot: Dict, fetched_on: Optional[date] = None) -> str:
+        """
+        Guarda el snapshot (escritura atómica) y retorna la ruta.
+        Se archiva por fecha de descarga (hoy por defecto), no por su timestamp:
+        un snapshot de fixtures conserva su fecha original y, archivado por ella,
+        nunca pasaría el filtro max_age_days de get().
+        """
+        fetched_on = fetched_on or date.today()
+        path = self.path_for(snapshot["ticker"], fetched_on)
+        os.makedirs(os.path.dirname(path), exist_ok=True)
+
+        fd, tmp = tempfile.mkstemp(dir=os.path.dirname(path), suffix=".tmp")
+        try:
+            with os.fdopen(fd, "w", encoding="utf-8") as f:
+                json.dump(snapshot, f, ensure_ascii=False, indent=2)
+            os.replace(tmp, path)
+        except BaseException:
+            # Sin restos a medio escribir en el directorio del ticker
+            try:
+                os.unlink(tmp)
+            except OSError:
+                pass
+            raise
+        return path
+
+
+def load_snapshot(ticker: str, fetcher: SnapshotFetcher, store: Optional[SnapshotStore],
+                  max_age_days: int = 1) -> Optional[Dict]:
+    """
+    Snapshot reciente del almacén o, si no hay, descarga y guarda uno nuevo.
+    Si la descarga falla (p.ej. sin red) se usa el último guardado, aunque sea antiguo.
+    """
+    ticker = validate_ticker(ticker)
+    if store is not None:
+        cached = store.get(ticker, max_age_days=max_age_days)
+        if cached:
+            return cached
+
+    try:
+        snapshot = fetcher.fetch(ticker)
+    except Exception:
+        stale = store.get(ticker) if store is not None else None
+        if stale is None:
+            raise
+        return stale
+
+    if snapshot:
+        if store is not None:
+            try:
+                store.put(snapshot)
+            except Exception as e:
+                # Disco lleno, sin permisos...: la descarga sigue valiendo
+                logger.warning("No se pudo guardar el snapshot de %s: %s", ticker, e)
+        return snapshot
+
+    return store.get(ticker) if store is not None else None
+
+
+def main(argv: Optional[Sequence[str]] = None):
+    parser = argparse.ArgumentParser(description="Almacén de snapshots del simulador")
+    parser.add_argument("--store", default=DEFAULT_STORE_DIR)
+    sub = parser.add_subparsers(dest="command", required=True)
+
+    pre = sub.add_parser("prefetch", help="Descargar y guardar snapshots")
+    pre.add_argument("tickers", nargs="+")
+    pre.add_argument("--fixtures", help="Leer de un directorio local en vez de Yahoo Finance")
+    pre.add_argument("--workers", type=int, default=8)
+    pre.add_argument("--retries", type=int, default=2)
+    pre.add_argument("--timeout", type=float, default=15.0, help="Segundos por ticker e intento")
+
+    sub.add_parser("list", help="Listar tickers y fechas guardadas")
+    args = parser.parse_args(argv)
+
+    store = SnapshotStore(args.store)
+    if args.command == "prefetch":
+        if args.fixtures:
+            fetcher = FixtureFetcher(args.fixtures)
+        else:
+            from .finance_engine import YahooFetcher
+            fetcher = YahooFetcher()
+        from .prefetch import fetch_many
+        result = fetch_many(args.tickers, fetcher, max_workers=args.workers,
+                            retries=args.retries, timeout=args.timeout, store=store)
+        for ticker in result["snapshots"]:
+            print(f"{ticker}: ok" if ticker not in result["store_errors"]
+                  else f"{ticker}: descargado, no se pudo guardar ({result['store_errors'][ticker]})")
+        for ticker, error in result["errors"].items():
+            print(f"{ticker}: {error}")
+        print(f"{len(result['snapshots'])}/{len(result['attempts'])} en {result['elapsed_s']}s")
+    else:
+        for ticker in store.tickers():
+            print(f"{ticker}: {', '.join(d.isoformat() for d in store.dates(ticker))}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,218 @@
+"""
+Barrido de estrategias - tickers × modos × industrias × políticas
+Reparte las partidas en un pool de procesos y guarda cada resultado en JSONL
+"""
+
+import argparse
+import itertools
+import json
+import os
+import time
+from concurrent.futures import ProcessPoolExecutor, as_completed
+from typing import Dict, Iterable, Iterator, List, Optional, Sequence, Set, Tuple
+
+from .frozen_snapshot import intern_snapshot
+from .game_engine import GameEngine
+from .rng import derive_seed
+from .snapshot_store import FixtureFetcher, SnapshotStore, load_snapshot
+
+
+# Acción guionizada: (rol, acción, intensidad)
+Action = Tuple[str, str, int]
+
+# Políticas: lista de acciones por turno; se repite cíclicamente durante los 12 turnos
+POLICIES: Dict[str, List[List[Action]]] = {
+    "idle": [[]],
+    "growth": [
+        [("CMO", "marketing_campaign", 70)],
+        [("COO", "expand_capacity", 60)],
+        [("CEO", "strategic_pivot", 50)],
+    ],
+    "cost_focus": [
+        [("CEO", "cost_cutting", 60)],
+        [("CFO", "reduce_costs", 70)],
+        [("COO", "optimize_operations", 60)],
+    ],
+    "people_first": [
+        [("CHRO", "training_program", 60)],
+        [("CHRO", "improve_culture", 60)],
+        [("CHRO", "hire_talent", 50)],
+    ],
+    "ai_first": [
+        [("CAIO", "deploy_agents", 70)],
+        [("CAIO", "train_models", 60)],
+        [("CAIO", "automate_tasks", 60)],
+    ],
+    "balanced": [
+        [("CEO", "strategic_pivot", 50), ("CFO", "invest_rd", 50)],
+        [("CMO", "customer_loyalty", 50), ("COO", "optimize_operations", 50)],
+        [("CHRO", "training_program", 50), ("CAIO", "deploy_agents", 50)],
+    ],
+}
+
+
+def build_grid(tickers: Sequence[str], modes: Sequence[str] = ("traditional", "ai_native"),
+               industries: Sequence[str] = ("tech",), policies: Sequence[str] = tuple(POLICIES),
+               repeats: int = 1, base_seed: int = 0) -> List[Dict]:
+    """
+    Producto cartesiano de parámetros. Cada partida lleva una clave única y
+    una semilla derivada de ella, así que el barrido es reproducible y reanudable.
+    """
+    jobs = []
+    for ticker, mode, industry, policy, rep in itertools.product(
+            tickers, modes, industries, policies, range(repeats)):
+        key = f"{ticker.upper()}|{mode}|{industry}|{policy}|{rep}"
+        jobs.append({
+            "key": key,
+            "ticker": ticker.upper(),
+            "game_mode": mode,
+            "industry_type": industry,
+            "policy": policy,
+            "seed": derive_seed(base_seed, key),
+        })
+    return jobs
+
+
+def play_game(snapshot: Dict, job: Dict) -> Dict:
+    """Juega una partida completa (12 turnos) siguiendo la política del job"""
+    game = GameEngine(
+        ticker=job["ticker"],
+        company_name=snapshot.get("company_name", job["ticker"]),
+        snapshot_data=snapshot,
+        industry_type=job["industry_type"],
+        game_mode=job["game_mode"],
+        seed=job["seed"],
+        antithetic=job.get("antithetic", False),
+    )
+    script = POLICIES[job["policy"]]
+
+    while True:
+        for role, action, intensity in script[(game.current_turn - 1) % len(script)]:
+            game.execute_action(role, action, intensity)
+        if game.advance_turn().get("game_over"):
+            break
+
+    return {
+        **job,
+        "turns": game.current_turn,
+        "crises": game.events.count(kind="crisis"),
+        "kpis": dict(game.kpis),
+    }
+
+
+# Snapshots del proceso worker (se envían una sola vez al arrancar el pool)
+_WORKER_SNAPSHOTS: Dict[str, Dict] = {}
+
+
+def _init_worker(snapshots: Dict[str, Dict]):
+    # Internados una vez: cada partida reutiliza el mismo snapshot sin recalcular su huella
+    _WORKER_SNAPSHOTS.update({ticker: intern_snapshot(s) for ticker, s in snapshots.items()})
+
+
+def _run_shard(jobs: List[Dict]) -> List[Dict]:
+    return [play_game(_WORKER_SNAPSHOTS[job["ticker"]], job) for job in jobs]
+
+
+def _shards(jobs: List[Dict], size: int) -> Iterator[List[Dict]]:
+    for i in range(0, len(jobs), size):
+        yield jobs[i:i + size]
+
+
+def completed_keys(output_path: str) -> Set[str]:
+    """Claves ya guardadas en un barrido previo (ignora una última línea truncada)"""
+    keys = set()
+    if not os.path.exists(output_path):
+        return keys
+    with open(output_path, encoding="utf-8") as f:
+        for line in f:
+            try:
+                keys.add(json.loads(line)["key"])
+            except (ValueError, KeyError):
+                continue
+    return keys
+
+
+def _ends_with_newline(path: str) -> bool:
+    with open(path, "rb") as f:
+        f.seek(-1, os.SEEK_END)
+        return f.read(1) == b"\n"
+
+
+def run_sweep(snapshots: Dict[str, Dict], jobs: Iterable[Dict], output_path: str,
+              workers: Optional[int] = None, shard_size: int = 25,
+              resume: bool = True) -> Dict:
+    """
+    Ejecuta las partidas en paralelo y va escribiendo cada resultado (JSONL)
+    según terminan. Con resume=True se saltan las claves ya presentes en el fichero.
+    """
+    jobs = list(jobs)
+    done = completed_keys(output_path) if resume else set()
+    pending = [job for job in jobs if job["key"] not in done]
+
+    missing = {job["ticker"] for job in pending} - set(snapshots)
+    if missing:
+        raise ValueError(f"Faltan snapshots para: {', '.join(sorted(missing))}")
+
+    started = time.perf_counter()
+    played = 0
+
+    with open(output_path, "a" if resume else "w", encoding="utf-8") as out:
+        if resume and out.tell() > 0 and not _ends_with_newline(output_path):
+            out.write("\n")  # cerrar una línea truncada por una interrupción
+        with ProcessPoolExecutor(max_workers=workers, initializer=_init_worker,
+                                 initargs=(snapshots,)) as pool:
+            futures = [pool.submit(_run_shard, shard) for shard in _shards(pending, shard_size)]
+            for future in as_completed(futures):
+                for result in future.result():
+                    out.write(json.dumps(result, ensure_ascii=False) + "\n")
+                    played += 1
+                out.flush()
+
+    elapsed = time.perf_counter() - started
+    return {
+        "games": played,
+        "skipped": len(jobs) - len(pending),
+        "elapsed_s": round(elapsed, 3),
+        "games_per_sec": round(played / elapsed, 1) if elapsed > 0 else 0.0,
+    }
+
+
+def _load_snapshots(tickers: Sequence[str], snapshot_dir: Optional[str]) -> Dict[str, Dict]:
+    if snapshot_dir:
+        fetcher, store = FixtureFetcher(snapshot_dir), None
+    else:
+        from .finance_engine import YahooFetcher
+        fetcher, store = YahooFetcher(), SnapshotStore()
+
+    snapshots = {}
+    for ticker in tickers:
+        snapshot = load_snapshot(ticker, fetcher, store)
+        if snapshot:
+            snapshots[ticker.upper()] = snapshot
+    return snapshots
+
+
+def main(argv: Optional[Sequence[str]] = None):
+    parser = argparse.ArgumentParser(description="Barrido de estrategias del simulador")
+    parser.add_argument("tickers", nargs="+")
+    parser.add_argument("--modes", nargs="+", default=["traditional", "ai_native"])
+    parser.add_argument("--industries", nargs="+", default=["tech"])
+    parser.add_argument("--policies", nargs="+", default=list(POLICIES), choices=list(POLICIES))
+    parser.add_argument("--repeats", type=int, default=1)
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument("--workers", type=int, default=None)
+    parser.add_argument("--snapshot-dir", help="Directorio con <TICKER>.json (sin red)")
+    parser.add_argument("--out", default="sweep_results.jsonl")
+    parser.add_argument("--no-resume", action="store_true")
+    args = parser.parse_args(argv)
+
+    snapshots = _load_snapshots(args.tickers, args.snapshot_dir)
+    jobs = build_grid([t for t in args.tickers if t.upper() in snapshots], args.modes,
+                      args.industries, args.policies, args.repeats, args.seed)
+    stats = run_sweep(snapshots, jobs, args.out, workers=args.workers,
+                      resume=not args.no_resume)
+    print(json.dumps(stats))
+
+
+if __name__ == "__main__":
+    main()
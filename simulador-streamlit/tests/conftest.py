@@ -0,0 +1,5 @@
+import os
+import sys
+
+# Los tests importan `engine` igual que app.py (desde simulador-streamlit)
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
@@ -0,0 +1,146 @@
+import threading
+import time
+
+import pytest
+
+from engine import backends
+from engine.backends import MemoryCache
+
+
+@pytest.fixture
+def reported(monkeypatch):
+    messages = []
+    monkeypatch.setattr(backends, "_error_reporter", messages.append)
+    return messages
+
+
+def wait_until(condition, timeout=2.0):
+    deadline = time.monotonic() + timeout
+    while not condition():
+        if time.monotonic() > deadline:
+            raise AssertionError("condición no cumplida a tiempo")
+        time.sleep(0.005)
+
+
+def test_concurrent_misses_share_one_load():
+    cache = MemoryCache()
+    release = threading.Event()
+    calls = []
+
+    def loader():
+        calls.append(1)
+        release.wait(2)
+        return "valor"
+
+    results = []
+    threads = [threading.Thread(target=lambda: results.append(cache.get_or_load("k", 60, loader)))
+               for _ in range(8)]
+    for thread in threads:
+        thread.start()
+    wait_until(lambda: cache.stats()["coalesced"] == 7)
+    release.set()
+    for thread in threads:
+        thread.join()
+
+    assert results == ["valor"] * 8
+    assert len(calls) == 1
+    assert cache.stats()["miss"] == 1
+
+
+def test_coalesced_callers_get_the_leader_error():
+    cache = MemoryCache()
+    release = threading.Event()
+    errors = []
+
+    def loader():
+        release.wait(2)
+        raise ValueError("fallo")
+
+    def call():
+        try:
+            cache.get_or_load("k", 60, loader)
+        except ValueError as e:
+            errors.append(e)
+
+    threads = [threading.Thread(target=call) for _ in range(3)]
+    for thread in threads:
+        thread.start()
+    wait_until(lambda: cache.stats()["coalesced"] == 2)
+    release.set()
+    for thread in threads:
+        thread.join()
+
+    assert len(errors) == 3
+
+
+def test_stale_value_served_during_refresh():
+    cache = MemoryCache()
+    cache.get_or_load("k", 60, lambda: "viejo")
+    cache.expire()
+    release = threading.Event()
+
+    def slow_loader():
+        release.wait(2)
+        return "nuevo"
+
+    assert cache.get_or_load("k", 60, slow_loader) == "viejo"
+    assert cache.get_or_load("k", 60, slow_loader) == "viejo"
+    release.set()
+    wait_until(lambda: cache.get_or_load("k", 60, slow_loader) == "nuevo")
+    assert cache.stats()["stale"] >= 2
+
+
+def test_failed_refresh_keeps_stale_value(reported):
+    cache = MemoryCache()
+    cache.get_or_load("k", 60, lambda: "viejo")
+    cache.expire()
+
+    def failing_loader():
+        raise ConnectionError("sin red")
+
+    assert cache.get_or_load("k", 60, failing_loader) == "viejo"
+    wait_until(lambda: cache.stats()["refresh_error"] == 1)
+
+    # El error se comunica en la siguiente llamada, desde el hilo del llamante
+    assert reported == []
+    assert cache.get_or_load("k", 60, failing_loader) == "viejo"
+    assert len(reported) == 1
+    assert "sin red" in reported[0]
+
+
+def test_entries_older_than_stale_ttl_are_reloaded():
+    cache = MemoryCache(stale_ttl=0)
+    cache.get_or_load("k", 60, lambda: "viejo")
+    cache.expire()
+
+    assert cache.get_or_load("k", 60, lambda: "nuevo") == "nuevo"
+
+
+def test_refresh_errors_are_reported_only_for_their_key(reported):
+    cache = MemoryCache()
+    cache.get_or_load("TSLA", 60, lambda: "tsla")
+    cache.get_or_load("AAPL", 60, lambda: "aapl")
+    cache.expire()
+
+    def failing_loader():
+        raise ConnectionError("sin red")
+
+    cache.get_or_load("TSLA", 60, failing_loader)
+    wait_until(lambda: cache.stats()["refresh_error"] == 1)
+
+    cache.get_or_load("AAPL", 60, lambda: "aapl")
+    assert reported == []
+    assert cache.get_or_load("TSLA", 60, failing_loader) == "tsla"
+    assert len(reported) == 1
+
+
+def test_entries_are_bounded_least_recently_used_first():
+    cache = MemoryCache(max_entries=3)
+    for key in "abc":
+        cache.get_or_load(key, 60, lambda key=key: key)
+    cache.get_or_load("a", 60, lambda: "nuevo")  # "a" pasa a ser la más reciente
+    cache.get_or_load("d", 60, lambda: "d")
+
+    assert set(cache._entries) == {"a", "c", "d"}
+    assert cache.stats()["evict"] == 1
+    assert cache.get_or_load("a", 60, lambda: "nuevo") == "a"
@@ -0,0 +1,66 @@
+import json
+import os
+
+import numpy as np
+import pytest
+
+from engine.batch_engine import BatchGameEngine
+from engine.frozen_snapshot import intern_snapshot
+from engine.game_engine import GameEngine
+from engine.kpi_state import KPI_FIELDS
+from engine.sweep import POLICIES
+
+FIXTURES = os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), "fixtures", "snapshots")
+GAMES = 400
+
+
+@pytest.fixture(scope="module")
+def snapshot():
+    with open(os.path.join(FIXTURES, "AAPL.json"), encoding="utf-8") as f:
+        return intern_snapshot(json.load(f))
+
+
+def play_scalar(snapshot, mode, seed, script):
+    game = GameEngine("AAPL", snapshot["company_name"], snapshot, game_mode=mode, seed=seed)
+    while True:
+        for role, action, intensity in script[(game.current_turn - 1) % len(script)]:
+            game.execute_action(role, action, intensity)
+        if game.advance_turn().get("game_over"):
+            return game.kpis.row()
+
+
+def play_batch(snapshot, mode, script):
+    batch = BatchGameEngine(GAMES * 4, snapshot, game_mode=mode, seed=1)
+    while True:
+        for role, action, intensity in script[(batch.current_turn - 1) % len(script)]:
+            batch.execute_action(role, action, intensity)
+        if batch.advance_turn().get("game_over"):
+            return batch.kpis
+
+
+@pytest.mark.parametrize("mode", ["traditional", "ai_native"])
+def test_batch_matches_scalar_distribution(snapshot, mode):
+    script = POLICIES["balanced"]
+    scalar = np.array([play_scalar(snapshot, mode, seed, script) for seed in range(GAMES)], dtype=float)
+    batch = play_batch(snapshot, mode, script)
+
+    for i, name in enumerate(KPI_FIELDS):
+        s_mean, b_mean = scalar[:, i].mean(), batch[:, i].mean()
+        s_std, b_std = scalar[:, i].std(), batch[:, i].std()
+        # Error estándar de la diferencia de medias (con margen de 5σ)
+        se = np.sqrt(s_std ** 2 / len(scalar) + b_std ** 2 / len(batch))
+        assert abs(s_mean - b_mean) <= 5 * se + 1e-9 * abs(s_mean), name
+        if s_std > 0 or b_std > 0:
+            assert 0.8 <= (b_std + 1e-12) / (s_std + 1e-12) <= 1.25, name
+
+
+@pytest.mark.parametrize("mode", ["traditional", "ai_native"])
+def test_actions_have_the_same_effect_from_the_same_state(snapshot, mode):
+    game = GameEngine("AAPL", snapshot["company_name"], snapshot, game_mode=mode, seed=3)
+    batch = BatchGameEngine(1, snapshot, game_mode=mode, seed=3)
+    for role, action, intensity in [("CFO", "raise_capital", 80), ("CHRO", "hire_talent", 40),
+                                    ("CAIO", "deploy_agents", 60), ("CEO", "cost_cutting", 50)]:
+        batch.kpis[0] = game.kpis.row()
+        game.execute_action(role, action, intensity)
+        batch.execute_action(role, action, intensity)
+        np.testing.assert_allclose(batch.kpis[0], np.array(game.kpis.row(), dtype=float), rtol=1e-12)
@@ -0,0 +1,49 @@
+import json
+import os
+
+import pytest
+
+from engine.comparison import compare_modes, play_unit, variance_report
+from engine.frozen_snapshot import intern_snapshot
+
+FIXTURES = os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), "fixtures", "snapshots")
+
+
+@pytest.fixture(scope="module")
+def snapshot():
+    with open(os.path.join(FIXTURES, "TSLA.json"), encoding="utf-8") as f:
+        return intern_snapshot(json.load(f))
+
+
+def test_common_random_numbers_reduce_the_variance(snapshot):
+    # Con 60 unidades la reducción en caja es del orden de 100× (CRN) y de miles (CRN + antitéticas)
+    report = variance_report(snapshot, kpis=("cash",), units=60)
+    schemes = report["schemes"]
+    assert schemes["independent"]["cash"]["variance_reduction"] == pytest.approx(1.0)
+    assert schemes["crn"]["cash"]["variance_reduction"] > 20
+    assert schemes["crn+antithetic"]["cash"]["variance_reduction"] > 1000
+    # Todas estiman la misma diferencia
+    means = [schemes[name]["cash"]["mean_diff"] for name in schemes]
+    std = schemes["independent"]["cash"]["std"]
+    assert max(means) - min(means) < 4 * std / 60 ** 0.5
+
+
+def test_units_are_reproducible(snapshot):
+    assert play_unit(snapshot, 3, ["cash", "revenue"]) == play_unit(snapshot, 3, ["cash", "revenue"])
+    assert play_unit(snapshot, 3, ["cash"]) != play_unit(snapshot, 4, ["cash"])
+
+
+def test_compare_stops_once_the_interval_is_narrow_enough(snapshot):
+    result = compare_modes(snapshot, kpis=("cash",), scheme="crn+antithetic",
+                           relative_precision=0.05, max_units=400)
+    assert result["converged"]
+    summary = result["kpis"]["cash"]
+    assert summary["half_width"] <= 0.05 * abs(summary["mean_diff"])
+    assert result["games"] == result["units"] * 4
+
+
+def test_unknown_kpi_or_policy(snapshot):
+    with pytest.raises(ValueError):
+        compare_modes(snapshot, kpis=("nope",))
+    with pytest.raises(ValueError):
+        compare_modes(snapshot, policy="nope")
@@ -0,0 +1,94 @@
+import json
+import os
+
+import numpy as np
+import pytest
+
+from engine.batch_engine import BatchGameEngine
+from engine.estimator import MomentEstimate, clip_moments, project_kpi
+from engine.frozen_snapshot import intern_snapshot
+from engine.game_engine import GameEngine
+from engine.kpi_state import KPI_INDEX
+
+FIXTURES = os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), "fixtures", "snapshots")
+GAMES = 20000
+
+TURN = [("CFO", "raise_capital", 50), ("CHRO", "hire_talent", 50), ("CEO", "cost_cutting", 50)]
+
+
+@pytest.fixture(scope="module")
+def snapshot():
+    with open(os.path.join(FIXTURES, "AAPL.json"), encoding="utf-8") as f:
+        return intern_snapshot(json.load(f))
+
+
+def monte_carlo(snapshot, game, plan):
+    """Partidas simuladas desde el estado de `game` siguiendo `plan`"""
+    batch = BatchGameEngine(GAMES, snapshot, game_mode=game.game_mode, seed=2)
+    batch.kpis[:] = game.kpis.row()
+    for step in range(game.max_turns - game.current_turn):
+        for move in (plan[step] if step < len(plan) else ()):
+            batch.execute_action(*move)
+        batch.advance_turn()
+    return batch
+
+
+def assert_close(projection, values):
+    mean, std = projection["mean"][-1], projection["std"][-1]
+    assert abs(mean - values.mean()) <= 0.1 * values.std() + 5 * values.std() / np.sqrt(len(values))
+    assert std == pytest.approx(values.std(), rel=0.1)
+
+
+@pytest.mark.parametrize("mode", ["traditional", "ai_native"])
+@pytest.mark.parametrize("kpi", ["cash", "revenue", "debt", "employees"])
+def test_projection_matches_monte_carlo(snapshot, mode, kpi):
+    game = GameEngine("AAPL", snapshot["company_name"], snapshot, game_mode=mode, seed=1)
+    plan = [TURN] * 4
+    batch = monte_carlo(snapshot, game, plan)
+    assert_close(project_kpi(game, kpi, plan), batch.column(kpi))
+
+
+@pytest.mark.parametrize("turns_with_plan", [1, 4, 12])
+def test_satisfaction_projection_accounts_for_the_clamp(snapshot, turns_with_plan):
+    # Con 4 turnos de recortes, sin el recorte a [20, 100] daba 22.0 ± 7.2 (real: 23.8 ± 4.7)
+    game = GameEngine("AAPL", snapshot["company_name"], snapshot, game_mode="ai_native", seed=1)
+    plan = [TURN] * turns_with_plan
+    projection = project_kpi(game, "satisfaction", plan)
+    assert_close(projection, monte_carlo(snapshot, game, plan).column("satisfaction"))
+
+
+def test_projection_starts_from_the_known_state(snapshot):
+    game = GameEngine("AAPL", snapshot["company_name"], snapshot, seed=1)
+    projection = project_kpi(game, "cash")
+    assert projection["turns"] == list(range(1, game.max_turns + 1))
+    assert projection["mean"][0] == game.kpis["cash"]
+    assert projection["std"][0] == 0.0
+
+
+def test_clip_moments_of_a_known_value():
+    state = np.zeros((1, len(KPI_INDEX) + 1))
+    state[0, -1] = 1.0
+    state[0, KPI_INDEX["satisfaction"]] = 12.0
+    state[0, KPI_INDEX["cash"]] = 5.0
+    estimate = MomentEstimate(clip_moments(state.T @ state, "satisfaction", 20, 100))
+    assert estimate.mean[KPI_INDEX["satisfaction"]] == pytest.approx(20.0)
+    assert estimate.mean[KPI_INDEX["cash"]] == pytest.approx(5.0)
+    assert estimate.std[KPI_INDEX["satisfaction"]] == pytest.approx(0.0, abs=1e-9)
+
+
+def test_clip_moments_match_a_sampled_normal():
+    rng = np.random.default_rng(0)
+    satisfaction = rng.normal(25, 8, 400000)
+    cash = 3 * satisfaction + rng.normal(0, 1, len(satisfaction))
+    rows = np.zeros((len(satisfaction), len(KPI_INDEX) + 1))
+    rows[:, -1] = 1.0
+    rows[:, KPI_INDEX["satisfaction"]] = satisfaction
+    rows[:, KPI_INDEX["cash"]] = cash
+    estimate = MomentEstimate(clip_moments(rows.T @ rows / len(rows), "satisfaction", 20, 100))
+
+    clipped = np.clip(satisfaction, 20, 100)
+    i, j = KPI_INDEX["satisfaction"], KPI_INDEX["cash"]
+    assert estimate.mean[i] == pytest.approx(clipped.mean(), rel=1e-2)
+    assert estimate.std[i] == pytest.approx(clipped.std(), rel=1e-2)
+    covariance = estimate.second[i, j] - estimate.mean[i] * estimate.mean[j]
+    assert covariance == pytest.approx(np.cov(clipped, cash)[0, 1], rel=1e-2)
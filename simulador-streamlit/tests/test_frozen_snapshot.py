@@ -0,0 +1,68 @@
+import copy
+import gc
+import json
+import os
+import pickle
+
+import pytest
+
+from engine.frozen_snapshot import FrozenSnapshot, intern_snapshot, interned, thaw
+
+FIXTURES = os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), "fixtures", "snapshots")
+
+
+def load_fixture(ticker="AAPL"):
+    with open(os.path.join(FIXTURES, f"{ticker}.json"), encoding="utf-8") as f:
+        return json.load(f)
+
+
+def test_same_content_is_shared():
+    first = intern_snapshot(load_fixture())
+    second = intern_snapshot(load_fixture())
+    assert first is second
+    assert intern_snapshot(first) is first
+    assert copy.deepcopy(first) is first
+
+
+def test_same_key_with_different_content_is_not_shared():
+    data = load_fixture()
+    changed = load_fixture()
+    changed["company_name"] = changed.get("company_name", "") + " (editado)"
+    first, second = intern_snapshot(data), intern_snapshot(changed)
+    assert first is not second
+    assert first.key == second.key
+    assert second["company_name"] == changed["company_name"]
+
+
+@pytest.mark.parametrize("missing", ["ticker", "timestamp"])
+def test_snapshot_without_key_is_not_registered(missing):
+    data = load_fixture()
+    data.pop(missing, None)
+    before = len(interned())
+    first, second = intern_snapshot(data), intern_snapshot(data)
+    assert isinstance(first, FrozenSnapshot)
+    assert first is not second
+    assert len(interned()) == before
+
+
+def test_snapshot_is_read_only():
+    snapshot = intern_snapshot(load_fixture())
+    with pytest.raises(TypeError):
+        snapshot["ticker"] = "MSFT"
+    with pytest.raises(TypeError):
+        snapshot["top_10"]["x"] = 1
+    # thaw() devuelve una copia mutable e igual al original
+    assert thaw(snapshot) == load_fixture()
+
+
+def test_unused_snapshots_leave_the_registry():
+    data = load_fixture("TSLA")
+    data["timestamp"] = "efímero"
+    intern_snapshot(data)
+    gc.collect()
+    assert not any(key[1] == "efímero" for key in interned())
+
+
+def test_unpickled_snapshot_is_interned_again():
+    snapshot = intern_snapshot(load_fixture())
+    assert pickle.loads(pickle.dumps(snapshot)) is snapshot
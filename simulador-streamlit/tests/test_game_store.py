@@ -0,0 +1,94 @@
+import json
+import os
+import time
+
+from engine.game_engine import GameEngine
+from engine.game_store import GameStore, MemoryBackend
+
+FIXTURES = os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), "fixtures", "snapshots")
+
+
+def load_fixture(ticker):
+    with open(os.path.join(FIXTURES, f"{ticker}.json"), encoding="utf-8") as f:
+        return json.load(f)
+
+
+def new_game(ticker="TSLA"):
+    snapshot = load_fixture(ticker)
+    return GameEngine(ticker, snapshot["company_name"], snapshot, seed=1)
+
+
+class FlakyBackend(MemoryBackend):
+    """Falla las primeras `failures` escrituras de partidas ("database is locked")"""
+
+    def __init__(self, failures=1):
+        super().__init__()
+        self.failures = failures
+
+    def save(self, game_id, data):
+        if self.failures:
+            self.failures -= 1
+            raise OSError("database is locked")
+        super().save(game_id, data)
+
+
+def test_failed_eviction_keeps_the_game_until_a_write_succeeds(caplog):
+    games = [new_game() for _ in range(3)]
+    evicted = []
+    store = GameStore(FlakyBackend(failures=1), max_games=1, on_evict=evicted.append)
+    store.put(games[0])
+    store.put(games[1])
+
+    # La escritura falló: la partida sigue viva y la LRU supera max_games
+    assert evicted == []
+    assert store.stats() == {"live": 2, "stored": 0, "write_errors": 1}
+    assert "database is locked" in caplog.text
+
+    store.put(games[2])
+    assert store.stats()["live"] == 1
+    assert set(evicted) == {games[0].game_id, games[1].game_id}
+    for game in games[:2]:
+        restored = store.get(game.game_id)
+        assert restored is not None and restored.version == game.version
+
+
+def test_memory_backend_prunes_deleted_and_expired_games(monkeypatch):
+    backend = MemoryBackend(ttl_seconds=60)
+    store = GameStore(backend, max_games=0)
+    tsla, aapl = new_game("TSLA"), new_game("AAPL")
+    store.put(tsla)
+    store.put(aapl)
+    assert len(backend) == 2 and len(backend._snapshots) == 2
+
+    store.delete(tsla.game_id)
+    assert len(backend) == 1 and len(backend._snapshots) == 1
+
+    now = time.monotonic()
+    monkeypatch.setattr(time, "monotonic", lambda: now + 61)
+    assert aapl.game_id not in backend
+    assert list(backend.ids()) == [] and backend._snapshots == {}
+
+
+def test_resaving_a_game_keeps_its_snapshot():
+    backend = MemoryBackend()
+    store = GameStore(backend, max_games=0)
+    game = new_game()
+    store.put(game)
+    game.advance_turn()
+    store.put(game)
+
+    assert store.get(game.game_id).current_turn == game.current_turn
+
+
+def test_snapshots_only_kept_for_live_games():
+    store = GameStore(max_games=2, write_through=True)
+    games = [new_game(ticker) for ticker in ("TSLA", "AAPL", "MSFT", "KO", "F")]
+    for game in games:
+        store.put(game)
+
+    assert {key[0] for key in store._snapshots} == {"KO", "F"}
+
+    # Las partidas desalojadas se rehidratan releyendo su snapshot del backend
+    restored = store.get(games[0].game_id)
+    assert restored.snapshot == games[0].snapshot
+    assert len(store._snapshots) <= 2
@@ -0,0 +1,56 @@
+import json
+import os
+
+import pytest
+
+from engine.frozen_snapshot import intern_snapshot
+from engine.game_engine import GameEngine
+from engine.optimizer import Objective, optimize
+from engine.rng import derive_seed
+
+FIXTURES = os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), "fixtures", "snapshots")
+
+
+@pytest.fixture(scope="module")
+def snapshot():
+    with open(os.path.join(FIXTURES, "TSLA.json"), encoding="utf-8") as f:
+        return intern_snapshot(json.load(f))
+
+
+def run(snapshot, workers, **kwargs):
+    return optimize(snapshot, game_mode="ai_native", beam_width=3, seeds=2,
+                    intensities=(100,), workers=workers, top=3, **kwargs)
+
+
+def test_same_plans_with_any_number_of_workers(snapshot):
+    serial = run(snapshot, workers=1)
+    parallel = run(snapshot, workers=2)
+    assert serial["evaluations"] == parallel["evaluations"]
+    assert serial["plans"] == parallel["plans"]
+
+
+def test_best_plan_score_matches_a_replay_from_turn_one(snapshot):
+    # El beam evalúa con fork(): rejugar el plan desde cero debe dar lo mismo
+    result = run(snapshot, workers=1)
+    best = result["plans"][0]
+    objective = Objective.parse("cash")
+    games = []
+    for i in range(result["seeds"]):
+        game = GameEngine(snapshot["ticker"], snapshot["company_name"], snapshot,
+                          game_mode="ai_native", seed=derive_seed(0, f"optimize:{i}"))
+        baseline = game.kpis.as_dict()
+        for move in best["plan"]:
+            if move is not None:
+                game.execute_action(*move)
+            game.advance_turn()
+        games.append(game)
+    assert len(best["plan"]) == games[0].max_turns - 1
+    score = sum(objective.score(game.kpis, baseline) for game in games) / len(games)
+    assert score == pytest.approx(best["score"], abs=1e-6)
+
+
+def test_surrogate_preselection_keeps_worker_independence(snapshot):
+    serial = run(snapshot, workers=1, surrogate_keep=4)
+    parallel = run(snapshot, workers=2, surrogate_keep=4)
+    assert serial["plans"] == parallel["plans"]
+    assert serial["evaluations"] < run(snapshot, workers=1)["evaluations"]
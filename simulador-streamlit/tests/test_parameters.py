@@ -0,0 +1,39 @@
+import json
+import os
+
+import pytest
+
+from engine import history_store
+from engine.frozen_snapshot import intern_snapshot
+from engine.history_store import CSVHistoryFetcher, HistoryStore
+from engine.parameters import get_parameters
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+
+@pytest.fixture
+def snapshot():
+    with open(os.path.join(ROOT, "fixtures", "snapshots", "TSLA.json"), encoding="utf-8") as f:
+        return intern_snapshot(json.load(f))
+
+
+@pytest.fixture
+def store(tmp_path):
+    store = HistoryStore(str(tmp_path))
+    history_store.configure_history_store(store)
+    yield store
+    history_store.configure_history_store(HistoryStore())
+
+
+def test_parameters_are_cached_per_snapshot(store, snapshot):
+    assert get_parameters(snapshot, "tech") is get_parameters(snapshot, "tech")
+
+
+def test_history_ingested_later_recalibrates(store, snapshot):
+    before = get_parameters(snapshot, "tech")
+    store.ingest("TSLA", CSVHistoryFetcher(os.path.join(ROOT, "fixtures", "history")))
+    after = get_parameters(snapshot, "tech")
+
+    assert after is not before
+    assert after.growth_band != before.growth_band
+    assert get_parameters(snapshot, "tech") is after
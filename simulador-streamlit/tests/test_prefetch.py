@@ -0,0 +1,138 @@
+import threading
+
+from engine.prefetch import fetch_many
+
+
+class StubFetcher:
+    """
+    Respuestas por ticker: "ok", "none", "hang" (bloquea hasta `release`) o
+    "flaky" (falla en el primer intento)
+    """
+
+    def __init__(self, behaviour):
+        self.behaviour = behaviour
+        self.calls = {}
+        self.release = threading.Event()
+        self._lock = threading.Lock()
+
+    def fetch(self, ticker):
+        with self._lock:
+            self.calls[ticker] = self.calls.get(ticker, 0) + 1
+            attempt = self.calls[ticker]
+        kind = self.behaviour[ticker]
+        if kind == "hang":
+            self.release.wait(5)
+            return {"ticker": ticker}
+        if kind == "flaky" and attempt == 1:
+            raise ConnectionError("reset")
+        if kind == "none":
+            return None
+        return {"ticker": ticker, "timestamp": "2026-01-02T09:00:00"}
+
+
+class StubStore:
+    def __init__(self, failing=()):
+        self.failing = set(failing)
+        self.saved = []
+
+    def put(self, snapshot):
+        if snapshot["ticker"] in self.failing:
+            raise OSError("disco lleno")
+        self.saved.append(snapshot["ticker"])
+
+
+def test_retries_after_error():
+    fetcher = StubFetcher({"FLAKY": "flaky"})
+    result = fetch_many(["flaky"], fetcher, retries=2, backoff=0.01)
+
+    assert list(result["snapshots"]) == ["FLAKY"]
+    assert result["attempts"]["FLAKY"] == 2
+    assert result["errors"] == {}
+
+
+def test_missing_ticker_is_not_retried():
+    result = fetch_many(["NOPE"], StubFetcher({"NOPE": "none"}), retries=3, backoff=0.01)
+
+    assert result["errors"] == {"NOPE": "sin datos"}
+    assert result["attempts"]["NOPE"] == 1
+
+
+def test_timeout_gives_partial_results():
+    fetcher = StubFetcher({"A": "ok", "HANG": "hang", "B": "ok"})
+    try:
+        result = fetch_many(["a", "hang", "b"], fetcher, max_workers=2, retries=1,
+                            backoff=0.01, timeout=0.1)
+    finally:
+        fetcher.release.set()
+
+    assert set(result["snapshots"]) == {"A", "B"}
+    assert result["errors"]["HANG"].startswith("FetchTimeout")
+    assert result["attempts"]["HANG"] == 2
+
+
+def test_hung_attempts_stay_inside_worker_bound():
+    tickers = [f"H{i}" for i in range(6)]
+    fetcher = StubFetcher({ticker: "hang" for ticker in tickers})
+    before = threading.active_count()
+    try:
+        result = fetch_many(tickers, fetcher, max_workers=2, retries=0, timeout=0.05)
+        assert threading.active_count() - before <= 2
+    finally:
+        fetcher.release.set()
+
+    # Con los dos hilos colgados no se lanzan más intentos
+    assert sum(fetcher.calls.values()) == 2
+    assert result["errors"]["H5"] == "FetchTimeout: sin hilos libres"
+    assert set(result["errors"]) == set(tickers)
+
+
+def test_store_failure_is_reported_per_ticker():
+    store = StubStore(failing={"B"})
+    result = fetch_many(["a", "b", "c"], StubFetcher({t: "ok" for t in "ABC"}), store=store)
+
+    assert set(result["snapshots"]) == {"A", "B", "C"}
+    assert result["store_errors"] == {"B": "OSError: disco lleno"}
+    assert sorted(store.saved) == ["A", "C"]
+
+
+class HangOnceFetcher:
+    """El primer intento de cada ticker se cuelga; los siguientes responden"""
+
+    def __init__(self, hang_s=5.0):
+        self.hang_s = hang_s
+        self.calls = 0
+        self.release = threading.Event()
+        self._lock = threading.Lock()
+
+    def fetch(self, ticker):
+        with self._lock:
+            self.calls += 1
+            first = self.calls == 1
+        if first:
+            self.release.wait(self.hang_s)
+        return {"ticker": ticker, "timestamp": "2026-01-02T09:00:00"}
+
+
+def test_retry_runs_while_previous_attempt_is_stuck():
+    fetcher = HangOnceFetcher()
+    try:
+        result = fetch_many(["TSLA"], fetcher, max_workers=8, retries=2, backoff=0.01, timeout=0.3)
+    finally:
+        fetcher.release.set()
+
+    assert list(result["snapshots"]) == ["TSLA"]
+    assert result["attempts"]["TSLA"] == 2
+    assert fetcher.calls == 2
+    assert result["elapsed_s"] < 2
+
+
+def test_every_counted_attempt_reaches_the_fetcher():
+    fetcher = StubFetcher({"TSLA": "hang"})
+    try:
+        result = fetch_many(["TSLA"], fetcher, max_workers=8, retries=2, backoff=0.01, timeout=0.3)
+    finally:
+        fetcher.release.set()
+
+    assert result["errors"]["TSLA"].startswith("FetchTimeout")
+    assert result["attempts"]["TSLA"] == 3
+    assert fetcher.calls["TSLA"] == 3
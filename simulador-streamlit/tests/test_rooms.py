@@ -0,0 +1,51 @@
+import json
+import os
+
+import pytest
+
+from engine.game_engine import GameEngine
+from engine.game_store import GameStore
+from engine.rooms import RoomRegistry, room_game_id
+
+FIXTURES = os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), "fixtures", "snapshots")
+
+
+@pytest.fixture
+def game():
+    with open(os.path.join(FIXTURES, "TSLA.json"), encoding="utf-8") as f:
+        snapshot = json.load(f)
+    return GameEngine("TSLA", snapshot["company_name"], snapshot, seed=1)
+
+
+def test_room_game_is_saved_after_each_move(game):
+    store = GameStore()
+    registry = RoomRegistry(store=store)
+    room = registry.create(game)
+    room.join("p1", "CEO")
+    room.submit("p1", "strategic_pivot")
+    room.commit("p1")
+
+    stored = store.get(room_game_id(room.room_id))
+    assert stored is game
+    assert stored.current_turn == 2
+
+
+def test_closed_room_reopens_from_store(game):
+    store = GameStore(max_games=0)  # todo se desaloja y se rehidrata desde el backend
+    registry = RoomRegistry(store=store)
+    room = registry.create(game)
+    room.join("p1", "CEO")
+    room.commit("p1")
+    turn = room.game.current_turn
+
+    assert registry.close_idle(0) == 1
+    reopened = registry.get(room.room_id.lower())
+
+    assert reopened is not room
+    assert reopened.game.current_turn == turn
+    assert reopened.players == {}
+
+
+def test_unknown_room_is_none(game):
+    assert RoomRegistry(store=GameStore()).get("NOPE42") is None
+    assert RoomRegistry().get("NOPE42") is None
@@ -0,0 +1,94 @@
+import json
+import os
+
+import pytest
+
+from engine import history_store
+from engine.frozen_snapshot import intern_snapshot
+from engine.game_engine import GameEngine
+from engine.history_store import CSVHistoryFetcher, HistoryStore
+from engine.parameters import get_parameters
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+FIXTURES = os.path.join(ROOT, "fixtures", "snapshots")
+
+
+def load_fixture(ticker):
+    with open(os.path.join(FIXTURES, f"{ticker}.json"), encoding="utf-8") as f:
+        return json.load(f)
+
+
+@pytest.fixture
+def game():
+    snapshot = load_fixture("TSLA")
+    game = GameEngine("TSLA", snapshot["company_name"], snapshot, seed=7)
+    game.execute_action("CEO", "strategic_pivot")
+    game.advance_turn()
+    return game
+
+
+def test_roundtrip_with_external_snapshot(game):
+    restored = GameEngine.from_bytes(game.to_bytes(), snapshot=load_fixture("TSLA"))
+
+    assert restored.get_state() == game.get_state()
+
+
+def test_snapshot_of_another_ticker_is_rejected(game):
+    other = load_fixture("AAPL")
+    other["timestamp"] = game.snapshot["timestamp"]
+
+    with pytest.raises(ValueError):
+        GameEngine.from_bytes(game.to_bytes(), snapshot=other)
+
+
+def test_snapshot_with_another_timestamp_is_rejected(game):
+    stale = load_fixture("TSLA")
+    stale["timestamp"] = "2020-01-01T00:00:00"
+
+    with pytest.raises(ValueError):
+        GameEngine.from_bytes(game.to_bytes(), snapshot=stale)
+
+
+@pytest.fixture
+def history(tmp_path):
+    store = HistoryStore(str(tmp_path))
+    history_store.configure_history_store(store)
+    yield store
+    history_store.configure_history_store(HistoryStore())
+
+
+def play(game, turns=4):
+    for _ in range(turns):
+        game.execute_action("CFO", "raise_capital")
+        game.advance_turn()
+    return game.kpis.as_dict()
+
+
+def test_saved_parameters_survive_a_later_history_ingest(history):
+    snapshot = intern_snapshot(load_fixture("TSLA"))
+    game = GameEngine("TSLA", snapshot["company_name"], snapshot, seed=7)
+    data = game.to_bytes()
+
+    history.ingest("TSLA", CSVHistoryFetcher(os.path.join(ROOT, "fixtures", "history")))
+    assert get_parameters(snapshot, "tech").as_dict() != game.parameters.as_dict()
+
+    restored = GameEngine.from_bytes(data, snapshot=snapshot)
+    assert restored.parameters.as_dict() == game.parameters.as_dict()
+    assert play(restored) == play(game)
+
+
+def test_version_1_payloads_are_still_readable(game):
+    data = game.to_bytes()
+    parameters = json.dumps(game.parameters.as_dict()).encode("utf-8")
+    assert data.endswith(parameters)
+    v1 = bytearray(data[:-(4 + len(parameters))])
+    v1[4] = 1
+
+    restored = GameEngine.from_bytes(bytes(v1), snapshot=load_fixture("TSLA"))
+    assert restored.get_state() == game.get_state()
+
+
+@pytest.mark.parametrize("size", [0, 3, 5, 12, 40, 200])
+def test_truncated_payloads_raise_value_error(game, size):
+    with pytest.raises(ValueError):
+        GameEngine.from_bytes(game.to_bytes()[:size], snapshot=load_fixture("TSLA"))
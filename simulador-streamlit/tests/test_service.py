@@ -0,0 +1,149 @@
+import asyncio
+import base64
+import json
+import os
+import struct
+
+import pytest
+
+from engine import finance_engine
+from engine.game_store import GameStore
+from engine.service import GameService, start_server
+from engine.snapshot_store import FixtureFetcher
+
+FIXTURES = os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), "fixtures", "snapshots")
+
+
+@pytest.fixture(autouse=True)
+def fixture_snapshots(monkeypatch):
+    monkeypatch.setattr(finance_engine, "_fetcher", FixtureFetcher(FIXTURES))
+    monkeypatch.setattr(finance_engine, "_store", None)
+
+
+async def raw_request(port, head: str, body: bytes = b""):
+    reader, writer = await asyncio.open_connection("127.0.0.1", port)
+    writer.write(head.encode("latin-1") + b"\r\n\r\n" + body)
+    await writer.drain()
+    response = await reader.read()
+    writer.close()
+    head, _, payload = response.partition(b"\r\n\r\n")
+    return int(head.split()[1]), json.loads(payload)
+
+
+async def request(port, method, path, body=None):
+    data = json.dumps(body).encode() if body is not None else b""
+    return await raw_request(port, f"{method} {path} HTTP/1.1\r\nContent-Length: {len(data)}\r\n"
+                                   "Connection: close", data)
+
+
+def with_server(test):
+    """Ejecuta test(service, port) con un servidor en un puerto libre"""
+    async def main():
+        service = GameService(GameStore(max_games=8))
+        server = await start_server(port=0, service=service)
+        try:
+            return await test(service, server.sockets[0].getsockname()[1])
+        finally:
+            server.close()
+            await server.wait_closed()
+    return asyncio.run(main())
+
+
+def test_play_a_game():
+    async def test(service, port):
+        status, state = await request(port, "POST", "/games", {"ticker": "TSLA", "seed": 1})
+        assert status == 200
+        game_id = state["game_id"]
+
+        status, played = await request(port, "POST", f"/games/{game_id}/actions",
+                                       {"role": "CEO", "action": "strategic_pivot", "intensity": 70})
+        assert status == 200 and played["message"]
+        status, advanced = await request(port, "POST", f"/games/{game_id}/advance")
+        assert status == 200
+        status, state = await request(port, "GET", f"/games/{game_id}")
+        assert state["turn"] == advanced["state"]["turn"] == 2
+    with_server(test)
+
+
+@pytest.mark.parametrize("body", [
+    {"ticker": 5},
+    {"ticker": "TSLA", "seed": "abc"},
+    {"ticker": "TSLA", "seed": True},
+    {"ticker": "TSLA", "game_mode": "x"},
+    {"ticker": "TSLA", "industry_type": "zz"},
+])
+def test_invalid_create_is_400(body):
+    async def test(service, port):
+        assert (await request(port, "POST", "/games", body))[0] == 400
+    with_server(test)
+
+
+@pytest.mark.parametrize("body", [
+    {"role": "XX", "action": "strategic_pivot"},
+    {"role": "CEO", "action": ["x"]},
+    {"role": "CEO", "action": "strategic_pivot", "intensity": "abc"},
+    {"role": "CEO", "action": "strategic_pivot", "intensity": 150},
+])
+def test_invalid_action_is_400(body):
+    async def test(service, port):
+        _, state = await request(port, "POST", "/games", {"ticker": "TSLA", "seed": 1})
+        assert (await request(port, "POST", f"/games/{state['game_id']}/actions", body))[0] == 400
+    with_server(test)
+
+
+def test_unknown_games_do_not_leak_locks():
+    async def test(service, port):
+        for i in range(50):
+            assert (await request(port, "GET", f"/games/bogus-{i}"))[0] == 404
+            assert (await request(port, "POST", f"/games/bogus-{i}/advance"))[0] == 404
+        assert service._locks == {}
+    with_server(test)
+
+
+def test_evicted_games_release_their_locks():
+    async def test(service, port):
+        for seed in range(12):
+            _, state = await request(port, "POST", "/games", {"ticker": "TSLA", "seed": seed})
+            await request(port, "GET", f"/games/{state['game_id']}")
+        assert len(service._locks) <= service.store.max_games
+    with_server(test)
+
+
+@pytest.mark.parametrize("length", ["abc", "-5"])
+def test_invalid_content_length_is_400(length):
+    async def test(service, port):
+        status, _ = await raw_request(port, f"POST /games HTTP/1.1\r\nContent-Length: {length}\r\n"
+                                            "Connection: close")
+        assert status == 400
+    with_server(test)
+
+
+async def read_frame(reader):
+    first, second = await reader.readexactly(2)
+    size = second & 0x7F
+    if size == 126:
+        (size,) = struct.unpack("!H", await reader.readexactly(2))
+    elif size == 127:
+        (size,) = struct.unpack("!Q", await reader.readexactly(8))
+    return first & 0x0F, await reader.readexactly(size)
+
+
+def test_websocket_closes_oversized_frames_with_1009():
+    async def test(service, port):
+        _, state = await request(port, "POST", "/games", {"ticker": "TSLA", "seed": 1})
+        reader, writer = await asyncio.open_connection("127.0.0.1", port)
+        key = base64.b64encode(os.urandom(16)).decode()
+        writer.write((f"GET /games/{state['game_id']}/ws HTTP/1.1\r\nUpgrade: websocket\r\n"
+                      f"Connection: Upgrade\r\nSec-WebSocket-Key: {key}\r\n\r\n").encode())
+        await reader.readuntil(b"\r\n\r\n")
+        opcode, payload = await read_frame(reader)
+        assert opcode == 0x1 and json.loads(payload)["game_id"] == state["game_id"]
+
+        # Cabecera de un frame de 1 TB (enmascarado): no se debe intentar leer
+        writer.write(struct.pack("!BBQ", 0x81, 0x80 | 127, 1 << 40) + os.urandom(4))
+        await writer.drain()
+        opcode, payload = await asyncio.wait_for(read_frame(reader), 2)
+        assert opcode == 0x8
+        assert struct.unpack("!H", payload[:2])[0] == 1009
+        writer.close()
+    with_server(test)
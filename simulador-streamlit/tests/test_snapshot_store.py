@@ -0,0 +1,115 @@
+import os
+from datetime import date, timedelta
+
+import pytest
+
+from engine.snapshot_store import FixtureFetcher, SnapshotStore, load_snapshot
+
+FIXTURES = os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), "fixtures", "snapshots")
+
+
+class StubFetcher:
+    """Cuenta las descargas; `error` simula un fallo de red"""
+
+    def __init__(self, snapshot=None, error=None):
+        self.snapshot = snapshot
+        self.error = error
+        self.calls = 0
+
+    def fetch(self, ticker):
+        self.calls += 1
+        if self.error is not None:
+            raise self.error
+        return self.snapshot
+
+
+def snapshot(ticker="TSLA", cash=1.0):
+    return {"ticker": ticker, "timestamp": "2026-01-02T09:00:00", "cash": cash}
+
+
+@pytest.fixture
+def store(tmp_path):
+    return SnapshotStore(str(tmp_path))
+
+
+def test_store_hit_skips_fetcher(store):
+    store.put(snapshot(cash=1.0))
+    fetcher = StubFetcher(snapshot(cash=2.0))
+
+    assert load_snapshot("tsla", fetcher, store)["cash"] == 1.0
+    assert fetcher.calls == 0
+
+
+def test_store_miss_fetches_and_saves(store):
+    fetcher = StubFetcher(snapshot(cash=2.0))
+
+    assert load_snapshot("TSLA", fetcher, store)["cash"] == 2.0
+    assert store.dates("TSLA") == [date.today()]
+    assert load_snapshot("TSLA", fetcher, store)["cash"] == 2.0
+    assert fetcher.calls == 1
+
+
+def test_stale_entry_is_refreshed(store):
+    store.put(snapshot(cash=1.0), fetched_on=date.today() - timedelta(days=5))
+    fetcher = StubFetcher(snapshot(cash=2.0))
+
+    assert load_snapshot("TSLA", fetcher, store, max_age_days=1)["cash"] == 2.0
+    assert fetcher.calls == 1
+
+
+def test_stale_entry_served_when_fetch_fails(store):
+    store.put(snapshot(cash=1.0), fetched_on=date.today() - timedelta(days=5))
+    fetcher = StubFetcher(error=ConnectionError("sin red"))
+
+    assert load_snapshot("TSLA", fetcher, store, max_age_days=1)["cash"] == 1.0
+
+
+def test_fetch_error_without_stored_snapshot_propagates(store):
+    with pytest.raises(ConnectionError):
+        load_snapshot("TSLA", StubFetcher(error=ConnectionError("sin red")), store)
+
+
+def test_fixture_snapshots_are_fresh_after_download(store):
+    class CountingFixtures(FixtureFetcher):
+        calls = 0
+
+        def fetch(self, ticker):
+            CountingFixtures.calls += 1
+            return super().fetch(ticker)
+
+    fetcher = CountingFixtures(FIXTURES)
+    first = load_snapshot("TSLA", fetcher, store)
+    second = load_snapshot("TSLA", fetcher, store)
+
+    assert first == second
+    assert fetcher.calls == 1
+
+
+class ReadOnlyStore(SnapshotStore):
+    def put(self, snapshot, fetched_on=None):
+        raise OSError("sistema de ficheros de solo lectura")
+
+
+def test_write_failure_still_returns_fetched_snapshot(tmp_path, caplog):
+    fetcher = StubFetcher(snapshot(cash=2.0))
+
+    assert load_snapshot("TSLA", fetcher, ReadOnlyStore(str(tmp_path)))["cash"] == 2.0
+    assert "solo lectura" in caplog.text
+
+
+def test_failed_put_leaves_no_temp_file(store, tmp_path):
+    with pytest.raises(TypeError):
+        store.put({"ticker": "TSLA", "timestamp": "2026-01-02T09:00:00", "bad": object()})
+
+    assert os.listdir(tmp_path / "TSLA") == []
+
+
+@pytest.mark.parametrize("ticker", ["../etc", "..", "TSLA/../../x", "", "A" * 16, "a b"])
+def test_invalid_tickers_are_rejected(store, ticker):
+    with pytest.raises(ValueError):
+        load_snapshot(ticker, StubFetcher(snapshot()), store)
+
+
+@pytest.mark.parametrize("ticker", ["brk-b", "^GSPC", "EURUSD=X", "7203.T"])
+def test_exchange_symbols_are_accepted(store, ticker):
+    assert load_snapshot(ticker, StubFetcher(snapshot(ticker.upper())), store)